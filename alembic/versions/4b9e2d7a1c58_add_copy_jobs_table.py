@@ -0,0 +1,57 @@
+"""add copy jobs table
+
+Revision ID: 4b9e2d7a1c58
+Revises: 7c2d5e8f1a63
+Create Date: 2026-10-19 00:12:27.604318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b9e2d7a1c58'
+down_revision: Union[str, None] = '7c2d5e8f1a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('copy_jobs',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('source_connector_id', sa.String(), nullable=False),
+    sa.Column('destination_connector_id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('selected_file', sa.Text(), nullable=True),
+    sa.Column('table_name', sa.String(), nullable=False),
+    sa.Column('columns', sa.JSON(), nullable=True),
+    sa.Column('chunksize', sa.Integer(), nullable=False),
+    sa.Column('create_table', sa.Boolean(), nullable=False),
+    sa.Column('chunks_committed', sa.Integer(), nullable=False),
+    sa.Column('rows_written', sa.BigInteger(), nullable=False),
+    sa.Column('metrics', sa.JSON(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['source_connector_id'], ['connectors.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['destination_connector_id'], ['connectors.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_copy_jobs_id'), 'copy_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_copy_jobs_source_connector_id'), 'copy_jobs', ['source_connector_id'], unique=False)
+    op.create_index(op.f('ix_copy_jobs_destination_connector_id'), 'copy_jobs', ['destination_connector_id'], unique=False)
+    op.create_index(op.f('ix_copy_jobs_user_id'), 'copy_jobs', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_copy_jobs_user_id'), table_name='copy_jobs')
+    op.drop_index(op.f('ix_copy_jobs_destination_connector_id'), table_name='copy_jobs')
+    op.drop_index(op.f('ix_copy_jobs_source_connector_id'), table_name='copy_jobs')
+    op.drop_index(op.f('ix_copy_jobs_id'), table_name='copy_jobs')
+    op.drop_table('copy_jobs')
@@ -0,0 +1,26 @@
+"""add columns to read jobs
+
+Revision ID: 7c2d5e8f1a63
+Revises: e3f1c9a4b7d2
+Create Date: 2026-10-18 14:37:05.902117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2d5e8f1a63'
+down_revision: Union[str, None] = 'e3f1c9a4b7d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('read_jobs', sa.Column('columns', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('read_jobs', 'columns')
@@ -0,0 +1,28 @@
+"""add write mode to copy jobs
+
+Revision ID: 9d3a6f1e2b47
+Revises: 4b9e2d7a1c58
+Create Date: 2026-10-19 02:41:09.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3a6f1e2b47'
+down_revision: Union[str, None] = '4b9e2d7a1c58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('copy_jobs', sa.Column('write_mode', sa.String(), nullable=False, server_default='append'))
+    op.add_column('copy_jobs', sa.Column('merge_keys', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('copy_jobs', 'merge_keys')
+    op.drop_column('copy_jobs', 'write_mode')
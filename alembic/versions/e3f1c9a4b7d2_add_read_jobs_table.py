@@ -0,0 +1,54 @@
+"""add read jobs table
+
+Revision ID: e3f1c9a4b7d2
+Revises: a57204c88714
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3f1c9a4b7d2'
+down_revision: Union[str, None] = 'a57204c88714'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('read_jobs',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('connector_id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('files', sa.JSON(), nullable=False),
+    sa.Column('limit', sa.Integer(), nullable=True),
+    sa.Column('files_total', sa.Integer(), nullable=False),
+    sa.Column('files_done', sa.Integer(), nullable=False),
+    sa.Column('rows_read', sa.BigInteger(), nullable=False),
+    sa.Column('bytes_total', sa.BigInteger(), nullable=False),
+    sa.Column('bytes_read', sa.BigInteger(), nullable=False),
+    sa.Column('result', sa.JSON(), nullable=True),
+    sa.Column('result_path', sa.Text(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['connector_id'], ['connectors.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_read_jobs_id'), 'read_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_read_jobs_connector_id'), 'read_jobs', ['connector_id'], unique=False)
+    op.create_index(op.f('ix_read_jobs_user_id'), 'read_jobs', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_read_jobs_user_id'), table_name='read_jobs')
+    op.drop_index(op.f('ix_read_jobs_connector_id'), table_name='read_jobs')
+    op.drop_index(op.f('ix_read_jobs_id'), table_name='read_jobs')
+    op.drop_table('read_jobs')
@@ -1,5 +1,7 @@
-from fastapi import APIRouter, HTTPException, Depends, Header
-from typing import Dict, Any, List
+import asyncio
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Request
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Any, List, Optional
 from sqlalchemy.orm import Session
 from app.services.connector_service import ConnectorService
 from app.models.user import User
@@ -10,7 +12,9 @@ from app.schemas.connector import (
     ConnectorListResponse
 )
 from app.dependencies import get_db, get_current_user, validate_token
+from app.utils.ingest import BodyStream, IngestError, ingest_format
 from app.utils.logging import logger
+from app.utils.spool import SpoolFull
 
 router = APIRouter(dependencies=[Depends(validate_token)])
 connector_service = ConnectorService()
@@ -115,3 +119,62 @@ def test_connection(
     except Exception as e:
         logger.error(f"API: Failed to test connection - {e}", exc_info=True)
         raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/{connector_id}/ingest", response_model=Dict[str, Any])
+async def ingest_data(
+    connector_id: str,
+    request: Request,
+    table_name: str = Query(...),
+    mode: str = Query("append"),
+    merge_keys: Optional[List[str]] = Query(None),
+    partition_by: Optional[str] = Query(None),
+    create_table: bool = Query(False),
+    chunksize: Optional[int] = Query(None, ge=1),
+    spool: bool = Query(False),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    authorization: str = Header(...)
+):
+    """
+    Stream an NDJSON, CSV or Arrow IPC body into a destination table.
+
+    The body is parsed into chunks as it arrives and each chunk is written
+    before the rest is read, so memory does not grow with the upload size.
+    With spool=true chunks are accepted once they are in the write spool,
+    and written to the destination in the background.
+    """
+    try:
+        media_type = ingest_format(request.headers.get("content-type"))
+    except ValueError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+
+    logger.info(f"API: Ingesting {media_type} into {table_name} of connector {connector_id} for user {current_user.id}")
+    body = BodyStream()
+    consumer = asyncio.ensure_future(run_in_threadpool(
+        connector_service.ingest, connector_id, current_user.id, db, body, media_type, table_name,
+        mode, merge_keys, partition_by, create_table, chunksize, spool
+    ))
+    try:
+        async for part in request.stream():
+            if consumer.done():
+                break
+            if part:
+                await body.put(part)
+        await body.end()
+        return await consumer
+    except IngestError as e:
+        if isinstance(e.__cause__, SpoolFull):
+            status_code = 503
+        else:
+            status_code = 400 if isinstance(e.__cause__, ValueError) else 500
+        raise HTTPException(status_code=status_code, detail={"error": str(e), **e.stats})
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"API: Failed to ingest into {table_name} - {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to ingest data")
+    finally:
+        # A client that disconnects mid-upload must not leave the parser waiting
+        body.close()
@@ -0,0 +1,113 @@
+from fastapi import APIRouter, Depends, HTTPException, Header
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+from app.dependencies import get_db, get_current_user, validate_token
+from app.models.connector import Connector
+from app.models.user import User
+from app.schemas.copy_job import CopyJobCreate, CopyJobResponse
+from app.services.copy_job_service import FINISHED_STATUSES, CopyJobService
+from app.utils.logging import logger
+
+router = APIRouter(dependencies=[Depends(validate_token)])
+
+@router.post("/")
+def create_copy_job(
+    request: CopyJobCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    authorization: str = Header(...)
+):
+    """
+    Start a streaming copy from a source connector into a destination table.
+
+    The copy runs in the background; its id is returned for polling.
+    """
+    logger.info(f"Copy from connector {request.source_connector_id} to {request.destination_connector_id} "
+                f"requested by user_id={current_user.id}")
+
+    try:
+        _get_connector_or_404(request.source_connector_id, "source", current_user, db)
+        _get_connector_or_404(request.destination_connector_id, "destination", current_user, db)
+
+        job = CopyJobService(db).create_job(
+            request.source_connector_id,
+            request.destination_connector_id,
+            current_user.id,
+            request.table_name,
+            selected_file=request.selected_file,
+            columns=request.columns,
+            chunksize=request.chunksize,
+            create_table=request.create_table,
+            write_mode=request.write_mode,
+            merge_keys=request.merge_keys
+        )
+        return JSONResponse(status_code=202, content={"status": "accepted", "job_id": job.id})
+
+    except HTTPException:
+        raise
+    except PermissionError:
+        raise HTTPException(status_code=403, detail="Unauthorized access")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to start copy for user {current_user.id}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to start copy")
+
+def _get_connector_or_404(connector_id: str, connector_type: str, current_user: User, db: Session) -> Connector:
+    connector = db.query(Connector).filter(
+        Connector.id == connector_id,
+        Connector.user_id == current_user.id
+    ).first()
+    if not connector:
+        logger.warning(f"Connector {connector_id} not found for user {current_user.id}")
+        raise HTTPException(status_code=404, detail="Connector not found")
+    if connector.connector_type != connector_type:
+        raise HTTPException(status_code=400, detail=f"Connector {connector_id} is not a {connector_type} connector")
+    return connector
+
+def _get_job_or_404(job_id: str, current_user: User, db: Session):
+    job = CopyJobService(db).get_job(job_id, current_user.id)
+    if not job:
+        logger.warning(f"Copy job {job_id} not found for user {current_user.id}")
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/{job_id}", response_model=CopyJobResponse)
+def get_copy_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    authorization: str = Header(...)
+):
+    """Return the status, committed chunks and throughput of a copy job."""
+    return _get_job_or_404(job_id, current_user, db)
+
+@router.post("/{job_id}/resume", response_model=CopyJobResponse)
+def resume_copy_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    authorization: str = Header(...)
+):
+    """Continue a failed or cancelled copy after its last committed chunk."""
+    job = _get_job_or_404(job_id, current_user, db)
+    try:
+        return CopyJobService(db).resume_job(job)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.delete("/{job_id}", response_model=CopyJobResponse)
+def delete_copy_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    authorization: str = Header(...)
+):
+    """Cancel a running copy, or delete a finished one."""
+    job = _get_job_or_404(job_id, current_user, db)
+    service = CopyJobService(db)
+    if job.status not in FINISHED_STATUSES:
+        return service.cancel_job(job)
+    response = CopyJobResponse.model_validate(job)
+    service.delete_job(job)
+    return response
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, Header
+from fastapi.responses import Response
 from sqlalchemy.orm import Session
 from typing import Optional, List, Dict, Any
 
@@ -15,6 +16,7 @@ from app.schemas.dataset import (
 )
 from app.dependencies import get_db, get_current_user, validate_token
 from app.utils.logging import logger
+from app.utils.serializers import JSON, iter_encoded, iter_json_object, negotiate_format
 
 router = APIRouter(dependencies=[Depends(validate_token)])
 
@@ -170,20 +172,23 @@ async def list_transformations(
 async def preview_dataset(
     dataset_id: int,
     limit: int = Query(10, ge=1, le=100),
+    columns: Optional[List[str]] = Query(None),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    accept: Optional[str] = Header(None)
 ):
-    """Preview dataset content with optional transformations applied for the current user."""
+    """Preview dataset content as JSON, NDJSON or an Arrow IPC stream for the current user."""
     try:
         service = DatasetService(db)
         dataset = service.get_dataset(dataset_id, user_id=current_user.id)
-        
-        # TODO: Implement preview logic based on connector type and transformations
-        # This is a placeholder that should be implemented based on your requirements
-        return {
-            "dataset_id": dataset_id,
-            "name": dataset.name,
-            "preview": "Preview functionality to be implemented"
-        }
+        preview = service.preview_data(dataset_id, current_user.id, limit=limit, columns=columns)
+
+        media_type = negotiate_format(accept)
+        if media_type == JSON:
+            body = iter_json_object({"dataset_id": dataset_id, "name": dataset.name}, "preview", [preview])
+        else:
+            body = iter_encoded([preview], media_type)
+        # A preview is at most 100 rows, so it is encoded before responding and errors keep their status
+        return Response(b"".join(body), media_type=media_type)
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,23 +1,52 @@
-from fastapi import APIRouter, Depends, HTTPException, Header
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from sqlalchemy.orm import Session
 from app.core.agents.reader_agent import ReaderAgent
+from app.core.config import settings
 from app.dependencies import get_db, get_current_user, validate_token
+from app.models.connector import Connector
 from app.models.user import User
+from app.schemas.read_job import ReadJobResponse
 from app.services.connector_service import ConnectorService
+from app.services.read_job_service import FINISHED_STATUSES, ReadJobService, iter_job_events
+from app.utils.engines import engine_registry
+from app.utils.file_index import FILE_EXTENSIONS, file_indexes
+from app.utils.images import get_thumbnail
 from app.utils.logging import logger
+from app.utils.serializers import (
+    ARROW_STREAM, JSON, NDJSON, iter_encoded, iter_json_results, iter_ndjson, limit_frames, negotiate_format, prefetch
+)
+from typing import List, Optional
+import itertools
 import os
-from typing import List
 
 router = APIRouter(dependencies=[Depends(validate_token)])
 
+PREVIEW_ROWS = 5
+
 @router.post("/read-from-connector/{connector_id}")
 def read_from_connector(
     connector_id: str,
     selected_files: list[str] = None,
+    page: Optional[int] = Query(None, ge=0),
+    page_size: int = Query(PREVIEW_ROWS, ge=1, le=10000),
+    limit: Optional[int] = Query(None, ge=1),
+    columns: Optional[List[str]] = Query(None),
+    background: bool = False,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
-    authorization: str = Header(...)
+    authorization: str = Header(...),
+    accept: Optional[str] = Header(None)
 ):
+    """
+    Read connector files, streamed as JSON, NDJSON or an Arrow IPC stream.
+
+    The format follows the Accept header. JSON without a limit returns the
+    usual preview of each file; NDJSON and Arrow stream every row unless a
+    limit is given. Only the given columns are read when columns is set.
+    With background=true the read runs as a job and its id
+    is returned for polling under /jobs.
+    """
     logger.info(f"ReaderAgent triggered by user_id={current_user.id} for connector_id={connector_id} with files={selected_files}")
 
     try:
@@ -29,33 +58,88 @@ def read_from_connector(
         if not connector["file_path"] and not selected_files:
             raise HTTPException(status_code=400, detail="Either file_path must be set or files must be provided")
 
+        # If no files provided, read all files in directory
+        files = selected_files or list_files(connector_id, current_user, db)
+
+        if background:
+            job = ReadJobService(db).create_job(connector_id, current_user.id, files, connector["file_path"], limit, columns)
+            return JSONResponse(status_code=202, content={"status": "accepted", "job_id": job.id})
+
+        media_type = negotiate_format(accept)
+        # Files are read while the response streams, after the request session
+        # is closed, so the agent opens its own short-lived sessions
         reader_agent = ReaderAgent()
-        results = []
-        
-        if selected_files:
-            for file in selected_files:
-                result = reader_agent.read_data(connector_id, file)
-                results.append({"file": file, "data_preview": result[:5]})
-        else:
-            # If no files provided, read all files in directory
-            files = list_files(connector_id, current_user, db)
+        if media_type == ARROW_STREAM and len(files) != 1:
+            raise HTTPException(status_code=400, detail="Arrow streams can only be returned for a single file")
+
+        row_limit = limit or (PREVIEW_ROWS if media_type == JSON else None)
+
+        def file_frames(file):
+            if row_limit is not None and row_limit <= settings.READER_CHUNK_SIZE:
+                return [reader_agent.read_data(connector_id, file, limit=row_limit, columns=columns)[:row_limit]]
+            return limit_frames(reader_agent.read_chunks(connector_id, file, columns=columns), row_limit)
+
+        def file_results():
             for file in files:
-                result = reader_agent.read_data(connector_id, file)
-                results.append({"file": file, "data_preview": result[:5]})
+                if page is not None:
+                    # Seek straight to the requested page through the file's line index
+                    result = reader_agent.read_page(connector_id, file, page, page_size, columns)
+                    yield {
+                        "file": file,
+                        "page": result["page"],
+                        "page_size": result["page_size"],
+                        "total_rows": result["total_rows"],
+                        "total_pages": result["total_pages"]
+                    }, [result["data"]]
+                else:
+                    yield {"file": file}, file_frames(file)
 
-        logger.info(f"ReaderAgent successfully read from connector {connector_id}")
-        return {"status": "success", "results": results}
+        bounded = page is not None or (row_limit is not None and row_limit <= settings.READER_CHUNK_SIZE)
+        if bounded:
+            # Previews and pages are read before responding, so a failed read is an error status
+            results = [(fields, list(frames)) for fields, frames in file_results()]
+        else:
+            results = _start_results(file_results())
 
+        if media_type == JSON:
+            body = iter_json_results(results)
+        elif media_type == NDJSON and len(files) > 1:
+            body = iter_ndjson(
+                frame.assign(_file=fields["file"])
+                for fields, frames in results
+                for frame in frames
+            )
+        else:
+            body = iter_encoded((frame for _, frames in results for frame in frames), media_type)
+
+        if bounded:
+            return Response(b"".join(body), media_type=media_type)
+        logger.info(f"ReaderAgent streaming {media_type} from connector {connector_id}")
+        return StreamingResponse(body, media_type=media_type)
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to read from connector {connector_id}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to read from connector")
 
+def _start_results(results):
+    """Open the first file of a streamed read before responding, so failing to read it is an error status."""
+    results = iter(results)
+    first = next(results, None)
+    if first is None:
+        return iter(())
+    fields, frames = first
+    return itertools.chain([(fields, prefetch(frames))], results)
+
 @router.get("/list-files/{connector_id}")
 def list_files(
     connector_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
-    authorization: str = Header(...)
+    authorization: str = Header(...),
+    pattern: Optional[str] = None,
+    recursive: bool = False
 ) -> List[str]:
     logger.info(f"Listing files for connector_id={connector_id} by user_id={current_user.id}")
 
@@ -68,25 +152,170 @@ def list_files(
         if not connector["file_path"]:
             raise HTTPException(status_code=400, detail="File path not configured")
 
-        # Get all files in directory
-        all_files = os.listdir(connector["file_path"])
-        
         # Filter files based on connector type
-        if connector["type"] == "csv":
-            filtered_files = [f for f in all_files if f.endswith('.csv')]
-        elif connector["type"] == "pdf":
-            filtered_files = [f for f in all_files if f.endswith('.pdf')]
-        elif connector["type"] == "txt":
-            filtered_files = [f for f in all_files if f.endswith('.txt')]
-        elif connector["type"] == "xlsx":
-            filtered_files = [f for f in all_files if f.endswith(('.xlsx', '.xls'))]
-        elif connector["type"] == "image":
-            filtered_files = [f for f in all_files if f.endswith(('.jpg', '.jpeg', '.png', '.gif'))]
-        else:
+        if connector["type"] not in FILE_EXTENSIONS:
             raise HTTPException(status_code=400, detail="Unsupported connector type for file listing")
 
-        return filtered_files
+        index = file_indexes.get_index(connector_id, connector["file_path"], recursive)
+        entries, _ = index.query(extensions=FILE_EXTENSIONS[connector["type"]], pattern=pattern)
+        return [entry.name for entry in entries]
 
     except Exception as e:
         logger.error(f"Failed to list files for connector {connector_id}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to list files")
+
+@router.get("/files/{connector_id}")
+def list_files_page(
+    connector_id: str,
+    pattern: Optional[str] = None,
+    recursive: bool = False,
+    sort: str = Query("name", pattern="^(name|size|mtime)$"),
+    descending: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    refresh: bool = False,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    authorization: str = Header(...)
+):
+    """List one page of connector files with size and modification time."""
+    logger.info(f"Listing file page for connector_id={connector_id} by user_id={current_user.id}")
+
+    try:
+        connector = ConnectorService().get_connector(connector_id, current_user.id, db)
+        if not connector:
+            logger.warning(f"Connector {connector_id} not found for user {current_user.id}")
+            raise HTTPException(status_code=404, detail="Connector not found")
+
+        if not connector["file_path"]:
+            raise HTTPException(status_code=400, detail="File path not configured")
+
+        if connector["type"] not in FILE_EXTENSIONS:
+            raise HTTPException(status_code=400, detail="Unsupported connector type for file listing")
+
+        index = file_indexes.get_index(connector_id, connector["file_path"], recursive, refresh=refresh)
+        entries, next_cursor = index.query(
+            extensions=FILE_EXTENSIONS[connector["type"]],
+            pattern=pattern,
+            sort=sort,
+            descending=descending,
+            cursor=cursor,
+            limit=limit
+        )
+        return {"files": [entry.to_dict() for entry in entries], "next_cursor": next_cursor}
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to list files for connector {connector_id}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to list files")
+
+@router.get("/thumbnails/{connector_id}")
+def image_thumbnail(
+    connector_id: str,
+    file: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    authorization: str = Header(...)
+):
+    """Return the cached PNG thumbnail of an image connector file."""
+    logger.info(f"Thumbnail of {file} requested for connector_id={connector_id} by user_id={current_user.id}")
+
+    try:
+        connector = ConnectorService().get_connector(connector_id, current_user.id, db)
+        if not connector:
+            logger.warning(f"Connector {connector_id} not found for user {current_user.id}")
+            raise HTTPException(status_code=404, detail="Connector not found")
+
+        if connector["type"] != "image" or not connector["file_path"]:
+            raise HTTPException(status_code=400, detail="Thumbnails are only available for image connectors")
+
+        root = os.path.realpath(connector["file_path"])
+        path = os.path.realpath(os.path.join(root, file))
+        if os.path.commonpath([root, path]) != root or not os.path.isfile(path):
+            raise HTTPException(status_code=404, detail="File not found")
+
+        return FileResponse(get_thumbnail(path), media_type="image/png")
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to create thumbnail for connector {connector_id}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to create thumbnail")
+
+@router.get("/engine-stats")
+def engine_stats(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    authorization: str = Header(...)
+):
+    """Return reuse statistics of the cached source database engines of the user's connectors."""
+    logger.info(f"Engine stats requested by user_id={current_user.id}")
+    connector_ids = [str(connector_id) for (connector_id,) in
+                     db.query(Connector.id).filter(Connector.user_id == current_user.id)]
+    return engine_registry.stats(connector_ids)
+
+def _get_job_or_404(job_id: str, current_user: User, db: Session):
+    job = ReadJobService(db).get_job(job_id, current_user.id)
+    if not job:
+        logger.warning(f"Read job {job_id} not found for user {current_user.id}")
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/jobs/{job_id}", response_model=ReadJobResponse)
+def get_read_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    authorization: str = Header(...)
+):
+    """Return the status and progress of a background read job."""
+    return _get_job_or_404(job_id, current_user, db)
+
+@router.get("/jobs/{job_id}/events")
+def read_job_events(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    authorization: str = Header(...)
+):
+    """Stream the progress of a background read job as Server-Sent Events."""
+    _get_job_or_404(job_id, current_user, db)
+    return StreamingResponse(
+        iter_job_events(job_id, current_user.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/jobs/{job_id}/result")
+def read_job_result(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    authorization: str = Header(...)
+):
+    """Download the rows read by a completed job as NDJSON."""
+    job = _get_job_or_404(job_id, current_user, db)
+    if job.status != "completed":
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    return FileResponse(job.result_path, media_type=NDJSON, filename=f"{job_id}.ndjson")
+
+@router.delete("/jobs/{job_id}", response_model=ReadJobResponse)
+def delete_read_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    authorization: str = Header(...)
+):
+    """Cancel a running job, or delete a finished one with its result."""
+    job = _get_job_or_404(job_id, current_user, db)
+    service = ReadJobService(db)
+    if job.status not in FINISHED_STATUSES:
+        return service.cancel_job(job)
+    response = ReadJobResponse.model_validate(job)
+    service.delete_job(job)
+    return response
@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends, Header
+from typing import Dict, Any
+from sqlalchemy.orm import Session
+from app.dependencies import get_db, get_current_user, validate_token
+from app.models.user import User
+from app.services.connector_service import ConnectorService
+from app.utils.logging import logger
+from app.utils.spool import write_spool
+
+router = APIRouter(dependencies=[Depends(validate_token)])
+connector_service = ConnectorService()
+
+@router.get("/", response_model=Dict[str, Any])
+def get_spool_stats(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    authorization: str = Header(...)
+):
+    """
+    Return the size of the write spool and the lag of the user's spooled tables.
+
+    Each stream reports its appended and acknowledged offsets, the rows,
+    bytes and age of its pending segments, and its last write error.
+    """
+    logger.info(f"API: Spool stats requested by user {current_user.id}")
+    connector_ids = [str(connector.id) for connector in connector_service.get_user_connectors(current_user.id, db)]
+    return write_spool.stats(connector_ids)
@@ -4,7 +4,13 @@ import os
 from sqlalchemy.orm import Session
 from app.utils.logging import logger
 from app.models.connector import Connector
-from app.schemas.connector import ConnectorConfig, ConnectorResponse
+from app.schemas.connector import ConnectorConfig, ConnectorResponse, ConnectorUpdate
+from app.utils.cloud import s3_clients
+from app.utils.connector_cache import connector_configs
+from app.utils.clickhouse import clickhouse_pools
+from app.utils.engines import engine_registry
+from app.utils.fingerprints import fingerprint_registry
+from app.utils.file_index import file_indexes
 
 class ConnectorAgent:
 
@@ -79,6 +85,48 @@ class ConnectorAgent:
         connectors = query.all()
         return [self._convert_to_response(connector) for connector in connectors]
 
+    def update_connector(self, connector_id: str, update: ConnectorUpdate, user_id: str, db: Session) -> ConnectorResponse:
+        """
+        Update a connector and drop any cached resources built from its old config.
+        
+        Args:
+            connector_id (str): ID of the connector to update
+            update (ConnectorUpdate): Fields to update
+            user_id (str): ID of the user requesting the update
+            db (Session): Database session
+            
+        Returns:
+            ConnectorResponse: Updated connector details
+        """
+        try:
+            connector = db.query(Connector).filter(
+                Connector.id == connector_id,
+                Connector.user_id == user_id
+            ).first()
+            
+            if not connector:
+                logger.error(f"Connector {connector_id} not found or unauthorized")
+                raise ValueError("Connector not found or unauthorized")
+                
+            for field, value in update.model_dump(exclude_unset=True).items():
+                setattr(connector, field, value)
+            db.commit()
+            db.refresh(connector)
+            
+            engine_registry.invalidate(connector_id)
+            clickhouse_pools.invalidate(connector_id)
+            s3_clients.invalidate(connector_id)
+            file_indexes.invalidate(connector_id)
+            connector_configs.invalidate(connector_id)
+            fingerprint_registry.invalidate(connector_id)
+            logger.info(f"Updated connector: {connector_id}")
+            return self._convert_to_response(connector)
+            
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error updating connector: {str(e)}")
+            raise
+
     def delete_connector(self, connector_id: str, user_id: str, db: Session) -> bool:
         """
         Delete a connector.
@@ -104,6 +152,12 @@ class ConnectorAgent:
             db.delete(connector)
             db.commit()
             
+            engine_registry.invalidate(connector_id)
+            clickhouse_pools.invalidate(connector_id)
+            s3_clients.invalidate(connector_id)
+            file_indexes.invalidate(connector_id)
+            connector_configs.invalidate(connector_id)
+            fingerprint_registry.invalidate(connector_id)
             logger.info(f"Deleted connector: {connector_id}")
             return True
             
@@ -1,17 +1,106 @@
 # app/agents/reader_agent.py
+from typing import Any, Callable, Dict, Iterator, List, Optional
 import pandas as pd
-from app.db.database import get_db
+from sqlalchemy.orm import Session
+from app.db.database import SessionLocal
 from app.models.connector import Connector
+from app.utils.connector_cache import ConnectorSnapshot, connector_configs
+from app.utils.fingerprints import fingerprint_registry, source_signature
+from app.utils.line_index import read_page
 from app.utils.logging import logger
-from app.utils.readers import read_from_file, read_from_db, read_from_cloud
+from app.utils.readers import (
+    read_from_file, read_from_db, read_from_cloud,
+    read_chunks_from_file, read_chunks_from_db, read_chunks_from_cloud
+)
 import os
 
+FILE_TYPES = ["csv", "pdf", "txt", "image", "xlsx"]
+DB_TYPES = ["postgres", "mysql", "mongodb", "clickhouse", "snowflake"]
+CLOUD_TYPES = ["googledrive", "s3", "googlesheets"]
+
 class ReaderAgent:
-    def __init__(self):
-        self.db = get_db()
+    def __init__(self, db: Optional[Session] = None, session_factory: Callable[[], Session] = SessionLocal):
+        """
+        Args:
+            db: Session owned by the caller, used for connector lookups
+            session_factory: Opens a short-lived session per lookup when no session is given
+        """
+        self.db = db
+        self.session_factory = session_factory
+
+    def read_data(self, connector_id: int, selected_file: str = None, limit: Optional[int] = None,
+                  columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Read the connector data, reusing the last result while the source is unchanged.
+
+        Args:
+            connector_id: Connector to read from
+            selected_file: File under the connector directory
+            limit: Maximum number of rows
+            columns: Only read these columns
+
+        Returns:
+            The data as a DataFrame
+        """
+        connector = self._get_connector(connector_id, selected_file)
+        return fingerprint_registry.get_or_compute(
+            connector_id, selected_file or connector.file_path or "query",
+            ("read_data", limit, tuple(columns) if columns else None),
+            source_signature(connector), lambda: self._read(connector, limit, columns)
+        )
+
+    def _read(self, connector: ConnectorSnapshot, limit: Optional[int] = None,
+              columns: Optional[List[str]] = None) -> pd.DataFrame:
+        if connector.type in FILE_TYPES:
+            return read_from_file(connector, nrows=limit, columns=columns)
+        elif connector.type in DB_TYPES:
+            return read_from_db(connector, limit=limit, columns=columns)
+        elif connector.type in CLOUD_TYPES:
+            return read_from_cloud(connector, columns=columns)
+        else:
+            logger.error(f"Unsupported connector type: {connector.type}")
+            raise ValueError("Unsupported connector type")
+
+    def read_chunks(self, connector_id: int, selected_file: str = None,
+                    chunksize: Optional[int] = None, columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+        """Yield the connector data as DataFrame chunks of at most `chunksize` rows."""
+        connector = self._get_connector(connector_id, selected_file)
+
+        if connector.type in FILE_TYPES:
+            return read_chunks_from_file(connector, chunksize, columns)
+        elif connector.type in DB_TYPES:
+            return read_chunks_from_db(connector, chunksize, columns)
+        elif connector.type in CLOUD_TYPES:
+            return read_chunks_from_cloud(connector, chunksize, columns)
+        else:
+            logger.error(f"Unsupported connector type: {connector.type}")
+            raise ValueError("Unsupported connector type")
+
+    def read_page(self, connector_id: int, selected_file: str = None, page: int = 0,
+                  page_size: int = 100, columns: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Read one page of rows from a csv or txt file through its line index."""
+        connector = self._get_connector(connector_id, selected_file)
+
+        if connector.type == "csv":
+            return read_page(connector.file_path, page, page_size, columns=columns)
+        elif connector.type == "txt":
+            return read_page(connector.file_path, page, page_size, sep="\t", columns=columns)
+        else:
+            logger.error(f"Paging is not supported for connector type: {connector.type}")
+            raise ValueError("Paging is only supported for csv and txt connectors")
+
+    def _load_connector(self, connector_id: str) -> Optional[Connector]:
+        if self.db is not None:
+            return self.db.query(Connector).filter(Connector.id == connector_id).first()
+        db = self.session_factory()
+        try:
+            return db.query(Connector).filter(Connector.id == connector_id).first()
+        finally:
+            db.close()
 
-    def read_data(self, connector_id: int, selected_file: str = None) -> pd.DataFrame:
-        connector = self.db.__next__().query(Connector).filter(Connector.id == connector_id).first()
+    def _get_connector(self, connector_id: int, selected_file: str = None) -> ConnectorSnapshot:
+        # Each call gets its own copy, so setting file_path below is safe
+        connector = connector_configs.get(connector_id, self._load_connector)
         if not connector:
             logger.error(f"Connector ID {connector_id} not found.")
             raise ValueError("Connector not found.")
@@ -30,12 +119,4 @@ class ReaderAgent:
                 raise ValueError(f"File not found: {selected_file}")
             connector.file_path = full_path
 
-        if connector.type in ["csv", "pdf", "txt", "image", "xlsx"]:
-            return read_from_file(connector)
-        elif connector.type in ["postgres", "mysql", "mongodb", "clickhouse", "snowflake"]:
-            return read_from_db(connector)
-        elif connector.type in ["googledrive", "s3", "googlesheets"]:
-            return read_from_cloud(connector)
-        else:
-            logger.error(f"Unsupported connector type: {connector.type}")
-            raise ValueError("Unsupported connector type")
+        return connector
@@ -1,15 +1,95 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Callable, Optional
 import pandas as pd
-from clickhouse_driver import Client
-from app.db.database import get_db
+from sqlalchemy.orm import Session
+from app.db.database import SessionLocal
 from app.models.connector import Connector
+from app.utils.clickhouse import clickhouse_pools, write_clickhouse
+from app.utils.clickhouse_layout import create_table_sql, plan_layout
+from app.utils.connector_cache import ConnectorSnapshot, connector_configs
+from app.utils.engines import engine_registry
+from app.utils.spool import write_spool
+from app.utils.validation import REJECT, validate_frame
+from app.utils.sql_writers import create_table_from_schema, write_sql
+from app.utils.write_modes import APPEND
 from app.utils.logging import logger
 
 class WriterAgent:
-    def __init__(self):
-        self.db = get_db()
+    def __init__(self, db: Optional[Session] = None, session_factory: Callable[[], Session] = SessionLocal):
+        """
+        Args:
+            db: Session owned by the caller, used for connector lookups
+            session_factory: Opens a short-lived session per lookup when no session is given
+        """
+        self.db = db
+        self.session_factory = session_factory
+
+    def _load_connector(self, connector_id: str) -> Optional[Connector]:
+        if self.db is not None:
+            return self.db.query(Connector).filter(Connector.id == connector_id).first()
+        db = self.session_factory()
+        try:
+            return db.query(Connector).filter(Connector.id == connector_id).first()
+        finally:
+            db.close()
 
-    def write_to_clickhouse(self, connector_id: int, data: pd.DataFrame, table_name: str) -> bool:
+    def _get_connector(self, connector_id: str) -> ConnectorSnapshot:
+        connector = connector_configs.get(connector_id, self._load_connector)
+        if not connector:
+            logger.error(f"Connector ID {connector_id} not found.")
+            raise ValueError("Connector not found")
+        return connector
+
+    def write_data(self, connector_id: int, data: pd.DataFrame, table_name: str,
+                   create_table: bool = False, mode: str = APPEND, merge_keys: Optional[List[str]] = None,
+                   partition_by: Optional[str] = None, spool: bool = False,
+                   schema: Optional[Dict[str, str]] = None, on_invalid: str = REJECT,
+                   table_schema: Optional[Dict[str, str]] = None, **writer_options) -> Dict[str, Any]:
+        """
+        Write data to the destination table of any supported connector.
+
+        mode is one of append, upsert (replace rows with the same merge_keys),
+        replace-partition (replace every partition_by value the data has) and
+        replace. ClickHouse tables take their partitioning from the table, so
+        partition_by only applies when the table is created.
+
+        With spool=True the batch is appended to the write spool and written
+        in the background with retries; the report then only holds its spool
+        offset, and a slow or unavailable destination does not fail the call.
+
+        With a schema (column name to destination type) the batch is checked
+        and coerced before anything is sent. Bad rows raise
+        DataValidationError, or are dropped with on_invalid="skip"; the
+        report's "validation" entry lists them.
+
+        A table created here takes its column types from table_schema when
+        given, and from the dtypes of the data otherwise.
+
+        Returns:
+            Dict[str, Any]: Write report with totals and per-batch latency and throughput
+        """
+        connector = self._get_connector(connector_id)
+        if schema:
+            data, validation = validate_frame(data, schema, connector.type, on_invalid)
+            report = self.write_data(connector_id, data, table_name, create_table, mode, merge_keys,
+                                     partition_by, spool, table_schema=table_schema, **writer_options)
+            return {**report, "validation": validation}
+        if spool:
+            if connector.type not in ("clickhouse", "postgres", "mysql"):
+                raise ValueError(f"Unsupported destination type: {connector.type}")
+            return write_spool.append(connector_id, data, table_name, create_table, mode, merge_keys, partition_by,
+                                      table_schema=table_schema)
+        if connector.type == "clickhouse":
+            return self.bulk_write_to_clickhouse(connector_id, data, table_name, create_table, mode=mode,
+                                                 merge_keys=merge_keys, partition_by=partition_by,
+                                                 table_schema=table_schema, **writer_options)
+        if connector.type in ("postgres", "mysql"):
+            return self.write_to_sql(connector_id, data, table_name, create_table, mode=mode,
+                                     merge_keys=merge_keys, partition_by=partition_by, table_schema=table_schema)
+        logger.error(f"Writing to connector type {connector.type} is not supported")
+        raise ValueError(f"Unsupported destination type: {connector.type}")
+
+    def write_to_clickhouse(self, connector_id: int, data: pd.DataFrame, table_name: str,
+                            create_table: bool = False, **writer_options) -> bool:
         """
         Write data to ClickHouse database using the specified connector.
         
@@ -17,106 +97,116 @@ class WriterAgent:
             connector_id (int): ID of the ClickHouse connector
             data (pd.DataFrame): Data to be written
             table_name (str): Target table name in ClickHouse
+            create_table (bool): Create the table from the DataFrame dtypes if it does not exist
+            **writer_options: Batch size, worker and retry options of the bulk writer
             
         Returns:
             bool: True if write was successful, False otherwise
         """
+        self.bulk_write_to_clickhouse(connector_id, data, table_name, create_table, **writer_options)
+        return True
+
+    def bulk_write_to_clickhouse(self, connector_id: int, data: pd.DataFrame, table_name: str,
+                                 create_table: bool = False, mode: str = APPEND,
+                                 merge_keys: Optional[List[str]] = None, partition_by: Optional[str] = None,
+                                 version_column: Optional[str] = None, layout_options: Optional[Dict[str, Any]] = None,
+                                 table_schema: Optional[Dict[str, str]] = None, **writer_options) -> Dict[str, Any]:
+        """
+        Write data to ClickHouse in batches over concurrent connections.
+
+        Tables created here get a layout planned from the data (see
+        plan_layout): ReplacingMergeTrees ordered by the merge keys,
+        optionally versioned by version_column, or MergeTrees sorted and
+        partitioned by inferred keys. layout_options passes order_by,
+        time_column, filter_columns, codecs and skip_indexes to the planner;
+        table_schema overrides the column types inferred from the data.
+
+        Returns:
+            Dict[str, Any]: Write report with totals and per-batch latency and throughput
+        """
         try:
             # Get connector details
-            connector = self.db.__next__().query(Connector).filter(Connector.id == connector_id).first()
-            if not connector:
-                logger.error(f"Connector ID {connector_id} not found.")
-                raise ValueError("Connector not found")
+            connector = self._get_connector(connector_id)
 
             if connector.type != "clickhouse":
                 logger.error(f"Connector type {connector.type} is not ClickHouse")
                 raise ValueError("Invalid connector type. Expected ClickHouse")
 
-            # Parse connection details
-            connection_details = connector.connection_details
-            host = connection_details.get('host')
-            port = connection_details.get('port', 9000)
-            user = connection_details.get('user')
-            password = connection_details.get('password')
-            database = connection_details.get('database')
-
-            # Create ClickHouse client
-            client = Client(
-                host=host,
-                port=port,
-                user=user,
-                password=password,
-                database=database
-            )
-
-            # Convert DataFrame to list of dictionaries
-            data_dict = data.to_dict('records')
-            
-            # Get column names and types
-            columns = list(data.columns)
-            
-            # Prepare the insert query
-            placeholders = ', '.join(['%s'] * len(columns))
-            query = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES"
-            
-            # Execute the insert
-            client.execute(query, data_dict)
+            if create_table:
+                self.create_table_if_not_exists(connector_id, table_name, table_schema, merge_keys, partition_by,
+                                                version_column, data=data, **(layout_options or {}))
+
+            report = write_clickhouse(connector, table_name, data, mode, merge_keys, **writer_options)
             
-            logger.info(f"Successfully wrote {len(data)} rows to ClickHouse table {table_name}")
-            return True
+            logger.info(f"Successfully wrote {report['rows']} rows to ClickHouse table {table_name}")
+            return report
 
         except Exception as e:
             logger.error(f"Error writing to ClickHouse: {str(e)}")
             raise
 
-    def create_table_if_not_exists(self, connector_id: int, table_name: str, schema: Dict[str, str]) -> bool:
+    def write_to_sql(self, connector_id: int, data: pd.DataFrame, table_name: str,
+                     create_table: bool = False, mode: str = APPEND, merge_keys: Optional[List[str]] = None,
+                     partition_by: Optional[str] = None,
+                     table_schema: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        Write data to a Postgres or MySQL table.
+
+        Postgres tables are loaded with COPY FROM STDIN, MySQL tables with
+        multi-row INSERTs. Upserts use ON CONFLICT / ON DUPLICATE KEY UPDATE
+        when a unique key covers merge_keys, and delete-then-insert otherwise.
+        A table created here gets the column types of table_schema when
+        given, and the types pandas infers from the data otherwise.
+
+        Returns:
+            Dict[str, Any]: Write report with row count and throughput
+        """
+        try:
+            connector = self._get_connector(connector_id)
+            engine = engine_registry.get_engine(connector)
+            if create_table and table_schema:
+                create_table_from_schema(engine, table_name, table_schema, merge_keys)
+            report = write_sql(engine, table_name, data, mode, merge_keys, partition_by, create_table=create_table)
+            logger.info(f"Successfully wrote {report['rows']} rows to {connector.type} table {table_name}")
+            return report
+
+        except Exception as e:
+            logger.error(f"Error writing to {table_name}: {str(e)}")
+            raise
+
+    def create_table_if_not_exists(self, connector_id: int, table_name: str, schema: Optional[Dict[str, str]],
+                                   merge_keys: Optional[List[str]] = None, partition_by: Optional[str] = None,
+                                   version_column: Optional[str] = None, data: Optional[pd.DataFrame] = None,
+                                   **layout_options) -> bool:
         """
         Create a table in ClickHouse if it doesn't exist.
         
         Args:
             connector_id (int): ID of the ClickHouse connector
             table_name (str): Name of the table to create
-            schema (Dict[str, str]): Dictionary mapping column names to ClickHouse data types
+            schema (Dict[str, str]): Dictionary mapping column names to ClickHouse data types; inferred from data if None
+            merge_keys (List[str]): Order a ReplacingMergeTree by these columns, for upserts
+            partition_by (str): Partition expression, for replace-partition writes
+            version_column (str): Column deciding which row of a key is kept
+            data (pd.DataFrame): Rows to infer column types, sorting key and partitioning from
+            **layout_options: order_by, time_column, filter_columns, codecs and skip_indexes of plan_layout
             
         Returns:
             bool: True if table was created or already exists, False otherwise
         """
         try:
             # Get connector details
-            connector = self.db.__next__().query(Connector).filter(Connector.id == connector_id).first()
-            if not connector:
-                logger.error(f"Connector ID {connector_id} not found.")
-                raise ValueError("Connector not found")
-
-            # Parse connection details
-            connection_details = connector.connection_details
-            host = connection_details.get('host')
-            port = connection_details.get('port', 9000)
-            user = connection_details.get('user')
-            password = connection_details.get('password')
-            database = connection_details.get('database')
-
-            # Create ClickHouse client
-            client = Client(
-                host=host,
-                port=port,
-                user=user,
-                password=password,
-                database=database
-            )
-
-            # Prepare column definitions
-            column_definitions = [f"{col} {dtype}" for col, dtype in schema.items()]
-            create_table_query = f"""
-                CREATE TABLE IF NOT EXISTS {table_name} (
-                    {', '.join(column_definitions)}
-                ) ENGINE = MergeTree()
-                ORDER BY tuple()
-            """
-
-            # Execute the create table query
-            client.execute(create_table_query)
-            logger.info(f"Successfully created or verified table {table_name}")
+            connector = self._get_connector(connector_id)
+
+            layout = plan_layout(data, schema, merge_keys, partition_by=partition_by,
+                                 version_column=version_column, **layout_options)
+            create_table_query = create_table_sql(table_name, layout)
+
+            # Execute the create table query on a pooled client
+            with clickhouse_pools.client(connector) as client:
+                client.execute(create_table_query)
+            logger.info(f"Successfully created or verified table {table_name} "
+                        f"ORDER BY {layout['order_by']} PARTITION BY {layout['partition_by']}")
             return True
 
         except Exception as e:
@@ -36,6 +36,80 @@ class Settings(BaseSettings):
     
     # CORS
     CORS_ORIGINS: list = ["http://localhost:3000"]
+
+    # Source Database Engine Settings
+    READER_ENGINE_POOL_SIZE: int = int(os.getenv("READER_ENGINE_POOL_SIZE", "5"))
+    READER_ENGINE_MAX_OVERFLOW: int = int(os.getenv("READER_ENGINE_MAX_OVERFLOW", "5"))
+    READER_ENGINE_POOL_RECYCLE: int = int(os.getenv("READER_ENGINE_POOL_RECYCLE", "1800"))
+    READER_ENGINE_IDLE_TIMEOUT: int = int(os.getenv("READER_ENGINE_IDLE_TIMEOUT", "900"))
+    READER_ENGINE_MAX_ENGINES: int = int(os.getenv("READER_ENGINE_MAX_ENGINES", "50"))
+
+    # Chunked Read Settings
+    READER_CHUNK_SIZE: int = int(os.getenv("READER_CHUNK_SIZE", "50000"))
+    READER_PARTITIONS: int = int(os.getenv("READER_PARTITIONS", "8"))
+    READER_PARALLEL_WORKERS: int = int(os.getenv("READER_PARALLEL_WORKERS", "4"))
+    READER_PG_COPY: bool = os.getenv("READER_PG_COPY", "true").lower() == "true"
+    READER_CACHE_DIR: str = os.getenv("READER_CACHE_DIR", ".cache/readers")
+    LINE_INDEX_EVERY: int = int(os.getenv("LINE_INDEX_EVERY", "1000"))
+
+    # S3 Read Settings
+    S3_MAX_POOL_CONNECTIONS: int = int(os.getenv("S3_MAX_POOL_CONNECTIONS", "32"))
+    S3_READ_WORKERS: int = int(os.getenv("S3_READ_WORKERS", "8"))
+    S3_RANGE_THRESHOLD: int = int(os.getenv("S3_RANGE_THRESHOLD", str(64 * 1024 * 1024)))
+    S3_PART_SIZE: int = int(os.getenv("S3_PART_SIZE", str(8 * 1024 * 1024)))
+    S3_PREFETCH_PARTS: int = int(os.getenv("S3_PREFETCH_PARTS", "4"))
+
+    # Image Pipeline Settings
+    IMAGE_WORKERS: int = int(os.getenv("IMAGE_WORKERS", "4"))
+    IMAGE_THUMBNAIL_SIZE: int = int(os.getenv("IMAGE_THUMBNAIL_SIZE", "256"))
+    IMAGE_HASH_DISTANCE: int = int(os.getenv("IMAGE_HASH_DISTANCE", "4"))
+
+    # Source Fingerprint Settings
+    FINGERPRINT_SAMPLE_HASH: bool = os.getenv("FINGERPRINT_SAMPLE_HASH", "false").lower() == "true"
+    FINGERPRINT_CACHE_MAX_ENTRIES: int = int(os.getenv("FINGERPRINT_CACHE_MAX_ENTRIES", "256"))
+    FINGERPRINT_CACHE_MAX_ROWS: int = int(os.getenv("FINGERPRINT_CACHE_MAX_ROWS", "100000"))
+    FINGERPRINT_CACHE_MAX_BYTES: int = int(os.getenv("FINGERPRINT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+    # Connector Lookup Cache Settings
+    CONNECTOR_CACHE_TTL: int = int(os.getenv("CONNECTOR_CACHE_TTL", "60"))
+    CONNECTOR_CACHE_MAX_ENTRIES: int = int(os.getenv("CONNECTOR_CACHE_MAX_ENTRIES", "1000"))
+
+    # Background Read Job Settings
+    READ_JOB_WORKERS: int = int(os.getenv("READ_JOB_WORKERS", "2"))
+    READ_JOB_PROGRESS_INTERVAL: float = float(os.getenv("READ_JOB_PROGRESS_INTERVAL", "1.0"))
+
+    # SQL Destination Settings
+    PG_COPY_ROWS_PER_PART: int = int(os.getenv("PG_COPY_ROWS_PER_PART", "10000"))
+    MYSQL_INSERT_BATCH_ROWS: int = int(os.getenv("MYSQL_INSERT_BATCH_ROWS", "1000"))
+
+    # Copy Pipeline Settings
+    COPY_JOB_WORKERS: int = int(os.getenv("COPY_JOB_WORKERS", "2"))
+    COPY_QUEUE_CHUNKS: int = int(os.getenv("COPY_QUEUE_CHUNKS", "4"))
+
+    # Ingest Settings
+    INGEST_CHUNK_ROWS: int = int(os.getenv("INGEST_CHUNK_ROWS", "50000"))
+    INGEST_QUEUE_PARTS: int = int(os.getenv("INGEST_QUEUE_PARTS", "64"))
+
+    # ClickHouse Client Pool Settings
+    CLICKHOUSE_POOL_MAX_SIZE: int = int(os.getenv("CLICKHOUSE_POOL_MAX_SIZE", "8"))
+    CLICKHOUSE_POOL_TIMEOUT: float = float(os.getenv("CLICKHOUSE_POOL_TIMEOUT", "30"))
+    CLICKHOUSE_POOL_IDLE_TIMEOUT: float = float(os.getenv("CLICKHOUSE_POOL_IDLE_TIMEOUT", "300"))
+    CLICKHOUSE_POOL_PING_INTERVAL: float = float(os.getenv("CLICKHOUSE_POOL_PING_INTERVAL", "30"))
+
+    # Bulk Write Settings
+    BULK_WRITE_WORKERS: int = int(os.getenv("BULK_WRITE_WORKERS", "4"))
+    BULK_WRITE_BATCH_ROWS: int = int(os.getenv("BULK_WRITE_BATCH_ROWS", "100000"))
+    BULK_WRITE_BATCH_BYTES: int = int(os.getenv("BULK_WRITE_BATCH_BYTES", str(64 * 1024 * 1024)))
+    BULK_WRITE_MAX_RETRIES: int = int(os.getenv("BULK_WRITE_MAX_RETRIES", "3"))
+    BULK_WRITE_RETRY_BACKOFF: float = float(os.getenv("BULK_WRITE_RETRY_BACKOFF", "0.5"))
+
+    # Write Spool Settings
+    SPOOL_DIR: str = os.getenv("SPOOL_DIR", ".cache/spool")
+    SPOOL_MAX_BYTES: int = int(os.getenv("SPOOL_MAX_BYTES", str(1024 * 1024 * 1024)))
+    SPOOL_BACKPRESSURE_TIMEOUT: float = float(os.getenv("SPOOL_BACKPRESSURE_TIMEOUT", "30"))
+    SPOOL_MAX_ATTEMPTS: int = int(os.getenv("SPOOL_MAX_ATTEMPTS", "20"))
+    SPOOL_RETRY_BACKOFF: float = float(os.getenv("SPOOL_RETRY_BACKOFF", "1.0"))
+    SPOOL_RETRY_MAX_BACKOFF: float = float(os.getenv("SPOOL_RETRY_MAX_BACKOFF", "60"))
     
     class Config:
         case_sensitive = True
@@ -3,3 +3,5 @@ from app.models.request_log import RequestLog
 from app.models.connector import Connector
 from app.models.dataset import Dataset
 from app.models.dataset import Transformation
+from app.models.read_job import ReadJob
+from app.models.copy_job import CopyJob
@@ -2,12 +2,19 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.middleware.rbac import RBACMiddleware
 from app.middleware.auth import AuthMiddleware
-from app.api.routes import auth, connector, dataset, llm, reader
+from app.api.routes import auth, connector, copy_jobs, dataset, llm, reader, spool
 from app.core.config import settings
-from app.db.database import engine, Base
+from app.db.database import engine, Base, SessionLocal
 from contextlib import asynccontextmanager
 from app.utils.logging import logger
 from app.core.api_logs import APILoggingMiddleware
+from app.utils.clickhouse import clickhouse_pools
+from app.utils.engines import engine_registry
+from app.utils.spool import write_spool
+from app.core.agents.writer_agent import WriterAgent
+from app.services.copy_job_service import CopyJobService, copy_job_executor
+from app.services.read_job_service import ReadJobService, read_job_executor
+from app.utils.images import shutdown_executor as shutdown_image_executor
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -16,12 +23,25 @@ async def lifespan(app: FastAPI):
     # Create database tables if they don't exist
     Base.metadata.create_all(bind=engine)
     logger.info("Database tables created/verified")
+    db = SessionLocal()
+    try:
+        ReadJobService(db).fail_interrupted()
+        CopyJobService(db).fail_interrupted()
+    finally:
+        db.close()
+    # Drain batches spooled before the last shutdown; lookups use short-lived sessions
+    write_spool.start(WriterAgent().write_data)
     
     yield
     
     # Shutdown
     logger.info("Shutting down application...")
-    # Add any cleanup code here if needed
+    read_job_executor.shutdown(wait=False, cancel_futures=True)
+    copy_job_executor.shutdown(wait=False, cancel_futures=True)
+    write_spool.stop()
+    shutdown_image_executor()
+    engine_registry.dispose_all()
+    clickhouse_pools.dispose_all()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -52,6 +72,8 @@ app.include_router(connector.router, prefix="/api/v1/connectors", tags=["connect
 app.include_router(dataset.router, prefix="/api/v1/datasets", tags=["datasets"])
 app.include_router(llm.router, prefix="/api/v1/llms", tags=["llms"])
 app.include_router(reader.router, prefix="/api/v1/readers", tags=["readers"])
+app.include_router(copy_jobs.router, prefix="/api/v1/copy-jobs", tags=["copy-jobs"])
+app.include_router(spool.router, prefix="/api/v1/spool", tags=["spool"])
 
 @app.get("/")
 async def root():
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, BigInteger, Boolean, String, Text, JSON, ForeignKey, DateTime
+from app.db.database import Base
+from datetime import datetime
+
+class CopyJob(Base):
+    """Streaming copy from a source connector into a destination table, resumable by chunk."""
+    __tablename__ = "copy_jobs"
+
+    id = Column(String, primary_key=True, index=True)
+    source_connector_id = Column(String, ForeignKey("connectors.id", ondelete="CASCADE"), nullable=False, index=True)
+    destination_connector_id = Column(String, ForeignKey("connectors.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    status = Column(String, nullable=False, default="pending")  # pending, running, completed, failed, cancelled
+    selected_file = Column(Text, nullable=True)
+    table_name = Column(String, nullable=False)
+    columns = Column(JSON, nullable=True)
+    chunksize = Column(Integer, nullable=False)
+    create_table = Column(Boolean, nullable=False, default=False)
+    write_mode = Column(String, nullable=False, default="append")  # append or upsert
+    merge_keys = Column(JSON, nullable=True)
+    chunks_committed = Column(Integer, nullable=False, default=0)  # Chunks written; a resume starts after them
+    rows_written = Column(BigInteger, nullable=False, default=0)
+    metrics = Column(JSON, nullable=True)  # Throughput and stage timings of the last run
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, BigInteger, String, Text, JSON, ForeignKey, DateTime
+from app.db.database import Base
+from datetime import datetime
+
+class ReadJob(Base):
+    """Background read of connector files, with its progress and result summary."""
+    __tablename__ = "read_jobs"
+
+    id = Column(String, primary_key=True, index=True)
+    connector_id = Column(String, ForeignKey("connectors.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    status = Column(String, nullable=False, default="pending")  # pending, running, completed, failed, cancelled
+    files = Column(JSON, nullable=False, default=[])
+    limit = Column(Integer, nullable=True)
+    columns = Column(JSON, nullable=True)
+    files_total = Column(Integer, nullable=False, default=0)
+    files_done = Column(Integer, nullable=False, default=0)
+    rows_read = Column(BigInteger, nullable=False, default=0)
+    bytes_total = Column(BigInteger, nullable=False, default=0)
+    bytes_read = Column(BigInteger, nullable=False, default=0)
+    result = Column(JSON, nullable=True)  # Per-file row counts and columns
+    result_path = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
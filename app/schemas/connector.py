@@ -143,3 +143,14 @@ class WriteRequest(BaseModel):
     table_name: str
     data: List[Dict[str, Any]]  # List of records to write
     table_schema: Optional[Dict[str, str]] = None  # Optional schema definition for creating table
+    mode: str = "append"  # append, upsert, replace-partition or replace
+    merge_keys: Optional[List[str]] = None  # Columns identifying a row, for upserts
+    partition_by: Optional[str] = None  # Partition column (ClickHouse: expression), for replace-partition
+    version_column: Optional[str] = None  # ClickHouse: column deciding which row of a key is kept
+    order_by: Optional[List[str]] = None  # ClickHouse: sorting key of a created table; inferred if not given
+    time_column: Optional[str] = None  # ClickHouse: time column to sort and partition a created table by
+    filter_columns: Optional[List[str]] = None  # ClickHouse: columns queries filter on, for the sorting key and skip indexes
+    codecs: bool = False  # ClickHouse: add compression codecs suited to each column type
+    skip_indexes: bool = False  # ClickHouse: add skip indexes on filter columns outside the sorting key
+    spool: bool = False  # Accept the rows into the write spool and write them in the background
+    on_invalid: str = "reject"  # Rows not matching table_schema: reject the request or skip the rows
@@ -0,0 +1,37 @@
+from typing import Dict, Any, Optional, List
+from pydantic import BaseModel, Field
+from datetime import datetime
+
+class CopyJobCreate(BaseModel):
+    source_connector_id: str
+    destination_connector_id: str
+    table_name: str
+    selected_file: Optional[str] = None  # File under the source connector directory
+    columns: Optional[List[str]] = None
+    chunksize: Optional[int] = Field(None, ge=1)
+    create_table: bool = False  # Create the destination table from the first chunk
+    write_mode: str = "append"  # append or upsert; both are safe to apply chunk by chunk
+    merge_keys: Optional[List[str]] = None  # Columns identifying a row, for upserts
+
+class CopyJobResponse(BaseModel):
+    id: str
+    source_connector_id: str
+    destination_connector_id: str
+    status: str
+    selected_file: Optional[str] = None
+    table_name: str
+    columns: Optional[List[str]] = None
+    chunksize: int
+    create_table: bool
+    write_mode: str
+    merge_keys: Optional[List[str]] = None
+    chunks_committed: int
+    rows_written: int
+    metrics: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,24 @@
+from typing import Dict, Any, Optional, List
+from pydantic import BaseModel
+from datetime import datetime
+
+class ReadJobResponse(BaseModel):
+    id: str
+    connector_id: str
+    status: str
+    files: List[str]
+    limit: Optional[int] = None
+    columns: Optional[List[str]] = None
+    files_total: int
+    files_done: int
+    rows_read: int
+    bytes_total: int
+    bytes_read: int
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
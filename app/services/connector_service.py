@@ -1,9 +1,22 @@
 from sqlalchemy.orm import Session
 from app.core.agents.connector_agent import ConnectorAgent
-from app.schemas.connector import ConnectorConfig, ConnectorResponse, WriteRequest
+from app.core.agents.writer_agent import WriterAgent
+from app.models.connector import Connector
+from app.schemas.connector import ConnectorConfig, ConnectorResponse, ConnectorUpdate, WriteRequest
 from app.utils.logging import logger
 from typing import List, Dict, Any, Optional
 from clickhouse_driver import Client
+from app.utils.bulk_writer import BulkWriteError
+from app.utils.clickhouse import clickhouse_pools, write_clickhouse
+from app.utils.clickhouse_layout import create_table_sql, plan_layout
+from app.utils.connector_cache import ConnectorSnapshot, connector_configs
+from app.utils.engines import engine_registry
+from app.utils.sql_writers import create_table_from_schema, write_sql
+from app.utils.write_modes import APPEND, CHUNKABLE_MODES
+from app.utils.ingest import BodyStream, IngestError, iter_ingest_frames
+from app.utils.pipeline import stream_copy
+from app.utils.spool import write_spool
+from app.utils.validation import DataValidationError, validate_frame
 import pandas as pd
 import os
 
@@ -43,6 +56,10 @@ class ConnectorService:
         logger.info(f"Service: Retrieving connectors for user {user_id}")
         return self.agent.get_user_connectors(user_id, db, connector_type)
 
+    def update_connector(self, connector_id: str, update: ConnectorUpdate, user_id: str, db: Session) -> ConnectorResponse:
+        logger.info(f"Service: Updating connector {connector_id} for user {user_id}")
+        return self.agent.update_connector(connector_id, update, user_id, db)
+
     def delete_connector(self, connector_id: str, user_id: str, db: Session) -> bool:
         logger.info(f"Service: Deleting connector {connector_id} for user {user_id}")
         return self.agent.delete_connector(connector_id, user_id, db)
@@ -83,16 +100,9 @@ class ConnectorService:
     def _test_clickhouse_connection(self, connector: ConnectorResponse) -> Dict[str, Any]:
         """Test connection to ClickHouse database."""
         try:
-            client = Client(
-                host=connector.connection_details["host"],
-                port=connector.connection_details["port"],
-                user=connector.connection_details["user"],
-                password=connector.connection_details["password"],
-                database=connector.connection_details["database"]
-            )
-            
-            # Test connection by executing a simple query
-            result = client.execute("SELECT 1")
+            # Test connection by executing a simple query on a pooled client
+            with clickhouse_pools.client(connector) as client:
+                result = client.execute("SELECT 1")
             
             return {
                 "success": True,
@@ -162,23 +172,50 @@ class ConnectorService:
             Dict[str, Any]: Write operation results
         """
         try:
-            # Get the connector
-            connector = self.get_connector(request.connector_id, user_id, db)
-            
-            # Verify it's a destination connector
-            if connector.connector_type != "destination":
-                raise ValueError("Can only write to destination connectors")
+            # Get the destination connector
+            connector = self._get_destination(request.connector_id, user_id, db)
             
             # Convert data to DataFrame
             df = pd.DataFrame(request.data)
             
+            # Check and coerce the rows against the declared column types before sending any
+            validation = None
+            if request.table_schema:
+                try:
+                    df, validation = validate_frame(df, request.table_schema, connector.type, request.on_invalid)
+                except DataValidationError as e:
+                    logger.warning(f"Rejected write to {request.table_name}: {e}")
+                    return {
+                        "success": False,
+                        "error": str(e),
+                        "connector_id": request.connector_id,
+                        "table_name": request.table_name,
+                        "validation": e.report
+                    }
+            
+            # Spooled writes return once the rows are on local disk
+            if request.spool:
+                return {
+                    "success": True,
+                    "table_name": request.table_name,
+                    "validation": validation,
+                    **write_spool.append(request.connector_id, df, request.table_name,
+                                         bool(request.table_schema), request.mode,
+                                         request.merge_keys, request.partition_by,
+                                         table_schema=request.table_schema)
+                }
+
             # Handle different connector types
             if connector.type == "clickhouse":
-                return self._write_to_clickhouse(connector, request.table_name, df, request.table_schema)
+                result = self._write_to_clickhouse(connector, request.table_name, df, request.table_schema,
+                                                   request.mode, request.merge_keys, request.partition_by,
+                                                   request.version_column, self._layout_options(request))
             elif connector.type in ["postgres", "mysql"]:
-                return self._write_to_sql(connector, request.table_name, df, request.table_schema)
+                result = self._write_to_sql(connector, request.table_name, df, request.table_schema,
+                                            request.mode, request.merge_keys, request.partition_by)
             else:
                 raise ValueError(f"Unsupported destination type: {connector.type}")
+            return {**result, "validation": validation}
                 
         except Exception as e:
             logger.error(f"Error writing data: {str(e)}")
@@ -189,41 +226,114 @@ class ConnectorService:
                 "table_name": request.table_name
             }
 
+    def ingest(self, connector_id: str, user_id: str, db: Session, body: BodyStream, media_type: str,
+               table_name: str, mode: str = APPEND, merge_keys: Optional[List[str]] = None,
+               partition_by: Optional[str] = None, create_table: bool = False,
+               chunksize: Optional[int] = None, spool: bool = False) -> Dict[str, Any]:
+        """
+        Write a streamed request body to a destination table chunk by chunk.
+
+        The body is parsed in a background thread while the previous chunk
+        is written, so memory is bounded by a few chunks and the buffered
+        request parts whatever the size of the upload. Each chunk is
+        written as it is parsed, so a failed ingest leaves the chunks
+        before it written; they are counted in the IngestError raised.
+
+        Args:
+            body (BodyStream): Request body, fed by the route while this runs in a worker thread
+            media_type (str): NDJSON, CSV or Arrow IPC stream
+            mode (str): append or upsert; the modes replacing data cannot run chunk by chunk
+            create_table (bool): Create the table from the first chunk if it does not exist
+            spool (bool): Accept chunks into the write spool instead of waiting for the destination
+
+        Returns:
+            Dict[str, Any]: Rows written, bytes read and pipeline throughput
+        """
+        try:
+            self._get_destination(connector_id, user_id, db)
+            if mode not in CHUNKABLE_MODES:
+                raise ValueError(f"Ingests can only write in modes {CHUNKABLE_MODES}")
+
+            writer_agent = WriterAgent(db)
+            table_created = not create_table
+            written = {"rows_written": 0, "chunks_written": 0}
+
+            def write(frame: pd.DataFrame) -> None:
+                nonlocal table_created
+                writer_agent.write_data(connector_id, frame, table_name, create_table=not table_created,
+                                        mode=mode, merge_keys=merge_keys, partition_by=partition_by,
+                                        spool=spool)
+                table_created = True
+
+            def commit(number: int, rows: int) -> None:
+                written["chunks_written"] = number + 1
+                written["rows_written"] += rows
+
+            try:
+                stats = stream_copy(iter_ingest_frames(body, media_type, chunksize), write, on_commit=commit)
+            except Exception as e:
+                logger.error(f"Ingest into {table_name} failed after {written['rows_written']} rows: {e}")
+                raise IngestError(str(e), {**written, "bytes_read": body.bytes_read}) from e
+
+            logger.info(f"Ingested {written['rows_written']} rows ({body.bytes_read} bytes of {media_type}) into {table_name}")
+            return {
+                "success": True,
+                "rows_written": written["rows_written"],
+                "chunks_written": written["chunks_written"],
+                "spooled": spool,
+                "table_name": table_name,
+                "metrics": {**stats, "bytes_read": body.bytes_read}
+            }
+        finally:
+            # Stops the route feeding a body nobody reads any more
+            body.close()
+
+    def _get_destination(self, connector_id: str, user_id: int, db: Session) -> ConnectorSnapshot:
+        """Resolve a destination connector of the user through the connector cache, as the writer agent does."""
+        connector = connector_configs.get(
+            connector_id, lambda key: db.query(Connector).filter(Connector.id == key).first()
+        )
+        if not connector:
+            logger.error(f"Connector ID {connector_id} not found.")
+            raise ValueError("Connector not found")
+        if connector.user_id != user_id:
+            logger.warning(f"Unauthorized access to connector {connector_id} by user {user_id}")
+            raise PermissionError("Unauthorized access")
+        if connector.connector_type != "destination":
+            raise ValueError("Can only write to destination connectors")
+        return connector
+
     def _write_to_clickhouse(self, connector: ConnectorResponse, table_name: str, 
-                           data: pd.DataFrame, table_schema: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+                           data: pd.DataFrame, table_schema: Optional[Dict[str, str]] = None,
+                           mode: str = APPEND, merge_keys: Optional[List[str]] = None,
+                           partition_by: Optional[str] = None, version_column: Optional[str] = None,
+                           layout_options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Write data to ClickHouse database."""
         try:
-            client = Client(
-                host=connector.connection_details["host"],
-                port=connector.connection_details["port"],
-                user=connector.connection_details["user"],
-                password=connector.connection_details["password"],
-                database=connector.connection_details["database"]
-            )
-            
             # Create table if schema is provided
             if table_schema:
-                self._create_clickhouse_table(client, table_name, table_schema)
-            
-            # Convert DataFrame to list of dictionaries
-            data_dict = data.to_dict('records')
-            
-            # Get column names
-            columns = list(data.columns)
+                with clickhouse_pools.client(connector) as client:
+                    self._create_clickhouse_table(client, table_name, table_schema, merge_keys, partition_by,
+                                                  version_column, data, layout_options)
             
-            # Prepare the insert query
-            query = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES"
-            
-            # Execute the insert
-            client.execute(query, data_dict)
+            report = write_clickhouse(connector, table_name, data, mode, merge_keys)
             
             return {
                 "success": True,
-                "message": f"Successfully wrote {len(data)} rows to ClickHouse table {table_name}",
-                "rows_written": len(data),
-                "table_name": table_name
+                "message": f"Successfully wrote {report['rows']} rows to ClickHouse table {table_name}",
+                "rows_written": report["rows"],
+                "table_name": table_name,
+                "metrics": report
             }
             
+        except BulkWriteError as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "rows_written": e.report["rows"],
+                "table_name": table_name,
+                "metrics": e.report
+            }
         except Exception as e:
             return {
                 "success": False,
@@ -231,28 +341,51 @@ class ConnectorService:
                 "table_name": table_name
             }
 
-    def _create_clickhouse_table(self, client: Client, table_name: str, table_schema: Dict[str, str]) -> None:
-        """Create a table in ClickHouse if it doesn't exist."""
-        column_definitions = [f"{col} {dtype}" for col, dtype in table_schema.items()]
-        create_table_query = f"""
-            CREATE TABLE IF NOT EXISTS {table_name} (
-                {', '.join(column_definitions)}
-            ) ENGINE = MergeTree()
-            ORDER BY tuple()
+    def _create_clickhouse_table(self, client: Client, table_name: str, table_schema: Dict[str, str],
+                                 merge_keys: Optional[List[str]] = None, partition_by: Optional[str] = None,
+                                 version_column: Optional[str] = None, data: Optional[pd.DataFrame] = None,
+                                 layout_options: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Create a table in ClickHouse if it doesn't exist.
+
+        Column types come from the schema; the sorting key, partitioning,
+        codecs and skip indexes are planned from the declared keys and the data.
         """
-        client.execute(create_table_query)
+        layout = plan_layout(data, table_schema, merge_keys, partition_by=partition_by,
+                             version_column=version_column, **(layout_options or {}))
+        client.execute(create_table_sql(table_name, layout))
+
+    @staticmethod
+    def _layout_options(request: WriteRequest) -> Dict[str, Any]:
+        return {
+            "order_by": request.order_by,
+            "time_column": request.time_column,
+            "filter_columns": request.filter_columns,
+            "codecs": request.codecs,
+            "skip_indexes": request.skip_indexes,
+        }
 
     def _write_to_sql(self, connector: ConnectorResponse, table_name: str, 
-                     data: pd.DataFrame, table_schema: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+                     data: pd.DataFrame, table_schema: Optional[Dict[str, str]] = None,
+                     mode: str = APPEND, merge_keys: Optional[List[str]] = None,
+                     partition_by: Optional[str] = None) -> Dict[str, Any]:
         """Write data to SQL databases (PostgreSQL, MySQL)."""
         try:
-            # Implementation for SQL databases
-            # This is a placeholder - implement based on your SQL connection needs
+            engine = engine_registry.get_engine(connector)
+            
+            # Create table if schema is provided, otherwise from the DataFrame dtypes
+            if table_schema:
+                create_table_from_schema(engine, table_name, table_schema, merge_keys)
+            
+            # COPY FROM STDIN for Postgres, multi-row INSERTs for MySQL
+            report = write_sql(engine, table_name, data, mode, merge_keys, partition_by)
+            
             return {
                 "success": True,
-                "message": f"Successfully wrote {len(data)} rows to {connector.type} table {table_name}",
-                "rows_written": len(data),
-                "table_name": table_name
+                "message": f"Successfully wrote {report['rows']} rows to {connector.type} table {table_name}",
+                "rows_written": report["rows"],
+                "table_name": table_name,
+                "metrics": report
             }
         except Exception as e:
             return {
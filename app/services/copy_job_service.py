@@ -0,0 +1,194 @@
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from app.core.agents.reader_agent import ReaderAgent
+from app.core.agents.writer_agent import WriterAgent
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.copy_job import CopyJob
+from app.utils.logging import logger
+from app.utils.pipeline import stream_copy
+from app.utils.write_modes import APPEND, CHUNKABLE_MODES, validate_write_mode
+
+ACTIVE_STATUSES = ("pending", "running")
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+RESUMABLE_STATUSES = ("failed", "cancelled")
+
+# Copies run here rather than in the request; copies still running at
+# shutdown are marked failed on the next startup and can be resumed
+copy_job_executor = ThreadPoolExecutor(max_workers=settings.COPY_JOB_WORKERS, thread_name_prefix="copy-job")
+
+
+class CopyCancelled(Exception):
+    pass
+
+
+class CopyJobService:
+    """Service for streaming copies from a source connector into a destination table."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create_job(self, source_connector_id: str, destination_connector_id: str, user_id: int,
+                   table_name: str, selected_file: Optional[str] = None, columns: Optional[List[str]] = None,
+                   chunksize: Optional[int] = None, create_table: bool = False,
+                   write_mode: str = APPEND, merge_keys: Optional[List[str]] = None) -> CopyJob:
+        """
+        Record a copy job and queue it on the worker pool.
+
+        Args:
+            source_connector_id: Connector to read from
+            destination_connector_id: Connector to write to
+            user_id: Owner of the job
+            table_name: Destination table
+            selected_file: File under the source connector directory
+            columns: Only copy these columns
+            chunksize: Rows per chunk; fixed for the job so a resume skips whole chunks
+            create_table: Create the destination table from the first chunk
+            write_mode: append or upsert; modes replacing whole tables or partitions cannot run by chunk
+            merge_keys: Columns identifying a row, for upserts
+
+        Returns:
+            The pending job
+        """
+        if write_mode not in CHUNKABLE_MODES:
+            raise ValueError(f"Copy jobs can only write in modes {CHUNKABLE_MODES}")
+        validate_write_mode(write_mode, merge_keys, columns=columns)
+        job = CopyJob(
+            id=str(uuid.uuid4()),
+            source_connector_id=source_connector_id,
+            destination_connector_id=destination_connector_id,
+            user_id=user_id,
+            status="pending",
+            selected_file=selected_file,
+            table_name=table_name,
+            columns=columns,
+            chunksize=chunksize or settings.READER_CHUNK_SIZE,
+            create_table=create_table,
+            write_mode=write_mode,
+            merge_keys=merge_keys,
+            chunks_committed=0,
+            rows_written=0
+        )
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+
+        copy_job_executor.submit(run_copy_job, job.id)
+        logger.info(f"Queued copy job {job.id} from connector {source_connector_id} to {destination_connector_id}.{table_name}")
+        return job
+
+    def get_job(self, job_id: str, user_id: int) -> Optional[CopyJob]:
+        return self.db.query(CopyJob).filter(CopyJob.id == job_id, CopyJob.user_id == user_id).first()
+
+    def resume_job(self, job: CopyJob) -> CopyJob:
+        """Queue a failed or cancelled job again; it continues after its last committed chunk."""
+        if job.status not in RESUMABLE_STATUSES:
+            raise ValueError(f"Only failed or cancelled jobs can be resumed, job is {job.status}")
+        job.status = "pending"
+        job.error = None
+        job.finished_at = None
+        self.db.commit()
+        self.db.refresh(job)
+
+        copy_job_executor.submit(run_copy_job, job.id)
+        logger.info(f"Resuming copy job {job.id} after chunk {job.chunks_committed}")
+        return job
+
+    def cancel_job(self, job: CopyJob) -> CopyJob:
+        """Ask a pending or running job to stop; the worker stops after its current chunk."""
+        if job.status in ACTIVE_STATUSES:
+            job.status = "cancelled"
+            job.finished_at = datetime.utcnow()
+            self.db.commit()
+            self.db.refresh(job)
+            logger.info(f"Cancelled copy job {job.id}")
+        return job
+
+    def delete_job(self, job: CopyJob) -> None:
+        self.db.delete(job)
+        self.db.commit()
+        logger.info(f"Deleted copy job {job.id}")
+
+    def fail_interrupted(self) -> int:
+        """Mark jobs left pending or running by a previous process as failed, so they can be resumed."""
+        count = self.db.query(CopyJob).filter(CopyJob.status.in_(ACTIVE_STATUSES)).update(
+            {"status": "failed", "error": "Interrupted by server restart", "finished_at": datetime.utcnow()},
+            synchronize_session=False
+        )
+        self.db.commit()
+        if count:
+            logger.warning(f"Marked {count} interrupted copy jobs as failed")
+        return count
+
+
+def run_copy_job(job_id: str) -> None:
+    """
+    Stream a job's source into its destination table chunk by chunk.
+
+    The source is read in a background thread while chunks are written, so
+    memory stays bounded by COPY_QUEUE_CHUNKS chunks. The chunk count and
+    row count are committed after every written chunk, and a resumed job
+    skips the chunks committed before. Rows of a chunk written just before
+    a crash, but not yet committed, are written again on resume, so resumed
+    copies are at-least-once for that one chunk; upserts make them
+    effectively exactly-once.
+    """
+    db = SessionLocal()
+    try:
+        job = db.query(CopyJob).filter(CopyJob.id == job_id).first()
+        if not job or job.status != "pending":
+            return
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        db.commit()
+
+        reader_agent = ReaderAgent(db)
+        writer_agent = WriterAgent(db)
+        table_created = not job.create_table
+
+        def write(frame) -> None:
+            nonlocal table_created
+            writer_agent.write_data(job.destination_connector_id, frame, job.table_name,
+                                    create_table=not table_created, mode=job.write_mode,
+                                    merge_keys=job.merge_keys)
+            table_created = True
+
+        def commit(number: int, rows: int) -> None:
+            # Only changed columns are written, so a concurrent cancel is not overwritten
+            job.chunks_committed = number + 1
+            job.rows_written += rows
+            db.commit()
+            if job.status == "cancelled":
+                raise CopyCancelled()
+
+        chunks = reader_agent.read_chunks(job.source_connector_id, job.selected_file,
+                                          chunksize=job.chunksize, columns=job.columns)
+        stats = stream_copy(chunks, write, skip_chunks=job.chunks_committed, on_commit=commit)
+
+        # Only a job still running is completed, so a cancel during the last chunk is kept
+        completed = db.query(CopyJob).filter(CopyJob.id == job_id, CopyJob.status == "running").update(
+            {"status": "completed", "metrics": stats, "finished_at": datetime.utcnow()},
+            synchronize_session=False
+        )
+        db.commit()
+        if not completed:
+            logger.info(f"Copy job {job_id} was cancelled before it completed")
+            return
+        logger.info(f"Copy job {job_id} completed with {job.rows_written} rows")
+
+    except CopyCancelled:
+        logger.info(f"Copy job {job_id} stopped after cancellation at chunk {job.chunks_committed}")
+    except Exception as e:
+        logger.error(f"Copy job {job_id} failed: {e}", exc_info=True)
+        db.rollback()
+        job = db.query(CopyJob).filter(CopyJob.id == job_id).first()
+        if job and job.status in ACTIVE_STATUSES:
+            job.status = "failed"
+            job.error = str(e)
+            job.finished_at = datetime.utcnow()
+            db.commit()
+    finally:
+        db.close()
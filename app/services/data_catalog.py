@@ -2,9 +2,15 @@ from typing import Dict, Any, List, Optional
 from sqlalchemy.orm import Session
 from app.models.dataset import Dataset, DataSourceType
 from app.models.connector import Connector
+from app.utils.engines import engine_registry
+from app.utils.fingerprints import file_signature, fingerprint_registry, table_signature
 from app.utils.logging import logger
+from app.utils.readers import read_from_db
 import pandas as pd
 import json
+import os
+
+SCHEMA_SAMPLE_ROWS = 1000
 
 class DataCatalogService:
     """Service for managing data catalog and metadata."""
@@ -13,29 +19,39 @@ class DataCatalogService:
         self.db = db
 
     def infer_schema(self, connector: Connector, source_path: str, source_type: DataSourceType) -> Dict[str, Any]:
-        """Infer schema information from the data source."""
+        """Infer schema information from the data source, reusing it while the source is unchanged."""
         try:
             if source_type == DataSourceType.DATABASE:
                 # For database tables
-                schema_info = self._infer_database_schema(connector, source_path)
+                signature = self._table_signature(connector, source_path)
+                infer = lambda: self._infer_database_schema(connector, source_path)
             elif source_type == DataSourceType.FILE:
                 # For files (CSV, Excel, etc.)
-                schema_info = self._infer_file_schema(connector, source_path)
+                signature = self._file_signature(connector, source_path)
+                infer = lambda: self._infer_file_schema(connector, source_path)
             else:
                 raise ValueError(f"Unsupported source type: {source_type}")
 
-            return schema_info
+            return fingerprint_registry.get_or_compute(connector.id, source_path, ("schema",), signature, infer)
         except Exception as e:
             logger.error(f"Error inferring schema: {str(e)}")
             raise
 
+    def _table_signature(self, connector: Connector, table_name: str) -> Optional[str]:
+        return table_signature(engine_registry.get_engine(connector), table=table_name,
+                               updated_at_column=(connector.config or {}).get("updated_at_column"))
+
+    def _file_signature(self, connector: Connector, file_path: str) -> Optional[str]:
+        path = os.path.join(connector.file_path, file_path) if connector.file_path else file_path
+        return file_signature(path) if os.path.isfile(path) else None
+
     def _infer_database_schema(self, connector: Connector, table_name: str) -> Dict[str, Any]:
         """Infer schema from a database table."""
         try:
-            # Use connector to get table schema
-            schema = connector.get_table_schema(table_name)
+            # Infer column types from a LIMIT-ed sample evaluated by the database
+            sample = read_from_db(connector, table=table_name, limit=SCHEMA_SAMPLE_ROWS)
             return {
-                "columns": schema,
+                "columns": self._describe_columns(sample),
                 "row_count": connector.get_row_count(table_name),
                 "primary_keys": connector.get_primary_keys(table_name),
                 "foreign_keys": connector.get_foreign_keys(table_name)
@@ -48,24 +64,10 @@ class DataCatalogService:
         """Infer schema from a file."""
         try:
             # Read a sample of the file
-            df = connector.read_file(file_path, nrows=1000)
-            
-            schema = []
-            for column in df.columns:
-                dtype = str(df[column].dtype)
-                sample_values = df[column].head(5).tolist()
-                null_count = df[column].isnull().sum()
-                
-                schema.append({
-                    "name": column,
-                    "type": dtype,
-                    "sample_values": sample_values,
-                    "null_count": int(null_count),
-                    "unique_count": int(df[column].nunique())
-                })
+            df = connector.read_file(file_path, nrows=SCHEMA_SAMPLE_ROWS)
 
             return {
-                "columns": schema,
+                "columns": self._describe_columns(df),
                 "row_count": len(df),
                 "file_format": file_path.split('.')[-1].lower()
             }
@@ -73,6 +75,23 @@ class DataCatalogService:
             logger.error(f"Error inferring file schema: {str(e)}")
             raise
 
+    def _describe_columns(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Describe the columns of a sample DataFrame."""
+        schema = []
+        for column in df.columns:
+            dtype = str(df[column].dtype)
+            sample_values = df[column].head(5).tolist()
+            null_count = df[column].isnull().sum()
+            
+            schema.append({
+                "name": column,
+                "type": dtype,
+                "sample_values": sample_values,
+                "null_count": int(null_count),
+                "unique_count": int(df[column].nunique())
+            })
+        return schema
+
     def get_dataset_metadata(self, dataset_id: int) -> Dict[str, Any]:
         """Get metadata for a specific dataset."""
         dataset = self.db.query(Dataset).filter(Dataset.id == dataset_id).first()
@@ -3,7 +3,11 @@ from sqlalchemy.orm import Session
 from app.models.dataset import Dataset, Transformation, DataSourceType
 from app.models.connector import Connector
 from app.services.data_catalog import DataCatalogService
+from app.core.agents.reader_agent import ReaderAgent
+from app.utils.fingerprints import fingerprint_registry, source_signature
 from app.utils.logging import logger
+from app.utils.readers import read_from_db
+import pandas as pd
 from pydantic import BaseModel
 import sqlalchemy as sa
 from app.schemas.dataset import (
@@ -156,6 +160,33 @@ class DatasetService:
             logger.error(f"Error getting dataset: {str(e)}")
             raise
 
+    def preview_data(self, dataset_id: int, user_id: int, limit: int = 10,
+                     columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Read the first rows of a dataset from its source, optionally only some columns."""
+        try:
+            dataset = self.db.query(Dataset).filter(
+                Dataset.id == dataset_id,
+                Dataset.user_id == user_id
+            ).first()
+            if not dataset:
+                raise ValueError("Dataset not found")
+
+            if dataset.source_type == DataSourceType.FILE:
+                return ReaderAgent(self.db).read_data(dataset.connector_id, dataset.source_path, limit=limit, columns=columns)
+            elif dataset.source_type == DataSourceType.DATABASE:
+                connector = dataset.connector
+                return fingerprint_registry.get_or_compute(
+                    connector.id, dataset.source_path, ("preview", limit, tuple(columns) if columns else None),
+                    source_signature(connector, table=dataset.source_path),
+                    lambda: read_from_db(connector, table=dataset.source_path, limit=limit, columns=columns)
+                )
+            else:
+                raise ValueError(f"Preview is not supported for source type: {dataset.source_type}")
+
+        except Exception as e:
+            logger.error(f"Error previewing dataset: {str(e)}")
+            raise
+
     def update_dataset(
         self,
         dataset_id: int,
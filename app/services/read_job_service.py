@@ -0,0 +1,239 @@
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Iterator, List, Optional
+from sqlalchemy.orm import Session
+from app.core.agents.reader_agent import ReaderAgent
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.read_job import ReadJob
+from app.schemas.read_job import ReadJobResponse
+from app.utils.logging import logger
+from app.utils.serializers import iter_ndjson, limit_frames
+
+ACTIVE_STATUSES = ("pending", "running")
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+
+# Reads run here rather than in the request; jobs still queued at shutdown
+# are marked failed on the next startup
+read_job_executor = ThreadPoolExecutor(max_workers=settings.READ_JOB_WORKERS, thread_name_prefix="read-job")
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def _jobs_dir() -> str:
+    return os.path.join(settings.READER_CACHE_DIR, "jobs")
+
+
+def _file_size(base_path: Optional[str], file: str) -> int:
+    path = os.path.join(base_path, file) if base_path else file
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+class ReadJobService:
+    """Service for background reads of connector files."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create_job(self, connector_id: str, user_id: int, files: List[str],
+                   base_path: Optional[str] = None, limit: Optional[int] = None,
+                   columns: Optional[List[str]] = None) -> ReadJob:
+        """
+        Record a read job and queue it on the worker pool.
+
+        Args:
+            connector_id: Connector to read from
+            user_id: Owner of the job
+            files: Files to read, relative to `base_path`
+            base_path: Directory of the connector, used to size the files
+            limit: Maximum rows to read per file
+            columns: Only read these columns
+
+        Returns:
+            The pending job
+        """
+        job = ReadJob(
+            id=str(uuid.uuid4()),
+            connector_id=connector_id,
+            user_id=user_id,
+            status="pending",
+            files=files,
+            limit=limit,
+            columns=columns,
+            files_total=len(files),
+            files_done=0,
+            rows_read=0,
+            bytes_total=sum(_file_size(base_path, file) for file in files),
+            bytes_read=0
+        )
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+
+        read_job_executor.submit(run_read_job, job.id, base_path)
+        logger.info(f"Queued read job {job.id} for connector {connector_id} with {len(files)} files")
+        return job
+
+    def get_job(self, job_id: str, user_id: int) -> Optional[ReadJob]:
+        return self.db.query(ReadJob).filter(ReadJob.id == job_id, ReadJob.user_id == user_id).first()
+
+    def cancel_job(self, job: ReadJob) -> ReadJob:
+        """Ask a pending or running job to stop; the worker stops at its next progress update."""
+        if job.status in ACTIVE_STATUSES:
+            job.status = "cancelled"
+            job.finished_at = datetime.utcnow()
+            self.db.commit()
+            self.db.refresh(job)
+            logger.info(f"Cancelled read job {job.id}")
+        return job
+
+    def delete_job(self, job: ReadJob) -> None:
+        """Delete a finished job and its result file."""
+        if job.result_path and os.path.exists(job.result_path):
+            os.remove(job.result_path)
+        self.db.delete(job)
+        self.db.commit()
+        logger.info(f"Deleted read job {job.id}")
+
+    def fail_interrupted(self) -> int:
+        """Mark jobs left pending or running by a previous process as failed."""
+        count = self.db.query(ReadJob).filter(ReadJob.status.in_(ACTIVE_STATUSES)).update(
+            {"status": "failed", "error": "Interrupted by server restart", "finished_at": datetime.utcnow()},
+            synchronize_session=False
+        )
+        self.db.commit()
+        if count:
+            logger.warning(f"Marked {count} interrupted read jobs as failed")
+        return count
+
+
+def _save_progress(db: Session, job: ReadJob) -> None:
+    """Commit the job progress and stop if the job was cancelled meanwhile."""
+    # Only changed columns are written, so a concurrent cancel is not overwritten
+    db.commit()
+    if job.status == "cancelled":
+        raise JobCancelled()
+
+
+def run_read_job(job_id: str, base_path: Optional[str] = None) -> None:
+    """
+    Read every file of a job into an NDJSON result file, recording progress.
+
+    Progress is committed at most every READ_JOB_PROGRESS_INTERVAL seconds
+    and after each file. Rows of multi-file jobs carry a _file field.
+    """
+    db = SessionLocal()
+    temp_path = None
+    try:
+        job = db.query(ReadJob).filter(ReadJob.id == job_id).first()
+        if not job or job.status != "pending":
+            return
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        db.commit()
+
+        os.makedirs(_jobs_dir(), exist_ok=True)
+        result_path = os.path.join(_jobs_dir(), f"{job_id}.ndjson")
+        temp_path = result_path + ".tmp"
+        reader_agent = ReaderAgent(db)
+        files = list(job.files)
+        summary = []
+        last_saved = time.monotonic()
+
+        with open(temp_path, "wb") as out:
+            for file in files:
+                rows = 0
+                columns = None
+                for frame in limit_frames(reader_agent.read_chunks(job.connector_id, file, columns=job.columns), job.limit):
+                    if columns is None:
+                        columns = [str(column) for column in frame.columns]
+                    if len(files) > 1:
+                        frame = frame.assign(_file=file)
+                    for part in iter_ndjson([frame]):
+                        out.write(part)
+                    rows += len(frame)
+                    job.rows_read += len(frame)
+                    if time.monotonic() - last_saved >= settings.READ_JOB_PROGRESS_INTERVAL:
+                        _save_progress(db, job)
+                        last_saved = time.monotonic()
+
+                summary.append({"file": file, "rows": rows, "columns": columns or []})
+                job.files_done += 1
+                job.bytes_read += _file_size(base_path, file)
+                _save_progress(db, job)
+                last_saved = time.monotonic()
+
+        os.replace(temp_path, result_path)
+        # Only a job still running is completed, so a cancel after the last progress commit stands
+        completed = db.query(ReadJob).filter(ReadJob.id == job_id, ReadJob.status == "running").update(
+            {"status": "completed", "result": {"files": summary}, "result_path": result_path,
+             "finished_at": datetime.utcnow()},
+            synchronize_session=False
+        )
+        db.commit()
+        if not completed:
+            os.remove(result_path)
+            logger.info(f"Read job {job_id} was cancelled before it completed")
+            return
+        logger.info(f"Read job {job_id} completed with {job.rows_read} rows")
+
+    except JobCancelled:
+        logger.info(f"Read job {job_id} stopped after cancellation")
+    except Exception as e:
+        logger.error(f"Read job {job_id} failed: {e}", exc_info=True)
+        db.rollback()
+        job = db.query(ReadJob).filter(ReadJob.id == job_id).first()
+        if job and job.status in ACTIVE_STATUSES:
+            job.status = "failed"
+            job.error = str(e)
+            job.finished_at = datetime.utcnow()
+            db.commit()
+    finally:
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+        db.close()
+
+
+def _event(name: str, data: dict) -> bytes:
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
+
+
+def iter_job_events(job_id: str, user_id: int) -> Iterator[bytes]:
+    """
+    Server-Sent Events for a job: a progress event whenever it changes,
+    then one event named after its final status.
+
+    The job row is polled every READ_JOB_PROGRESS_INTERVAL seconds with a
+    short-lived session; a comment line is sent between unchanged polls to
+    keep proxies from closing the connection.
+    """
+    last_payload = None
+    while True:
+        db = SessionLocal()
+        try:
+            job = ReadJobService(db).get_job(job_id, user_id)
+            if not job:
+                yield _event("error", {"detail": "Job not found"})
+                return
+            payload = ReadJobResponse.model_validate(job).model_dump(mode="json")
+        finally:
+            db.close()
+
+        if payload["status"] in FINISHED_STATUSES:
+            yield _event(payload["status"], payload)
+            return
+        if payload != last_payload:
+            yield _event("progress", payload)
+            last_payload = payload
+        else:
+            yield b": keep-alive\n\n"
+        time.sleep(settings.READ_JOB_PROGRESS_INTERVAL)
@@ -0,0 +1,207 @@
+# app/utils/bulk_writer.py
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import settings
+from app.utils.logging import logger
+
+# Rows sampled to estimate the in-memory size of a row
+_SAMPLE_ROWS = 1000
+
+
+class BulkWriteError(Exception):
+    """A batch failed after all retries. `report` describes what was written before."""
+
+    def __init__(self, message: str, report: Dict[str, Any]):
+        super().__init__(message)
+        self.report = report
+
+
+def estimate_row_bytes(data: pd.DataFrame) -> float:
+    """Average in-memory size of a row, from evenly spaced sample rows."""
+    if data.empty:
+        return 1.0
+    step = max(len(data) // _SAMPLE_ROWS, 1)
+    sample = data.iloc[::step]
+    return max(float(sample.memory_usage(index=False, deep=True).sum()) / len(sample), 1.0)
+
+
+def plan_batches(data: pd.DataFrame, batch_rows: Optional[int] = None,
+                 batch_bytes: Optional[int] = None) -> List[Tuple[int, int]]:
+    """
+    Split a DataFrame into (start, stop) row ranges.
+
+    Every batch holds at most `batch_rows` rows and about `batch_bytes`
+    bytes, whichever limit is reached first.
+    """
+    batch_rows = batch_rows or settings.BULK_WRITE_BATCH_ROWS
+    batch_bytes = batch_bytes or settings.BULK_WRITE_BATCH_BYTES
+    rows = max(min(batch_rows, int(batch_bytes // estimate_row_bytes(data))), 1)
+    return [(start, min(start + rows, len(data))) for start in range(0, len(data), rows)]
+
+
+class BulkWriter:
+    """
+    Write DataFrames in batches over concurrent connections.
+
+    Each worker thread opens its own connection with `connect` and passes
+    batches to `insert(connection, frame, batch_id)`. A failed batch is
+    retried up to `max_retries` times with exponential backoff when
+    `retryable` accepts the error; its connection is closed and reopened
+    before the retry. `batch_id` is unique per batch and the same for every
+    attempt, so a destination can use it to drop a retried batch that was
+    already committed.
+
+    Batches may be written out of order, so `insert` must not depend on
+    the order of rows across batches.
+    """
+
+    def __init__(self, connect: Callable[[], Any], insert: Callable[[Any, pd.DataFrame, str], Any],
+                 close: Optional[Callable[[Any], None]] = None,
+                 retryable: Callable[[Exception], bool] = lambda error: True,
+                 workers: Optional[int] = None, batch_rows: Optional[int] = None,
+                 batch_bytes: Optional[int] = None, max_retries: Optional[int] = None,
+                 backoff: Optional[float] = None, name: str = "bulk write"):
+        self.connect = connect
+        self.insert = insert
+        self.close = close
+        self.retryable = retryable
+        self.workers = workers or settings.BULK_WRITE_WORKERS
+        self.batch_rows = batch_rows or settings.BULK_WRITE_BATCH_ROWS
+        self.batch_bytes = batch_bytes or settings.BULK_WRITE_BATCH_BYTES
+        self.max_retries = settings.BULK_WRITE_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff = settings.BULK_WRITE_RETRY_BACKOFF if backoff is None else backoff
+        self.name = name
+
+    def write(self, data: pd.DataFrame) -> Dict[str, Any]:
+        """Write one DataFrame and return the write report."""
+        return self.write_frames([data])
+
+    def write_frames(self, frames: Iterable[pd.DataFrame]) -> Dict[str, Any]:
+        """
+        Write a stream of DataFrames, such as the chunks of a read.
+
+        At most twice `workers` batches are held at once, so memory stays
+        bounded however long the stream is. Returns a report with the
+        totals and the latency and throughput of every batch; raises
+        BulkWriteError when a batch fails for good.
+        """
+        local = threading.local()
+        connections = []
+        connections_lock = threading.Lock()
+        stats: List[Dict[str, Any]] = []
+        # Set once a batch has failed for good, so in-flight batches stop retrying
+        failed = threading.Event()
+        write_id = uuid.uuid4().hex
+        started = time.perf_counter()
+
+        def connection():
+            if getattr(local, "connection", None) is None:
+                local.connection = self.connect()
+                with connections_lock:
+                    connections.append(local.connection)
+            return local.connection
+
+        def reset_connection():
+            conn, local.connection = getattr(local, "connection", None), None
+            if conn is not None:
+                with connections_lock:
+                    connections.remove(conn)
+                self._close(conn)
+
+        def write_batch(number: int, frame: pd.DataFrame) -> Dict[str, Any]:
+            size = int(frame.memory_usage(index=False, deep=False).sum())
+            attempt = 0
+            while True:
+                attempt += 1
+                batch_started = time.perf_counter()
+                try:
+                    self.insert(connection(), frame, f"{write_id}-{number}")
+                    break
+                except Exception as e:
+                    reset_connection()
+                    if attempt > self.max_retries or not self.retryable(e) or failed.is_set():
+                        failed.set()
+                        raise
+                    delay = self.backoff * 2 ** (attempt - 1)
+                    logger.warning(f"{self.name}: batch {number} failed on attempt {attempt}, retrying in {delay:.1f}s: {e}")
+                    time.sleep(delay)
+            latency = time.perf_counter() - batch_started
+            return {
+                "batch": number,
+                "rows": len(frame),
+                "bytes": size,
+                "attempts": attempt,
+                "latency": latency,
+                "rows_per_sec": len(frame) / latency if latency else None,
+            }
+
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bulk-write")
+        pending = deque()
+        try:
+            number = 0
+            for frame in frames:
+                for start, stop in plan_batches(frame, self.batch_rows, self.batch_bytes):
+                    pending.append(executor.submit(write_batch, number, frame.iloc[start:stop]))
+                    number += 1
+                    while len(pending) >= self.workers * 2:
+                        stats.append(pending.popleft().result())
+            while pending:
+                stats.append(pending.popleft().result())
+        except Exception as e:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+            for future in pending:
+                if future.done() and not future.cancelled() and future.exception() is None:
+                    stats.append(future.result())
+            report = self._report(stats, time.perf_counter() - started)
+            raise BulkWriteError(f"{self.name} failed after {report['rows']} rows: {e}", report) from e
+        finally:
+            executor.shutdown(wait=True)
+            for conn in connections:
+                self._close(conn)
+
+        report = self._report(stats, time.perf_counter() - started)
+        logger.info(
+            f"{self.name}: {report['rows']} rows in {report['batches']} batches over {self.workers} connections, "
+            f"{report['elapsed']:.2f}s, {report['rows_per_sec']:,.0f} rows/s, {report['retries']} retries"
+        )
+        return report
+
+    def _close(self, conn) -> None:
+        if self.close is None:
+            return
+        try:
+            self.close(conn)
+        except Exception as e:
+            logger.warning(f"{self.name}: error closing connection: {e}")
+
+    @staticmethod
+    def _report(stats: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+        stats = sorted(stats, key=lambda stat: stat["batch"])
+        rows = sum(stat["rows"] for stat in stats)
+        size = sum(stat["bytes"] for stat in stats)
+        latencies = np.array([stat["latency"] for stat in stats]) if stats else np.zeros(1)
+        return {
+            "rows": rows,
+            "bytes": size,
+            "batches": len(stats),
+            "retries": sum(stat["attempts"] - 1 for stat in stats),
+            "elapsed": elapsed,
+            "rows_per_sec": rows / elapsed if elapsed else 0.0,
+            "bytes_per_sec": size / elapsed if elapsed else 0.0,
+            "latency": {
+                "p50": float(np.percentile(latencies, 50)),
+                "p95": float(np.percentile(latencies, 95)),
+                "max": float(latencies.max()),
+            },
+            "batch_stats": stats,
+        }
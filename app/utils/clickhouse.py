@@ -0,0 +1,483 @@
+# app/utils/clickhouse.py
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+from clickhouse_driver import Client, errors
+
+from app.core.config import settings
+from app.utils.bulk_writer import BulkWriter
+from app.utils.engines import config_hash
+from app.utils.logging import logger
+from app.utils.write_modes import APPEND, REPLACE, REPLACE_PARTITION, UPSERT, dedupe, validate_write_mode
+
+# ClickHouse column types of NumPy and pandas dtypes
+CLICKHOUSE_TYPES = {
+    "int8": "Int8",
+    "int16": "Int16",
+    "int32": "Int32",
+    "int64": "Int64",
+    "uint8": "UInt8",
+    "uint16": "UInt16",
+    "uint32": "UInt32",
+    "uint64": "UInt64",
+    "float32": "Float32",
+    "float64": "Float64",
+    "bool": "Bool",
+    "boolean": "Bool",
+    "object": "String",
+    "string": "String",
+}
+
+# Server errors that a later attempt of the same insert can get past
+RETRYABLE_ERROR_CODES = {
+    errors.ErrorCodes.TIMEOUT_EXCEEDED,
+    errors.ErrorCodes.TOO_MANY_SIMULTANEOUS_QUERIES,
+    errors.ErrorCodes.SOCKET_TIMEOUT,
+    errors.ErrorCodes.NETWORK_ERROR,
+    errors.ErrorCodes.MEMORY_LIMIT_EXCEEDED,
+    errors.ErrorCodes.TOO_MANY_PARTS,
+    errors.ErrorCodes.TABLE_IS_READ_ONLY,
+    errors.ErrorCodes.ALL_CONNECTION_TRIES_FAILED,
+    errors.ErrorCodes.KEEPER_EXCEPTION,
+}
+
+
+def create_client(connection_details: Dict[str, Any], **kwargs) -> Client:
+    """
+    Create a ClickHouse client.
+
+    A `compression` entry in the connection details (lz4, lz4hc, zstd or
+    true for lz4) compresses the data on the wire. Clients return plain
+    Python values; insert_dataframe switches NumPy mode on per insert.
+    """
+    client_settings = kwargs.pop("settings", {})
+    compression = connection_details.get("compression", False)
+    try:
+        return Client(
+            host=connection_details.get("host"),
+            port=connection_details.get("port", 9000),
+            user=connection_details.get("user"),
+            password=connection_details.get("password"),
+            database=connection_details.get("database"),
+            compression=compression,
+            settings=client_settings,
+            **kwargs
+        )
+    except errors.UnknownCompressionMethod:
+        raise ValueError(f"Unsupported ClickHouse compression: {compression}; use lz4, lz4hc or zstd")
+
+
+def quote_identifier(name: str) -> str:
+    return "`" + str(name).replace("\\", "\\\\").replace("`", "\\`") + "`"
+
+
+def clickhouse_type(series: pd.Series) -> str:
+    """Map a pandas column to the ClickHouse type that holds it without loss."""
+    dtype = series.dtype
+    nullable = bool(series.isna().any())
+
+    if isinstance(dtype, pd.CategoricalDtype):
+        return "LowCardinality(Nullable(String))" if nullable else "LowCardinality(String)"
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        base = "DateTime64(6, 'UTC')"
+    elif pd.api.types.is_datetime64_dtype(dtype):
+        base = "DateTime64(6)"
+    elif pd.api.types.is_timedelta64_dtype(dtype):
+        base = "Int64"
+    else:
+        # Nullable pandas dtypes such as Int64 map through their lower-case name
+        base = CLICKHOUSE_TYPES.get(str(dtype).lower(), "String")
+    return f"Nullable({base})" if nullable else base
+
+
+def clickhouse_schema(data: pd.DataFrame) -> Dict[str, str]:
+    """ClickHouse column types for every column of a DataFrame."""
+    return {str(column): clickhouse_type(data[column]) for column in data.columns}
+
+
+def _column_values(series: pd.Series, use_numpy: bool):
+    """Column data in the shape the driver serialises fastest."""
+    dtype = series.dtype
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        series = series.dt.tz_convert("UTC").dt.tz_localize(None)
+    elif pd.api.types.is_timedelta64_dtype(dtype):
+        series = series.astype("int64")
+
+    if not use_numpy:
+        # The plain driver packs Python values; convert missing values to None once per column
+        return _object_values(series).tolist()
+
+    if isinstance(series.dtype, np.dtype) and series.dtype != object:
+        # Plain NumPy columns are sent as they are, without a copy
+        return series.to_numpy()
+    # Nullable extension, categorical and object columns; the driver builds its
+    # own dictionary for LowCardinality and fills the nulls from a mask
+    return _object_values(series)
+
+
+def _object_values(series: pd.Series) -> np.ndarray:
+    # to_numpy(na_value=None) keeps NaT in datetime columns, which the driver rejects.
+    # The driver's generic columns, used for types such as Decimal, write into the array
+    return series.astype(object).where(series.notna(), None).to_numpy(copy=True)
+
+
+def insert_dataframe(client, table_name: str, data: pd.DataFrame, use_numpy: bool = True,
+                     query_settings: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Insert a DataFrame column by column.
+
+    Each column is handed to the driver as one array with columnar=True, so
+    no per-row dicts or tuples are built. With `use_numpy` the insert runs
+    in the driver's NumPy mode, which serialises whole column arrays with
+    tobytes() instead of packing Python values one by one. The setting
+    applies to this query only, so the same client keeps returning Python
+    values to SELECTs. `query_settings` are sent with the insert. Returns
+    the number of rows sent.
+    """
+    if data.empty:
+        return 0
+    columns: List = [_column_values(data[column], use_numpy) for column in data.columns]
+    query = f"INSERT INTO {table_name} ({', '.join(quote_identifier(c) for c in data.columns)}) VALUES"
+    rows = client.execute(query, columns, columnar=True, settings={**(query_settings or {}), "use_numpy": use_numpy})
+    logger.debug(f"Inserted {len(data)} rows into ClickHouse table {table_name} in columnar form")
+    return rows if rows is not None else len(data)
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether an insert that failed with `error` may succeed when sent again."""
+    if isinstance(error, (errors.NetworkError, errors.SocketTimeoutError, EOFError, ConnectionError)):
+        return True
+    return isinstance(error, errors.ServerException) and error.code in RETRYABLE_ERROR_CODES
+
+
+def bulk_writer(connector, table_name: str, **kwargs) -> BulkWriter:
+    """
+    BulkWriter inserting into a ClickHouse table through the connector's client pool.
+
+    Each batch checks a client out of the pool only while it is sent, so
+    concurrent writes share the pool. Keep batches below the driver's
+    insert_block_size so each batch is sent as a single block, which the
+    server applies atomically.
+
+    Retries are at-least-once: an insert the server committed before the
+    connection failed is sent again. Every attempt of a batch carries the
+    same insert_deduplication_token, so tables that deduplicate inserts,
+    replicated tables by default and others with
+    non_replicated_deduplication_window set, drop the repeated batch.
+    """
+    pool = clickhouse_pools.get_pool(connector)
+
+    def insert(_, frame: pd.DataFrame, batch_id: str) -> None:
+        with pool.connection() as client:
+            insert_dataframe(client, table_name, frame,
+                             query_settings={"insert_deduplication_token": batch_id})
+
+    kwargs.setdefault("workers", min(settings.BULK_WRITE_WORKERS, pool.max_size))
+    return BulkWriter(
+        connect=lambda: pool,
+        insert=insert,
+        retryable=is_retryable,
+        name=f"ClickHouse write to {table_name}",
+        **kwargs
+    )
+
+
+def table_layout(client, table_name: str) -> Dict[str, str]:
+    """Engine, sorting key and partition key of an existing table."""
+    database, _, name = table_name.rpartition(".")
+    rows = client.execute(
+        "SELECT engine, sorting_key, partition_key FROM system.tables "
+        "WHERE database = if(%(database)s = '', currentDatabase(), %(database)s) AND name = %(name)s",
+        {"database": database.strip("`"), "name": name.strip("`")}
+    )
+    if not rows:
+        raise ValueError(f"Table {table_name} does not exist")
+    engine, sorting_key, partition_key = rows[0]
+    return {"engine": engine, "sorting_key": sorting_key, "partition_key": partition_key}
+
+
+def _key_columns(sorting_key: str) -> List[str]:
+    return [key.strip().strip("`") for key in sorting_key.split(",") if key.strip()]
+
+
+def _via_staging(connector, table_name: str, data: pd.DataFrame, swap, **writer_options) -> Dict[str, Any]:
+    """Write into an empty copy of the table, then let `swap(client, staging)` move the rows over."""
+    pool = clickhouse_pools.get_pool(connector)
+    staging = f"{table_name}__staging_{uuid.uuid4().hex[:8]}"
+    with pool.connection() as client:
+        client.execute(f"CREATE TABLE {staging} AS {table_name}")
+    try:
+        report = bulk_writer(connector, staging, **writer_options).write(data)
+        with pool.connection() as client:
+            report.update(swap(client, staging) or {})
+        return report
+    finally:
+        with pool.connection() as client:
+            client.execute(f"DROP TABLE IF EXISTS {staging}")
+
+
+def write_clickhouse(connector, table_name: str, data: pd.DataFrame, mode: str = APPEND,
+                     merge_keys: Optional[List[str]] = None, **writer_options) -> Dict[str, Any]:
+    """
+    Write a DataFrame to a ClickHouse table in one of the write modes.
+
+    - append inserts the rows.
+    - upsert needs a ReplacingMergeTree ordered by the merge keys. The rows
+      are inserted and older rows of the same keys are dropped when parts
+      merge; read with FINAL for results without duplicates before that.
+      Without a version column the last inserted row of a key is kept, so
+      upsert batches are sent one at a time, in order.
+    - replace-partition needs a partitioned table. The rows are written to
+      a staging copy of the table, and every partition they fall in is
+      swapped in with REPLACE PARTITION, atomically per partition.
+    - replace swaps a staging copy with the table by EXCHANGE TABLES.
+    """
+    validate_write_mode(mode, merge_keys, columns=[str(column) for column in data.columns])
+    if mode == APPEND:
+        return bulk_writer(connector, table_name, **writer_options).write(data)
+
+    with clickhouse_pools.client(connector) as client:
+        layout = table_layout(client, table_name)
+
+    if mode == UPSERT:
+        if not layout["engine"].startswith("Replacing"):
+            raise ValueError(f"Upserts need a ReplacingMergeTree table, {table_name} is {layout['engine']}")
+        if set(_key_columns(layout["sorting_key"])) != set(merge_keys):
+            raise ValueError(f"Merge keys {merge_keys} do not match the sorting key ({layout['sorting_key']}) of {table_name}")
+        writer = bulk_writer(connector, table_name, **{**writer_options, "workers": 1})
+        report = writer.write(dedupe(data, merge_keys))
+        report["mode"] = UPSERT
+        return report
+
+    if layout["engine"].startswith("Replicated"):
+        # A copy made with CREATE TABLE AS would share the table's replication path
+        raise ValueError(f"{mode} writes through a staging table are not supported for replicated tables")
+
+    if mode == REPLACE_PARTITION:
+        if not layout["partition_key"]:
+            raise ValueError(f"Table {table_name} is not partitioned")
+
+        def replace_partitions(client, staging):
+            partitions = [row[0] for row in client.execute(f"SELECT DISTINCT _partition_id FROM {staging}")]
+            for partition in partitions:
+                client.execute(f"ALTER TABLE {table_name} REPLACE PARTITION ID %(partition)s FROM {staging}",
+                               {"partition": partition})
+            logger.info(f"Replaced {len(partitions)} partitions of ClickHouse table {table_name}")
+            return {"mode": REPLACE_PARTITION, "partitions": partitions}
+
+        return _via_staging(connector, table_name, data, replace_partitions, **writer_options)
+
+    def exchange(client, staging):
+        client.execute(f"EXCHANGE TABLES {staging} AND {table_name}")
+        return {"mode": REPLACE}
+
+    return _via_staging(connector, table_name, data, exchange, **writer_options)
+
+
+class ClickHouseClientPool:
+    """
+    Pool of ClickHouse clients for one connector.
+
+    At most `max_size` clients are checked out at once; further checkouts
+    wait up to `timeout` seconds. Clients idle for longer than
+    `ping_interval` are pinged before being handed out, and clients idle
+    for longer than `idle_timeout` are disconnected.
+    """
+
+    def __init__(self, connection_details: Dict[str, Any], max_size: int, timeout: float,
+                 idle_timeout: float, ping_interval: float):
+        self.connection_details = connection_details
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.ping_interval = ping_interval
+        self.last_used = time.monotonic()
+        self._idle = deque()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._closed = False
+        self.in_use = 0
+        self.created = 0
+        self.reused = 0
+        self.failed_checks = 0
+
+    def acquire(self) -> Client:
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"No ClickHouse client free after {self.timeout}s, pool size {self.max_size}")
+        with self._lock:
+            self.in_use += 1
+            self.last_used = time.monotonic()
+        try:
+            client = self._take_idle()
+            if client is None:
+                client = create_client(self.connection_details)
+                self.created += 1
+            return client
+        except Exception:
+            self._checked_in()
+            raise
+
+    def release(self, client: Client, discard: bool = False) -> None:
+        """Return a client to the pool, or disconnect it if it is broken or the pool closed."""
+        try:
+            with self._lock:
+                if not discard and not self._closed:
+                    self._idle.append((client, time.monotonic()))
+                    return
+            client.disconnect()
+        finally:
+            self._checked_in()
+
+    def _checked_in(self) -> None:
+        with self._lock:
+            self.in_use -= 1
+            self.last_used = time.monotonic()
+        self._slots.release()
+
+    @contextmanager
+    def connection(self) -> Iterator[Client]:
+        """Check out a client; it is discarded if the block raises a network error."""
+        client = self.acquire()
+        discard = False
+        try:
+            yield client
+        except Exception as e:
+            discard = is_retryable(e) or not client.connection.connected
+            raise
+        finally:
+            self.release(client, discard=discard)
+
+    def _take_idle(self) -> Optional[Client]:
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                client, returned_at = self._idle.pop()
+            idle = time.monotonic() - returned_at
+            if idle > self.idle_timeout:
+                client.disconnect()
+                continue
+            if idle > self.ping_interval and client.connection.connected and not client.connection.ping():
+                self.failed_checks += 1
+                client.disconnect()
+                continue
+            self.reused += 1
+            return client
+
+    def evict_idle(self) -> None:
+        cutoff = time.monotonic() - self.idle_timeout
+        with self._lock:
+            stale = [entry for entry in self._idle if entry[1] < cutoff]
+            self._idle = deque(entry for entry in self._idle if entry[1] >= cutoff)
+        for client, _ in stale:
+            client.disconnect()
+
+    def close(self) -> None:
+        """Disconnect the idle clients; checked-out clients are disconnected when returned."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, deque()
+        for client, _ in idle:
+            client.disconnect()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "idle": len(self._idle),
+                "in_use": self.in_use,
+                "max_size": self.max_size,
+                "created": self.created,
+                "reused": self.reused,
+                "failed_checks": self.failed_checks,
+                "idle_seconds": round(time.monotonic() - self.last_used, 1),
+            }
+
+
+class ClickHousePoolRegistry:
+    """
+    Process-wide ClickHouse client pools, one per connector.
+
+    A pool is replaced when the connection details of its connector change,
+    and pools with no client checked out for `idle_timeout` seconds are
+    closed. The pool size can be set per connector with a `pool_size`
+    connection detail.
+    """
+
+    def __init__(self, max_size: int = settings.CLICKHOUSE_POOL_MAX_SIZE,
+                 timeout: float = settings.CLICKHOUSE_POOL_TIMEOUT,
+                 idle_timeout: float = settings.CLICKHOUSE_POOL_IDLE_TIMEOUT,
+                 ping_interval: float = settings.CLICKHOUSE_POOL_PING_INTERVAL):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.ping_interval = ping_interval
+        self._pools: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get_pool(self, connector) -> ClickHouseClientPool:
+        connector_id = str(connector.id)
+        details = connector.connection_details or {}
+        current_hash = config_hash(details, exclude=())
+
+        with self._lock:
+            self._evict_idle()
+            entry = self._pools.get(connector_id)
+            if entry and entry[1] == current_hash:
+                return entry[0]
+            if entry:
+                logger.info(f"Connection details changed for connector {connector_id}, replacing ClickHouse pool")
+                entry[0].close()
+            pool = ClickHouseClientPool(
+                details,
+                max_size=int(details.get("pool_size", self.max_size)),
+                timeout=self.timeout,
+                idle_timeout=self.idle_timeout,
+                ping_interval=self.ping_interval,
+            )
+            self._pools[connector_id] = (pool, current_hash)
+            logger.info(f"Created ClickHouse client pool for connector {connector_id}")
+            return pool
+
+    def client(self, connector):
+        """Context manager checking out a pooled client for a connector."""
+        return self.get_pool(connector).connection()
+
+    def invalidate(self, connector_id: str) -> bool:
+        """Close the pool of a connector. Returns True if one existed."""
+        with self._lock:
+            entry = self._pools.pop(str(connector_id), None)
+        if not entry:
+            return False
+        entry[0].close()
+        logger.info(f"Invalidated ClickHouse pool for connector {connector_id}")
+        return True
+
+    def dispose_all(self) -> None:
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for pool, _ in pools.values():
+            pool.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {connector_id: pool.stats() for connector_id, (pool, _) in self._pools.items()}
+
+    def _evict_idle(self) -> None:
+        cutoff = time.monotonic() - self.idle_timeout
+        for connector_id, (pool, _) in list(self._pools.items()):
+            # A pool with clients checked out, as during a long bulk write, is never idle
+            if pool.last_used < cutoff and not pool.in_use:
+                logger.info(f"Closing idle ClickHouse pool for connector {connector_id}")
+                del self._pools[connector_id]
+                pool.close()
+            else:
+                pool.evict_idle()
+
+
+clickhouse_pools = ClickHousePoolRegistry()
@@ -0,0 +1,208 @@
+# app/utils/clickhouse_layout.py
+import re
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from app.utils.clickhouse import clickhouse_type, quote_identifier
+
+# String columns with at most this many distinct values, and at most this
+# share of distinct values per row, are stored as LowCardinality(String)
+LOW_CARDINALITY_MAX_VALUES = 10000
+LOW_CARDINALITY_MAX_RATIO = 0.1
+
+# Columns inferred into the sorting key before the time column
+MAX_INFERRED_KEY_COLUMNS = 3
+
+# Monthly partitions for data spanning up to this many years, yearly beyond,
+# so one insert stays under max_partitions_per_insert_block (100)
+MAX_MONTHLY_PARTITION_YEARS = 8
+
+SKIP_INDEX_GRANULARITY = 4
+
+
+def _strip_nullable(ch_type: str) -> str:
+    match = re.fullmatch(r"Nullable\((.*)\)", ch_type)
+    return match.group(1) if match else ch_type
+
+
+def _not_nullable(ch_type: str) -> str:
+    match = re.fullmatch(r"LowCardinality\(Nullable\((.*)\)\)", ch_type)
+    return f"LowCardinality({match.group(1)})" if match else _strip_nullable(ch_type)
+
+
+def _is_nullable(ch_type: str) -> bool:
+    return "Nullable(" in ch_type
+
+
+def _base_type(ch_type: str) -> str:
+    match = re.fullmatch(r"LowCardinality\((.*)\)", _strip_nullable(ch_type))
+    return _strip_nullable(match.group(1)) if match else _strip_nullable(ch_type)
+
+
+def _is_time_type(ch_type: str) -> bool:
+    return _base_type(ch_type).startswith(("DateTime", "Date"))
+
+
+def _is_low_cardinality(series: pd.Series) -> bool:
+    distinct = series.nunique(dropna=True)
+    return bool(len(series)) and distinct <= LOW_CARDINALITY_MAX_VALUES and distinct <= len(series) * LOW_CARDINALITY_MAX_RATIO
+
+
+def column_type(series: pd.Series) -> str:
+    """
+    ClickHouse type of a column as created by this module.
+
+    Like clickhouse_type, Nullable is only used for columns holding
+    missing values; string columns with few distinct values become
+    LowCardinality, which stores them dictionary-encoded.
+    """
+    ch_type = clickhouse_type(series)
+    if _base_type(ch_type) == "String" and not ch_type.startswith("LowCardinality") and _is_low_cardinality(series):
+        return f"LowCardinality({ch_type})"
+    return ch_type
+
+
+def column_codec(ch_type: str) -> str:
+    """Compression codec suited to a column type: deltas for times, T64 for integers, Gorilla for floats."""
+    base = _base_type(ch_type)
+    if _is_nullable(ch_type) or ch_type.startswith("LowCardinality"):
+        return "CODEC(ZSTD(1))"
+    if _is_time_type(ch_type):
+        return "CODEC(Delta, ZSTD(1))"
+    if re.fullmatch(r"U?Int\d+", base):
+        return "CODEC(T64, ZSTD(1))"
+    if base.startswith("Float"):
+        return "CODEC(Gorilla, ZSTD(1))"
+    return "CODEC(ZSTD(1))"
+
+
+def skip_index(column: str, ch_type: str) -> str:
+    """Skip index for filtering on a column outside the sorting key."""
+    base = _base_type(ch_type)
+    if ch_type.startswith("LowCardinality") or base == "Bool":
+        kind = "set(100)"
+    elif base == "String":
+        kind = "bloom_filter(0.01)"
+    else:
+        kind = "minmax"
+    name = quote_identifier(f"idx_{column}")
+    return f"INDEX {name} {quote_identifier(column)} TYPE {kind} GRANULARITY {SKIP_INDEX_GRANULARITY}"
+
+
+def _time_column(columns: Dict[str, str]) -> Optional[str]:
+    # The first non-nullable time column, which can be part of the sorting key
+    for column, ch_type in columns.items():
+        if _is_time_type(ch_type) and not _is_nullable(ch_type):
+            return column
+    return None
+
+
+def _time_partition(column: str, data: Optional[pd.DataFrame]) -> str:
+    expression = f"toYYYYMM({quote_identifier(column)})"
+    if data is not None and column in data.columns and len(data):
+        values = pd.to_datetime(data[column])
+        if values.max().year - values.min().year > MAX_MONTHLY_PARTITION_YEARS:
+            expression = f"toYear({quote_identifier(column)})"
+    return expression
+
+
+def _by_cardinality(columns: List[str], data: Optional[pd.DataFrame]) -> List[str]:
+    # Low-cardinality columns first give the longest runs to compress and skip
+    if data is None:
+        return list(columns)
+    return sorted(columns, key=lambda column: data[column].nunique() if column in data.columns else 0)
+
+
+def plan_layout(data: Optional[pd.DataFrame] = None, schema: Optional[Dict[str, str]] = None,
+                merge_keys: Optional[List[str]] = None, order_by: Optional[List[str]] = None,
+                partition_by: Optional[str] = None, version_column: Optional[str] = None,
+                time_column: Optional[str] = None, filter_columns: Optional[List[str]] = None,
+                codecs: bool = False, skip_indexes: bool = False) -> Dict[str, Any]:
+    """
+    Plan the columns, engine, sorting key and partitioning of a new table.
+
+    Declared settings win over inferred ones:
+    - Column types come from `schema`, or from the dtypes of `data`.
+    - With merge keys the table is a ReplacingMergeTree sorted by them.
+      Otherwise the sorting key is `order_by`, or else the columns queries
+      filter on (`filter_columns`, or the LowCardinality columns) by
+      ascending cardinality, followed by the time column.
+    - The partition key is `partition_by`, or the month (or year, for data
+      spanning many years) of the time column. Tables with merge keys are
+      only partitioned when declared, since rows of one key in different
+      partitions are never merged.
+    - `codecs` adds a compression codec per column, and `skip_indexes`
+      adds skip indexes on the filter columns outside the sorting key.
+    - Sorting key columns lose Nullable when `data` holds no nulls in
+      them; Nullable keys are kept and enable allow_nullable_key.
+
+    Returns:
+        Dict with columns, engine, order_by, partition_by, indexes and settings, for create_table_sql
+    """
+    if data is None and schema is None:
+        raise ValueError("A layout needs data or a schema")
+    columns = {str(column): column_type(data[column]) for column in data.columns} if data is not None else {}
+    columns.update(schema or {})
+    unknown = [column for column in (merge_keys or []) + (order_by or []) + (filter_columns or [])
+               + ([time_column] if time_column else []) if column not in columns]
+    if unknown:
+        raise ValueError(f"Layout columns not in the table: {unknown}")
+
+    time_column = time_column or _time_column(columns)
+    if merge_keys:
+        keys = _by_cardinality(merge_keys, data)
+    elif order_by:
+        keys = list(order_by)
+    else:
+        candidates = filter_columns or [column for column, ch_type in columns.items()
+                                        if ch_type.startswith("LowCardinality")]
+        candidates = [column for column in candidates
+                      if column != time_column and not _is_nullable(columns[column])]
+        keys = _by_cardinality(candidates, data)[:MAX_INFERRED_KEY_COLUMNS]
+        if time_column and not _is_nullable(columns[time_column]):
+            keys.append(time_column)
+
+    if not partition_by and time_column and not merge_keys and not _is_nullable(columns[time_column]):
+        partition_by = _time_partition(time_column, data)
+
+    # Sorting key columns are made non-Nullable when the data shows no nulls in
+    # them; otherwise they stay Nullable, which the table has to allow
+    settings = {}
+    for key in keys:
+        if data is not None and key in data.columns and not data[key].isna().any():
+            columns[key] = _not_nullable(columns[key])
+        elif _is_nullable(columns[key]):
+            settings["allow_nullable_key"] = 1
+
+    indexes = []
+    if skip_indexes:
+        indexes = [skip_index(column, columns[column]) for column in filter_columns or []
+                   if column not in keys]
+
+    version = quote_identifier(version_column) if version_column else ""
+    return {
+        "columns": columns,
+        "codecs": {column: column_codec(ch_type) for column, ch_type in columns.items()} if codecs else {},
+        "engine": f"ReplacingMergeTree({version})" if merge_keys else "MergeTree()",
+        "order_by": keys,
+        "partition_by": partition_by,
+        "indexes": indexes,
+        "settings": settings,
+    }
+
+
+def create_table_sql(table_name: str, layout: Dict[str, Any]) -> str:
+    """CREATE TABLE IF NOT EXISTS statement of a planned layout."""
+    definitions = [
+        " ".join(filter(None, [quote_identifier(column), ch_type, layout["codecs"].get(column)]))
+        for column, ch_type in layout["columns"].items()
+    ]
+    definitions += layout["indexes"]
+    keys = layout["order_by"]
+    order_by = "(" + ", ".join(quote_identifier(key) for key in keys) + ")" if keys else "tuple()"
+    partition = f" PARTITION BY {layout['partition_by']}" if layout["partition_by"] else ""
+    settings = ", ".join(f"{name} = {value}" for name, value in layout.get("settings", {}).items())
+    return (f"CREATE TABLE IF NOT EXISTS {table_name} ({', '.join(definitions)}) "
+            f"ENGINE = {layout['engine']}{partition} ORDER BY {order_by}"
+            + (f" SETTINGS {settings}" if settings else ""))
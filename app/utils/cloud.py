@@ -0,0 +1,216 @@
+# app/utils/cloud.py
+import io
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+import boto3
+import pandas as pd
+from botocore.config import Config
+
+from app.core.config import settings
+from app.utils.engines import config_hash
+from app.utils.logging import logger
+
+# Keys of connector.config that select objects rather than configure the client
+_NON_CLIENT_KEYS = {"bucket", "key", "keys", "prefix", "suffix"}
+
+
+class S3ClientCache:
+    """Process-wide cache of boto3 S3 clients, one per connector."""
+
+    def __init__(self, max_pool_connections: int = settings.S3_MAX_POOL_CONNECTIONS):
+        self.max_pool_connections = max_pool_connections
+        self._clients: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get_client(self, connector):
+        connector_id = str(connector.id)
+        config = connector.config or {}
+        current_hash = config_hash(config, exclude=_NON_CLIENT_KEYS)
+
+        with self._lock:
+            cached = self._clients.get(connector_id)
+            if cached and cached[0] == current_hash:
+                return cached[1]
+
+            client = boto3.client(
+                "s3",
+                aws_access_key_id=config.get("aws_access_key_id"),
+                aws_secret_access_key=config.get("aws_secret_access_key"),
+                aws_session_token=config.get("aws_session_token"),
+                region_name=config.get("region"),
+                endpoint_url=config.get("endpoint_url"),
+                config=Config(max_pool_connections=self.max_pool_connections,
+                              retries={"max_attempts": 5, "mode": "adaptive"}),
+            )
+            self._clients[connector_id] = (current_hash, client)
+            logger.info(f"Created S3 client for connector {connector_id}")
+            return client
+
+    def invalidate(self, connector_id: str) -> bool:
+        """Drop the cached client of a connector. Returns True if one existed."""
+        with self._lock:
+            return self._clients.pop(str(connector_id), None) is not None
+
+
+s3_clients = S3ClientCache()
+
+
+class RangedObjectStream(io.RawIOBase):
+    """
+    Sequential file-like view of an S3 object fetched with parallel ranged GETs.
+
+    Up to `prefetch` parts are downloaded ahead of the reader, so memory is
+    bounded by prefetch * part_size regardless of the object size.
+    """
+
+    def __init__(self, client, bucket: str, key: str, size: int,
+                 part_size: int = settings.S3_PART_SIZE, prefetch: int = settings.S3_PREFETCH_PARTS):
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        self.size = size
+        self.part_size = part_size
+        self._executor = ThreadPoolExecutor(max_workers=prefetch)
+        self._offsets = iter(range(0, size, part_size))
+        self._pending = deque()
+        self._buffer = memoryview(b"")
+        for _ in range(prefetch):
+            self._schedule_next()
+
+    def _schedule_next(self) -> None:
+        start = next(self._offsets, None)
+        if start is None:
+            return
+        end = min(start + self.part_size, self.size) - 1
+        self._pending.append(self._executor.submit(self._fetch, start, end))
+
+    def _fetch(self, start: int, end: int) -> bytes:
+        response = self.client.get_object(Bucket=self.bucket, Key=self.key, Range=f"bytes={start}-{end}")
+        return response["Body"].read()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, target) -> int:
+        if not self._buffer:
+            if not self._pending:
+                return 0
+            self._buffer = memoryview(self._pending.popleft().result())
+            self._schedule_next()
+        count = min(len(target), len(self._buffer))
+        target[:count] = self._buffer[:count]
+        self._buffer = self._buffer[count:]
+        return count
+
+    def close(self) -> None:
+        if not self.closed:
+            for future in self._pending:
+                future.cancel()
+            self._executor.shutdown(wait=False)
+        super().close()
+
+
+def list_objects(connector, prefix: Optional[str] = None, suffix: Optional[str] = None) -> List[Dict[str, Any]]:
+    """List the objects under a prefix with their sizes, following pagination."""
+    client = s3_clients.get_client(connector)
+    bucket = connector.config["bucket"]
+    prefix = prefix if prefix is not None else connector.config.get("prefix", "")
+    suffix = suffix if suffix is not None else connector.config.get("suffix")
+
+    objects = []
+    paginator = client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for item in page.get("Contents", []):
+            if item["Key"].endswith("/") or (suffix and not item["Key"].endswith(suffix)):
+                continue
+            objects.append({"key": item["Key"], "size": item["Size"], "last_modified": item["LastModified"]})
+    return objects
+
+
+def open_object(connector, key: str, size: Optional[int] = None):
+    """
+    Open an S3 object as a readable stream.
+
+    Objects larger than S3_RANGE_THRESHOLD are fetched with parallel ranged
+    GETs; smaller ones stream the body of a single GET.
+    """
+    client = s3_clients.get_client(connector)
+    bucket = connector.config["bucket"]
+    if size is None:
+        size = client.head_object(Bucket=bucket, Key=key)["ContentLength"]
+    if size > settings.S3_RANGE_THRESHOLD:
+        logger.info(f"Reading s3://{bucket}/{key} ({size} bytes) with ranged GETs")
+        return io.BufferedReader(RangedObjectStream(client, bucket, key, size))
+    return client.get_object(Bucket=bucket, Key=key)["Body"]
+
+
+def iter_object_chunks(connector, key: str, chunksize: Optional[int] = None,
+                       size: Optional[int] = None, columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """Yield DataFrame chunks of one CSV object while it is being downloaded."""
+    chunksize = chunksize or settings.READER_CHUNK_SIZE
+    stream = open_object(connector, key, size)
+    try:
+        yield from pd.read_csv(stream, chunksize=chunksize, usecols=columns)
+    finally:
+        stream.close()
+
+
+def _object_keys(connector) -> List[Dict[str, Any]]:
+    config = connector.config
+    if config.get("key"):
+        return [{"key": config["key"], "size": None}]
+    if config.get("keys"):
+        return [{"key": key, "size": None} for key in config["keys"]]
+    return list_objects(connector)
+
+
+def iter_objects(connector, workers: Optional[int] = None,
+                 columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Read every selected object concurrently and yield one frame per object.
+
+    Objects are yielded in listing order with at most `workers` downloads in
+    flight.
+    """
+    objects = _object_keys(connector)
+    workers = workers or settings.S3_READ_WORKERS
+    logger.info(f"Reading {len(objects)} objects from s3://{connector.config['bucket']} with {workers} workers")
+
+    def read_object(item):
+        stream = open_object(connector, item["key"], item["size"])
+        try:
+            return pd.read_csv(stream, usecols=columns)
+        finally:
+            stream.close()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        remaining = iter(objects)
+        for item in remaining:
+            pending.append(executor.submit(read_object, item))
+            if len(pending) >= workers:
+                break
+        while pending:
+            frame = pending.popleft().result()
+            next_item = next(remaining, None)
+            if next_item is not None:
+                pending.append(executor.submit(read_object, next_item))
+            yield frame
+
+
+def read_objects(connector, workers: Optional[int] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Read every selected object concurrently into a single DataFrame."""
+    frames = list(iter_objects(connector, workers, columns))
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def iter_chunks(connector, chunksize: Optional[int] = None,
+                columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """Yield DataFrame chunks of every selected object, one object after another."""
+    for item in _object_keys(connector):
+        yield from iter_object_chunks(connector, item["key"], chunksize, item["size"], columns)
@@ -0,0 +1,104 @@
+# app/utils/compression.py
+import bz2
+import gzip
+import io
+import lzma
+import os
+import zipfile
+from typing import Optional, Tuple
+
+import zstandard
+
+from app.utils.logging import logger
+
+# Leading bytes of each supported compression format
+MAGIC_BYTES = (
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+    (b"PK\x03\x04", "zip"),
+)
+
+COMPRESSION_SUFFIXES = {
+    ".gz": "gzip",
+    ".bz2": "bz2",
+    ".xz": "xz",
+    ".zst": "zstd",
+    ".zip": "zip",
+}
+
+
+def detect_compression(path: str) -> Optional[str]:
+    """Detect the compression of a file from its magic bytes."""
+    with open(path, "rb") as f:
+        head = f.read(6)
+    for magic, compression in MAGIC_BYTES:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def split_compression_suffix(name: str) -> Tuple[str, Optional[str]]:
+    """Split 'data.csv.gz' into ('data.csv', 'gzip')."""
+    stem, suffix = os.path.splitext(name)
+    compression = COMPRESSION_SUFFIXES.get(suffix.lower())
+    if compression:
+        return stem, compression
+    return name, None
+
+
+def _zip_member(archive: zipfile.ZipFile, member: Optional[str], extensions: Tuple[str, ...]) -> str:
+    if member:
+        return member
+    names = [info.filename for info in archive.infolist() if not info.is_dir()]
+    if extensions:
+        names = [name for name in names if name.lower().endswith(extensions)] or names
+    if not names:
+        raise ValueError("Zip archive contains no files")
+    if len(names) > 1:
+        logger.info(f"Zip archive has {len(names)} members, reading {names[0]}")
+    return names[0]
+
+
+def open_decompressed(path: str, compression: str, member: Optional[str] = None,
+                      extensions: Tuple[str, ...] = ()) -> io.BufferedIOBase:
+    """
+    Open a compressed file as a stream of decompressed bytes.
+
+    Data is inflated incrementally as the stream is read, so nothing is
+    decompressed to disk and only the parser's read buffer is held in memory.
+    For zip archives the given member, or the first member matching
+    `extensions`, is opened.
+    """
+    if compression == "gzip":
+        return gzip.open(path, "rb")
+    if compression == "bz2":
+        return bz2.open(path, "rb")
+    if compression == "xz":
+        return lzma.open(path, "rb")
+    if compression == "zstd":
+        raw = open(path, "rb")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw, closefd=True))
+    if compression == "zip":
+        with zipfile.ZipFile(path) as archive:
+            # The open member keeps the underlying file open after the archive is closed
+            return archive.open(_zip_member(archive, member, extensions))
+    raise ValueError(f"Unsupported compression: {compression}")
+
+
+def open_source(path: str, extensions: Tuple[str, ...] = ()):
+    """
+    Return what a pandas reader should be given for `path`.
+
+    Uncompressed files are returned as the path itself so pandas can use
+    its native file handling; compressed ones as a decompressing stream.
+    """
+    compression = detect_compression(path)
+    if compression is None:
+        return path
+    # xlsx files are zip containers themselves
+    if compression == "zip" and path.lower().endswith((".xlsx", ".xls")):
+        return path
+    logger.info(f"Reading {compression} compressed file {path}")
+    return open_decompressed(path, compression, extensions=extensions)
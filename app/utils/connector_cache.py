@@ -0,0 +1,102 @@
+# app/utils/connector_cache.py
+import copy
+import enum
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.utils.logging import logger
+
+
+class ConnectorSnapshot:
+    """Detached copy of the connector fields the readers and writers use."""
+
+    __slots__ = ("id", "name", "type", "connector_type", "config", "file_path", "connection_details", "user_id")
+
+    def __init__(self, connector):
+        self.id = connector.id
+        self.name = connector.name
+        # The column is an Enum; readers and writers compare against its values
+        self.type = connector.type.value if isinstance(connector.type, enum.Enum) else connector.type
+        self.connector_type = connector.connector_type
+        self.config = copy.deepcopy(connector.config)
+        self.file_path = connector.file_path
+        self.connection_details = copy.deepcopy(connector.connection_details)
+        self.user_id = connector.user_id
+
+    def copy(self) -> "ConnectorSnapshot":
+        """Copy whose config can be modified without touching the cached one."""
+        return copy.deepcopy(self)
+
+
+class ConnectorConfigCache:
+    """
+    Process-wide TTL cache of resolved connectors.
+
+    Agents read the same connector many times in multi-file loops; entries
+    live for `ttl` seconds and are dropped as soon as the connector is
+    updated or deleted.
+    """
+
+    def __init__(self, ttl: int = settings.CONNECTOR_CACHE_TTL, max_entries: int = settings.CONNECTOR_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[str, Tuple[float, ConnectorSnapshot]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, connector_id: str, load: Callable[[str], Any]) -> Optional[ConnectorSnapshot]:
+        """
+        Return a copy of the cached connector, calling `load` on a miss.
+
+        `load` returns the connector row or None; misses are not cached.
+        """
+        key = str(connector_id)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached and now - cached[0] < self.ttl:
+                self._hits += 1
+                return cached[1].copy()
+            self._misses += 1
+
+        connector = load(key)
+        if connector is None:
+            return None
+        snapshot = ConnectorSnapshot(connector)
+
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._evict_expired(now)
+            if len(self._entries) >= self.max_entries:
+                oldest = min(self._entries, key=lambda k: self._entries[k][0])
+                del self._entries[oldest]
+            self._entries[key] = (now, snapshot)
+        return snapshot.copy()
+
+    def _evict_expired(self, now: float) -> None:
+        for key in [key for key, (loaded_at, _) in self._entries.items() if now - loaded_at >= self.ttl]:
+            del self._entries[key]
+
+    def invalidate(self, connector_id: str) -> bool:
+        """Drop the cached connector. Returns True if one was cached."""
+        with self._lock:
+            removed = self._entries.pop(str(connector_id), None) is not None
+        if removed:
+            logger.info(f"Invalidated cached connector {connector_id}")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+            }
+
+
+connector_configs = ConnectorConfigCache()
@@ -0,0 +1,190 @@
+# app/utils/engines.py
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import sqlalchemy
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.utils.logging import logger
+
+# Keys of connector.config that describe what to read rather than how to connect
+_NON_CONNECTION_KEYS = {"query", "partition_column", "partitions"}
+
+# SQLAlchemy drivers of connectors configured with connection_details
+_DRIVERS = {"postgres": "postgresql+psycopg2", "mysql": "mysql+pymysql"}
+
+
+def config_hash(config: Dict[str, Any], exclude: Iterable[str] = _NON_CONNECTION_KEYS) -> str:
+    """Hash the connection-relevant part of a connector config."""
+    exclude = set(exclude)
+    connection_config = {k: v for k, v in (config or {}).items() if k not in exclude}
+    payload = json.dumps(connection_config, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def connection_string(connector) -> str:
+    """
+    SQLAlchemy URL of a database connector.
+
+    Sources carry a connection_string in their config; destinations are
+    created with host, port, user, password and database connection
+    details, from which the URL is built.
+    """
+    config = connector.config or {}
+    if config.get("connection_string"):
+        return config["connection_string"]
+    connector_type = getattr(connector.type, "value", connector.type)
+    details = connector.connection_details or {}
+    if connector_type not in _DRIVERS or not details:
+        raise ValueError(f"Connector {connector.id} has no connection_string or connection details")
+    url = sqlalchemy.engine.URL.create(
+        _DRIVERS[connector_type],
+        username=details.get("user"),
+        password=details.get("password"),
+        host=details.get("host"),
+        port=details.get("port"),
+        database=details.get("database"),
+    )
+    return url.render_as_string(hide_password=False)
+
+
+class _EngineEntry:
+    def __init__(self, engine: Engine, config_hash: str):
+        self.engine = engine
+        self.config_hash = config_hash
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.uses = 0
+
+
+class EngineRegistry:
+    """Process-wide cache of SQLAlchemy engines for source database connectors."""
+
+    def __init__(
+        self,
+        pool_size: int = settings.READER_ENGINE_POOL_SIZE,
+        max_overflow: int = settings.READER_ENGINE_MAX_OVERFLOW,
+        pool_recycle: int = settings.READER_ENGINE_POOL_RECYCLE,
+        idle_timeout: int = settings.READER_ENGINE_IDLE_TIMEOUT,
+        max_engines: int = settings.READER_ENGINE_MAX_ENGINES,
+    ):
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_recycle = pool_recycle
+        self.idle_timeout = idle_timeout
+        self.max_engines = max_engines
+        self._engines: Dict[str, _EngineEntry] = {}
+        self._lock = threading.RLock()
+        self._hits = 0
+        self._misses = 0
+        self._disposals = 0
+
+    def get_engine(self, connector) -> Engine:
+        """
+        Return a pooled engine for the connector, creating it on first use.
+
+        The engine is reused as long as the connection part of the connector
+        config is unchanged; a changed config disposes the stale engine.
+        """
+        connector_id = str(connector.id)
+        config = {**(connector.config or {}), "connection_string": connection_string(connector)}
+        current_hash = config_hash(config)
+
+        with self._lock:
+            self._evict_idle()
+            entry = self._engines.get(connector_id)
+            if entry and entry.config_hash == current_hash:
+                self._hits += 1
+            else:
+                if entry:
+                    logger.info(f"Connection config changed for connector {connector_id}, replacing engine")
+                    self._dispose(connector_id)
+                self._misses += 1
+                if len(self._engines) >= self.max_engines:
+                    self._evict_least_recently_used()
+                entry = _EngineEntry(self._create_engine(config), current_hash)
+                self._engines[connector_id] = entry
+                logger.info(f"Created engine for connector {connector_id}")
+
+            entry.last_used = time.monotonic()
+            entry.uses += 1
+            return entry.engine
+
+    def invalidate(self, connector_id: str) -> bool:
+        """Dispose the cached engine of a connector. Returns True if one existed."""
+        with self._lock:
+            if str(connector_id) not in self._engines:
+                return False
+            self._dispose(str(connector_id))
+            logger.info(f"Invalidated engine for connector {connector_id}")
+            return True
+
+    def dispose_all(self) -> None:
+        """Dispose every cached engine, e.g. on application shutdown."""
+        with self._lock:
+            for connector_id in list(self._engines):
+                self._dispose(connector_id)
+
+    def stats(self, connector_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Return cache statistics including the engine reuse rate, listing every engine or those of the given connectors."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            engines = {connector_id: entry for connector_id, entry in self._engines.items()
+                       if connector_ids is None or connector_id in connector_ids}
+            return {
+                "engines": len(engines),
+                "hits": self._hits,
+                "misses": self._misses,
+                "disposals": self._disposals,
+                "reuse_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "connectors": {
+                    connector_id: {
+                        "uses": entry.uses,
+                        "idle_seconds": round(time.monotonic() - entry.last_used, 1),
+                        "pool": entry.engine.pool.status(),
+                    }
+                    for connector_id, entry in engines.items()
+                },
+            }
+
+    def _create_engine(self, config: Dict[str, Any]) -> Engine:
+        connection_string = config["connection_string"]
+        options: Dict[str, Any] = {"pool_pre_ping": True}
+        url = sqlalchemy.engine.make_url(connection_string)
+        # SQLite engines use a single-connection pool that takes no size limits
+        if url.get_backend_name() != "sqlite":
+            options.update(
+                pool_size=config.get("pool_size", self.pool_size),
+                max_overflow=config.get("max_overflow", self.max_overflow),
+                pool_recycle=self.pool_recycle,
+            )
+        if config.get("connect_args"):
+            options["connect_args"] = config["connect_args"]
+        return sqlalchemy.create_engine(url, **options)
+
+    def _evict_idle(self) -> None:
+        if self.idle_timeout <= 0:
+            return
+        cutoff = time.monotonic() - self.idle_timeout
+        for connector_id, entry in list(self._engines.items()):
+            if entry.last_used < cutoff:
+                logger.info(f"Disposing idle engine for connector {connector_id}")
+                self._dispose(connector_id)
+
+    def _evict_least_recently_used(self) -> None:
+        connector_id = min(self._engines, key=lambda key: self._engines[key].last_used)
+        logger.info(f"Engine cache full, disposing engine for connector {connector_id}")
+        self._dispose(connector_id)
+
+    def _dispose(self, connector_id: str) -> None:
+        entry: Optional[_EngineEntry] = self._engines.pop(connector_id, None)
+        if entry:
+            entry.engine.dispose()
+            self._disposals += 1
+
+
+engine_registry = EngineRegistry()
@@ -0,0 +1,200 @@
+# app/utils/file_index.py
+import base64
+import fnmatch
+import json
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.utils.compression import split_compression_suffix
+from app.utils.logging import logger
+
+# File extensions listed for each file connector type; compressed files are
+# matched on the extension under their compression suffix, e.g. data.csv.gz
+FILE_EXTENSIONS = {
+    "csv": (".csv", ".zip"),
+    "pdf": (".pdf",),
+    "txt": (".txt", ".zip"),
+    "xlsx": (".xlsx", ".xls"),
+    "image": (".jpg", ".jpeg", ".png", ".gif"),
+}
+
+SORT_FIELDS = ("name", "size", "mtime")
+
+
+class FileEntry:
+    __slots__ = ("name", "size", "mtime", "extension", "compression")
+
+    def __init__(self, name: str, size: int, mtime: float, extension: str, compression: Optional[str] = None):
+        self.name = name
+        self.size = size
+        self.mtime = mtime
+        self.extension = extension
+        self.compression = compression
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "size": self.size,
+            "mtime": self.mtime,
+            "extension": self.extension,
+            "compression": self.compression,
+        }
+
+
+def _extension(name: str) -> Tuple[str, Optional[str]]:
+    """Return the data extension and compression of a file name."""
+    stem, compression = split_compression_suffix(name)
+    if compression == "zip" and not os.path.splitext(stem)[1]:
+        # A bare archive such as feed.zip
+        return ".zip", compression
+    return os.path.splitext(stem)[1].lower(), compression
+
+
+def _encode_cursor(key: Tuple) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> Tuple:
+    try:
+        return tuple(json.loads(base64.urlsafe_b64decode(cursor.encode("ascii"))))
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+
+class FileIndex:
+    """
+    Index of the files under a connector directory.
+
+    Directories are scanned with os.scandir and remembered with their mtime,
+    so a refresh only rescans directories whose entries changed. Changes to
+    the content of existing files do not touch the directory mtime; use
+    ``refresh(force=True)`` to pick those up.
+    """
+
+    def __init__(self, root: str, recursive: bool = False):
+        self.root = root
+        self.recursive = recursive
+        self._directories: Dict[str, Tuple[int, List[FileEntry], List[str]]] = {}
+        self._sorted: Dict[str, Tuple[List[FileEntry], List[Tuple]]] = {}
+        self._lock = threading.Lock()
+
+    def refresh(self, force: bool = False) -> int:
+        """Rescan changed directories. Returns the number of directories scanned."""
+        with self._lock:
+            scanned = 0
+            seen = set()
+            pending = [self.root]
+            while pending:
+                directory = pending.pop()
+                seen.add(directory)
+                mtime_ns = os.stat(directory).st_mtime_ns
+                cached = self._directories.get(directory)
+                if force or not cached or cached[0] != mtime_ns:
+                    cached = self._scan(directory, mtime_ns)
+                    self._directories[directory] = cached
+                    scanned += 1
+                if self.recursive:
+                    pending.extend(cached[2])
+
+            removed = set(self._directories) - seen
+            for directory in removed:
+                del self._directories[directory]
+            if scanned or removed:
+                self._sorted.clear()
+            if scanned:
+                logger.info(f"Indexed {scanned} directories under {self.root}")
+            return scanned
+
+    def _scan(self, directory: str, mtime_ns: int) -> Tuple[int, List[FileEntry], List[str]]:
+        files = []
+        subdirectories = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(entry.path)
+                elif entry.is_file():
+                    stat = entry.stat()
+                    name = os.path.relpath(entry.path, self.root)
+                    files.append(FileEntry(name, stat.st_size, stat.st_mtime, *_extension(entry.name)))
+        return mtime_ns, files, subdirectories
+
+    def _sorted_by(self, sort: str) -> Tuple[List[FileEntry], List[Tuple]]:
+        """Entries in ascending (sort field, name) order, and their keys for bisecting."""
+        if sort not in self._sorted:
+            entries = [entry for _, files, _ in self._directories.values() for entry in files]
+            entries.sort(key=lambda entry: (getattr(entry, sort), entry.name))
+            self._sorted[sort] = (entries, [(getattr(entry, sort), entry.name) for entry in entries])
+        return self._sorted[sort]
+
+    def query(
+        self,
+        extensions: Optional[Tuple[str, ...]] = None,
+        pattern: Optional[str] = None,
+        sort: str = "name",
+        descending: bool = False,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[FileEntry], Optional[str]]:
+        """
+        Return one page of matching files and the cursor of the next page.
+
+        `pattern` is a glob matched against the path relative to the root.
+        The cursor encodes the sort key of the last returned entry, so pages
+        stay stable while files are added or removed.
+        """
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"Unsupported sort field: {sort}")
+
+        with self._lock:
+            entries, keys = self._sorted_by(sort)
+
+        if descending:
+            end = bisect_left(keys, _decode_cursor(cursor)) if cursor else len(entries)
+            candidates = (entries[i] for i in range(end - 1, -1, -1))
+        else:
+            start = bisect_right(keys, _decode_cursor(cursor)) if cursor else 0
+            candidates = (entries[i] for i in range(start, len(entries)))
+
+        page = []
+        next_cursor = None
+        for entry in candidates:
+            if extensions and entry.extension not in extensions:
+                continue
+            if pattern and not fnmatch.fnmatch(entry.name, pattern):
+                continue
+            if limit is not None and len(page) == limit:
+                last = page[-1]
+                next_cursor = _encode_cursor((getattr(last, sort), last.name))
+                break
+            page.append(entry)
+        return page, next_cursor
+
+
+class FileIndexRegistry:
+    """Process-wide file indexes, one per connector directory."""
+
+    def __init__(self):
+        self._indexes: Dict[Tuple[str, str, bool], FileIndex] = {}
+        self._lock = threading.Lock()
+
+    def get_index(self, connector_id: str, root: str, recursive: bool = False, refresh: bool = False) -> FileIndex:
+        """Return the index of a connector directory, refreshed incrementally."""
+        key = (str(connector_id), root, recursive)
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None:
+                index = FileIndex(root, recursive)
+                self._indexes[key] = index
+        index.refresh(force=refresh)
+        return index
+
+    def invalidate(self, connector_id: str) -> None:
+        """Drop the indexes of a connector."""
+        with self._lock:
+            for key in [key for key in self._indexes if key[0] == str(connector_id)]:
+                del self._indexes[key]
+
+
+file_indexes = FileIndexRegistry()
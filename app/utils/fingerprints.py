@@ -0,0 +1,200 @@
+# app/utils/fingerprints.py
+import copy
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import pandas as pd
+import sqlalchemy
+
+from app.core.config import settings
+from app.utils.engines import engine_registry
+from app.utils.logging import logger
+from app.utils.sql_pushdown import quote_identifier, quote_table
+
+_SAMPLE_BLOCK = 64 * 1024
+
+
+def file_signature(path: str, sample: Optional[bool] = None) -> str:
+    """
+    Signature of a file version from its size and mtime.
+
+    With `sample` (FINGERPRINT_SAMPLE_HASH by default) the first, middle and
+    last 64 KB are hashed too, which catches rewrites that keep the size and
+    restore the mtime, as copies with preserved timestamps do.
+    """
+    sample = settings.FINGERPRINT_SAMPLE_HASH if sample is None else sample
+    stat = os.stat(path)
+    signature = f"{stat.st_size}:{stat.st_mtime_ns}"
+    if not sample:
+        return signature
+
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for offset in sorted({0, max(stat.st_size // 2 - _SAMPLE_BLOCK // 2, 0), max(stat.st_size - _SAMPLE_BLOCK, 0)}):
+            f.seek(offset)
+            digest.update(f.read(_SAMPLE_BLOCK))
+    return f"{signature}:{digest.hexdigest()}"
+
+
+def _postgres_table_signature(conn, table: str) -> Optional[str]:
+    # Write counters and the relation file node move on every insert, update,
+    # delete and truncate, without scanning the table for xmin
+    row = conn.execute(sqlalchemy.text(
+        "SELECT pg_relation_filenode(relid), n_tup_ins, n_tup_upd, n_tup_del "
+        "FROM pg_stat_all_tables WHERE relid = to_regclass(:table)"
+    ), {"table": quote_table(table, "postgresql")}).first()
+    return ":".join(str(value) for value in row) if row else None
+
+
+def _mysql_table_signature(conn, table: str) -> Optional[str]:
+    schema, _, name = table.rpartition(".")
+    row = conn.execute(sqlalchemy.text(
+        "SELECT UPDATE_TIME, TABLE_ROWS FROM information_schema.tables "
+        "WHERE table_schema = COALESCE(:schema, DATABASE()) AND table_name = :name"
+    ), {"schema": schema or None, "name": name}).first()
+    # InnoDB leaves UPDATE_TIME empty on older servers and after restarts
+    if not row or row[0] is None:
+        return None
+    return f"{row[0]}:{row[1]}"
+
+
+def table_signature(engine, table: Optional[str] = None, query: Optional[str] = None,
+                    updated_at_column: Optional[str] = None) -> Optional[str]:
+    """
+    Cheap signature of the data behind a table or query, or None if unknown.
+
+    A configured `updated_at_column` is used when present as max(column).
+    Otherwise Postgres tables use the pg_stat write counters and MySQL
+    tables information_schema.UPDATE_TIME. Queries without an
+    updated_at_column cannot be fingerprinted.
+    """
+    dialect = engine.dialect.name
+    try:
+        with engine.connect() as conn:
+            if updated_at_column:
+                source = quote_table(table, dialect) if table else f"({query.strip().rstrip(';')}) AS fingerprint_src"
+                value = conn.execute(sqlalchemy.text(
+                    f"SELECT MAX({quote_identifier(updated_at_column, dialect)}) FROM {source}"
+                )).scalar()
+                return None if value is None else f"max:{value}"
+            if table and dialect == "postgresql":
+                return _postgres_table_signature(conn, table)
+            if table and dialect == "mysql":
+                return _mysql_table_signature(conn, table)
+    except Exception as e:
+        logger.warning(f"Could not fingerprint {table or 'query'}: {e}")
+    return None
+
+
+def source_signature(connector, table: Optional[str] = None) -> Optional[str]:
+    """Signature of what a connector reads: its file, or its table or query."""
+    if connector.file_path:
+        return file_signature(connector.file_path) if os.path.isfile(connector.file_path) else None
+    config = connector.config or {}
+    if not table and not config.get("updated_at_column"):
+        # A plain query can only be fingerprinted through an updated_at_column
+        return None
+    if table or config.get("query"):
+        return table_signature(engine_registry.get_engine(connector), table=table,
+                               query=None if table else config["query"],
+                               updated_at_column=config.get("updated_at_column"))
+    return None
+
+
+class FingerprintRegistry:
+    """
+    Process-wide cache of results keyed by the fingerprint of their source.
+
+    Entries are stored per (connector, source, key), where source names a
+    file or table and key the kind of result, such as a preview of n rows.
+    A result is returned only while the source signature is unchanged. A
+    None signature means the source cannot be fingerprinted, and such
+    results are never cached. Least recently used entries are evicted once
+    there are more than `max_entries` or they hold more than `max_bytes`.
+    """
+
+    def __init__(self, max_entries: int = settings.FINGERPRINT_CACHE_MAX_ENTRIES,
+                 max_rows: int = settings.FINGERPRINT_CACHE_MAX_ROWS,
+                 max_bytes: int = settings.FINGERPRINT_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str, Hashable], Tuple[str, Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get_or_compute(self, connector_id: str, source: str, key: Hashable,
+                       signature: Optional[str], compute: Callable[[], Any]) -> Any:
+        """Return the cached result for an unchanged source, or compute and cache it."""
+        entry_key = (str(connector_id), source, key)
+        if signature is not None:
+            with self._lock:
+                cached = self._entries.get(entry_key)
+                if cached and cached[0] == signature:
+                    self._entries.move_to_end(entry_key)
+                    self._hits += 1
+                    logger.info(f"Source {source} of connector {connector_id} unchanged, using cached result")
+                    return _copy(cached[1])
+                self._misses += 1
+
+        value = compute()
+        if signature is not None and self._cacheable(value):
+            size = _size(value)
+            if size > self.max_bytes:
+                return value
+            with self._lock:
+                self._remove(entry_key)
+                self._entries[entry_key] = (signature, _copy(value), size)
+                self._bytes += size
+                while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                    self._remove(next(iter(self._entries)))
+        return value
+
+    def _cacheable(self, value: Any) -> bool:
+        if isinstance(value, pd.DataFrame):
+            return len(value) <= self.max_rows
+        return value is not None
+
+    def _remove(self, entry_key: Tuple[str, str, Hashable]) -> None:
+        entry = self._entries.pop(entry_key, None)
+        if entry:
+            self._bytes -= entry[2]
+
+    def invalidate(self, connector_id: str) -> None:
+        """Drop the cached results of a connector."""
+        with self._lock:
+            for entry_key in [k for k in self._entries if k[0] == str(connector_id)]:
+                self._remove(entry_key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+            }
+
+
+def _size(value: Any) -> int:
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    return sys.getsizeof(value)
+
+
+def _copy(value: Any) -> Any:
+    # Callers may modify what they get back, e.g. by slicing or assigning columns
+    if isinstance(value, pd.DataFrame):
+        return value.copy()
+    return copy.deepcopy(value)
+
+
+fingerprint_registry = FingerprintRegistry()
@@ -0,0 +1,228 @@
+# app/utils/images.py
+import glob
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import settings
+from app.utils.file_index import FILE_EXTENSIONS, FileIndex
+from app.utils.line_index import file_fingerprint
+from app.utils.logging import logger
+
+IMAGE_COLUMNS = ["file", "format", "width", "height", "mode", "size", "mtime", "phash", "thumbnail", "exif"]
+
+# Files processed inline below this count; a process pool does not pay off for a handful of images
+_INLINE_LIMIT = 4
+_HASH_SIZE = 8
+_DCT_SIZE = 32
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _cache_dir() -> str:
+    return os.path.join(settings.READER_CACHE_DIR, "images")
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    k = np.arange(n)[:, None]
+    matrix = np.cos(np.pi * (2 * np.arange(n)[None, :] + 1) * k / (2 * n))
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+_DCT = _dct_matrix(_DCT_SIZE)
+
+
+def perceptual_hash(image) -> str:
+    """
+    64-bit DCT perceptual hash of a PIL image, as 16 hex digits.
+
+    Low frequencies of the 32x32 grayscale DCT are compared against their
+    median, so resizing, recompression and small edits keep the hash close.
+    """
+    from PIL import Image
+
+    pixels = np.asarray(image.convert("L").resize((_DCT_SIZE, _DCT_SIZE), Image.LANCZOS), dtype=np.float64)
+    low = (_DCT @ pixels @ _DCT.T)[:_HASH_SIZE, :_HASH_SIZE]
+    bits = (low > np.median(low)).flatten()
+    return f"{int(''.join('1' if bit else '0' for bit in bits), 2):016x}"
+
+
+def _exif(image) -> Dict[str, str]:
+    from PIL import ExifTags
+
+    tags = {}
+    for tag, value in image.getexif().items():
+        if isinstance(value, bytes):
+            continue
+        tags[str(ExifTags.TAGS.get(tag, tag))] = str(value)[:256]
+    return tags
+
+
+def _process_image(path: str, fingerprint: str, cache_dir: str, thumbnail_size: int) -> Dict[str, Any]:
+    """Extract the metadata of one image and write its thumbnail. Runs in a worker process."""
+    from PIL import Image
+
+    thumbnail_path = os.path.join(cache_dir, f"{fingerprint}.thumb.png")
+    with Image.open(path) as image:
+        record = {
+            "format": image.format,
+            "width": image.width,
+            "height": image.height,
+            "mode": image.mode,
+            "exif": _exif(image),
+        }
+        # JPEG can decode straight at a reduced scale, far cheaper than a full decode
+        image.draft("RGB", (thumbnail_size, thumbnail_size))
+        image.load()
+        record["phash"] = perceptual_hash(image)
+        thumbnail = image.copy()
+        thumbnail.thumbnail((thumbnail_size, thumbnail_size))
+        if thumbnail.mode not in ("RGB", "RGBA", "L", "LA"):
+            thumbnail = thumbnail.convert("RGBA")
+        thumbnail.save(thumbnail_path, "PNG", optimize=False)
+
+    record["thumbnail"] = thumbnail_path
+    path_key = fingerprint.split("-")[0]
+    for stale in glob.glob(os.path.join(cache_dir, f"{path_key}-*")):
+        if not os.path.basename(stale).startswith(fingerprint):
+            os.remove(stale)
+    temp_path = os.path.join(cache_dir, f"{fingerprint}.json.tmp")
+    with open(temp_path, "w") as f:
+        json.dump(record, f)
+    os.replace(temp_path, os.path.join(cache_dir, f"{fingerprint}.json"))
+    return record
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Forking a multi-threaded server can copy a lock another thread holds into the child
+            _executor = ProcessPoolExecutor(max_workers=settings.IMAGE_WORKERS,
+                                            mp_context=multiprocessing.get_context("spawn"))
+        return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def read_images(paths: List[str], root: Optional[str] = None,
+                thumbnail_size: Optional[int] = None) -> pd.DataFrame:
+    """
+    Build a DataFrame of image metadata with cached thumbnails and perceptual hashes.
+
+    Results are cached in READER_CACHE_DIR by file fingerprint, so unchanged
+    images are not decoded again. The remaining images are processed in a
+    process pool of IMAGE_WORKERS. Images that cannot be decoded are logged
+    and left out.
+    """
+    thumbnail_size = thumbnail_size or settings.IMAGE_THUMBNAIL_SIZE
+    cache_dir = _cache_dir()
+    os.makedirs(cache_dir, exist_ok=True)
+
+    records: Dict[str, Dict[str, Any]] = {}
+    pending = []
+    for path in paths:
+        stat = os.stat(path)
+        fingerprint = f"{file_fingerprint(path)}-{thumbnail_size}"
+        cached_path = os.path.join(cache_dir, f"{fingerprint}.json")
+        base = {"file": os.path.relpath(path, root) if root else path, "size": stat.st_size, "mtime": stat.st_mtime}
+        if os.path.exists(cached_path):
+            with open(cached_path) as f:
+                records[path] = {**base, **json.load(f)}
+        else:
+            records[path] = base
+            pending.append((path, fingerprint))
+
+    if pending:
+        logger.info(f"Processing {len(pending)} of {len(paths)} images, {len(paths) - len(pending)} unchanged")
+        if len(pending) <= _INLINE_LIMIT:
+            results = [_safe_process(path, fingerprint, cache_dir, thumbnail_size) for path, fingerprint in pending]
+        else:
+            executor = _get_executor()
+            futures = [executor.submit(_process_image, path, fingerprint, cache_dir, thumbnail_size)
+                       for path, fingerprint in pending]
+            results = [_result_or_none(future, path) for future, (path, _) in zip(futures, pending)]
+        for (path, _), result in zip(pending, results):
+            if result is None:
+                del records[path]
+            else:
+                records[path].update(result)
+
+    return pd.DataFrame([records[path] for path in paths if path in records], columns=IMAGE_COLUMNS)
+
+
+def _safe_process(path: str, fingerprint: str, cache_dir: str, thumbnail_size: int) -> Optional[Dict[str, Any]]:
+    try:
+        return _process_image(path, fingerprint, cache_dir, thumbnail_size)
+    except Exception as e:
+        logger.warning(f"Skipping unreadable image {path}: {e}")
+        return None
+
+
+def _result_or_none(future, path: str) -> Optional[Dict[str, Any]]:
+    try:
+        return future.result()
+    except Exception as e:
+        logger.warning(f"Skipping unreadable image {path}: {e}")
+        return None
+
+
+def read_image_directory(directory: str, recursive: bool = False, pattern: Optional[str] = None,
+                         limit: Optional[int] = None) -> pd.DataFrame:
+    """Read the metadata of the images under a directory, listed through its file index."""
+    index = FileIndex(directory, recursive)
+    index.refresh()
+    entries, _ = index.query(extensions=FILE_EXTENSIONS["image"], pattern=pattern, limit=limit)
+    return read_images([os.path.join(directory, entry.name) for entry in entries], root=directory)
+
+
+def get_thumbnail(path: str, thumbnail_size: Optional[int] = None) -> str:
+    """Return the path of the cached thumbnail of an image, generating it if needed."""
+    records = read_images([path], thumbnail_size=thumbnail_size)
+    if records.empty:
+        raise ValueError(f"Unreadable image: {path}")
+    return records["thumbnail"].iloc[0]
+
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    return np.unpackbits(values.view(np.uint8).reshape(len(values), 8), axis=1).sum(axis=1)
+
+
+def mark_duplicates(images: pd.DataFrame, max_distance: Optional[int] = None) -> pd.DataFrame:
+    """
+    Add a `duplicate_of` column naming the first earlier image whose
+    perceptual hash is within `max_distance` bits, or None.
+
+    Each image is compared against all earlier ones with vectorised XORs,
+    so cost grows quadratically with the number of images.
+    """
+    max_distance = settings.IMAGE_HASH_DISTANCE if max_distance is None else max_distance
+    images = images.copy()
+    if images.empty:
+        images["duplicate_of"] = pd.Series(dtype=object)
+        return images
+
+    hashes = np.array([int(value, 16) for value in images["phash"]], dtype=np.uint64)
+    files = images["file"].tolist()
+    duplicate_of = [None] * len(hashes)
+    for position in range(1, len(hashes)):
+        distances = _popcount(hashes[:position] ^ hashes[position])
+        matches = np.flatnonzero(distances <= max_distance)
+        if len(matches):
+            duplicate_of[position] = files[matches[0]]
+    images["duplicate_of"] = duplicate_of
+    return images
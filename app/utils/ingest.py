@@ -0,0 +1,149 @@
+# app/utils/ingest.py
+import io
+import queue
+import threading
+from typing import Iterator, Optional
+
+import pandas as pd
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.utils.logging import logger
+from app.utils.serializers import ARROW_STREAM, NDJSON
+
+CSV = "text/csv"
+
+INGEST_FORMATS = (NDJSON, CSV, ARROW_STREAM)
+
+# Marks the end of the request body in the part queue
+_END = object()
+
+
+class IngestError(Exception):
+    """An ingest that stopped part way; `stats` has the rows and chunks written before."""
+
+    def __init__(self, message: str, stats: dict):
+        super().__init__(message)
+        self.stats = stats
+
+
+def ingest_format(content_type: Optional[str]) -> str:
+    """Media type of an ingest body from its Content-Type header; raises ValueError if unsupported."""
+    media_type = (content_type or "").partition(";")[0].strip().lower()
+    if media_type not in INGEST_FORMATS:
+        raise ValueError(f"Content-Type must be one of {INGEST_FORMATS}")
+    return media_type
+
+
+class BodyStream(io.RawIOBase):
+    """
+    File-like view of a request body that arrives part by part.
+
+    The request handler puts parts from the event loop while a parser
+    reads them in a worker thread. At most `max_parts` parts are buffered,
+    so a slow destination slows down the upload instead of filling memory.
+    Closing the stream, as the reader does when it stops, drops any parts
+    put afterwards.
+    """
+
+    def __init__(self, max_parts: Optional[int] = None):
+        self._parts: "queue.Queue" = queue.Queue(maxsize=max_parts or settings.INGEST_QUEUE_PARTS)
+        self._buffer = b""
+        self._ended = False
+        self._stopped = threading.Event()
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def offer(self, part) -> bool:
+        """Queue a part without blocking; False when the queue is full."""
+        if self._stopped.is_set():
+            return True
+        try:
+            self._parts.put_nowait(part)
+            return True
+        except queue.Full:
+            return False
+
+    def feed(self, part, timeout: float = 0.5) -> None:
+        """Queue a part, or the end marker, waiting while the queue is full."""
+        while not self._stopped.is_set():
+            try:
+                self._parts.put(part, timeout=timeout)
+                return
+            except queue.Full:
+                continue
+
+    async def put(self, part: bytes) -> None:
+        """Queue a part from the event loop, waiting in a worker thread only while the queue is full."""
+        if not self.offer(part):
+            await run_in_threadpool(self.feed, part)
+
+    async def end(self) -> None:
+        await self.put(_END)
+
+    def readinto(self, buffer) -> int:
+        while not self._buffer and not self._ended:
+            try:
+                part = self._parts.get(timeout=0.5)
+            except queue.Empty:
+                if self._stopped.is_set():
+                    raise OSError("Request body closed before its end")
+                continue
+            if part is _END:
+                self._ended = True
+            else:
+                self._buffer = bytes(part)
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        self.bytes_read += size
+        return size
+
+    def close(self) -> None:
+        self._stopped.set()
+        super().close()
+
+
+def _arrow_frames(stream, chunksize: int) -> Iterator[pd.DataFrame]:
+    import pyarrow as pa
+
+    reader = pa.ipc.open_stream(stream)
+    batches, rows = [], 0
+    for batch in reader:
+        batches.append(batch)
+        rows += batch.num_rows
+        if rows >= chunksize:
+            table = pa.Table.from_batches(batches, schema=reader.schema)
+            for start in range(0, rows - rows % chunksize, chunksize):
+                yield table.slice(start, chunksize).to_pandas()
+            rest = table.slice(rows - rows % chunksize)
+            batches, rows = rest.to_batches(), rest.num_rows
+    if rows:
+        yield pa.Table.from_batches(batches, schema=reader.schema).to_pandas()
+
+
+def iter_ingest_frames(stream: io.RawIOBase, media_type: str, chunksize: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """
+    Parse a streamed body into DataFrames of `chunksize` rows as the bytes arrive.
+
+    CSV needs a header row; NDJSON has one object per line; Arrow bodies
+    are IPC streams, with record batches regrouped into chunks.
+    """
+    chunksize = chunksize or settings.INGEST_CHUNK_ROWS
+    buffered = io.BufferedReader(stream, buffer_size=1024 * 1024)
+    logger.info(f"Parsing {media_type} ingest body in chunks of {chunksize} rows")
+    if media_type == CSV:
+        with pd.read_csv(buffered, chunksize=chunksize) as reader:
+            yield from reader
+    elif media_type == NDJSON:
+        with pd.read_json(buffered, lines=True, chunksize=chunksize) as reader:
+            for frame in reader:
+                if len(frame):
+                    yield frame
+    elif media_type == ARROW_STREAM:
+        yield from _arrow_frames(buffered, chunksize)
+    else:
+        raise ValueError(f"Unsupported ingest format: {media_type}")
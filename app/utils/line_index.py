@@ -0,0 +1,153 @@
+# app/utils/line_index.py
+import glob
+import hashlib
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import settings
+from app.utils.compression import detect_compression
+from app.utils.logging import logger
+
+_BLOCK_SIZE = 16 * 1024 * 1024
+
+# One build lock per file, so scanning a large file does not block pages of other files
+_build_locks: Dict[str, threading.Lock] = {}
+_build_locks_guard = threading.Lock()
+
+
+def _build_lock(path: str) -> threading.Lock:
+    with _build_locks_guard:
+        return _build_locks.setdefault(_path_key(path), threading.Lock())
+
+
+def _path_key(path: str) -> str:
+    return hashlib.sha256(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+
+
+def file_fingerprint(path: str) -> str:
+    """Identify a version of a file by its path, size and modification time."""
+    stat = os.stat(path)
+    version = hashlib.sha256(f"{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8")).hexdigest()[:16]
+    return f"{_path_key(path)}-{version}"
+
+
+class LineIndex:
+    """Byte offsets of every `every`-th line of a text file."""
+
+    def __init__(self, offsets: np.ndarray, lines: int, every: int):
+        self.offsets = offsets
+        self.lines = lines
+        self.every = every
+
+    def seek_line(self, f, line: int) -> None:
+        """Position a binary file object at the start of `line` (0-based)."""
+        if line >= self.lines:
+            f.seek(0, os.SEEK_END)
+            return
+        anchor = line // self.every
+        f.seek(int(self.offsets[anchor]))
+        for _ in range(line - anchor * self.every):
+            f.readline()
+
+
+def build_line_index(path: str, every: int) -> LineIndex:
+    """Scan a file once, recording the offset of every `every`-th line."""
+    offsets = [np.array([0], dtype=np.int64)]
+    newlines_seen = 0
+    position = 0
+    last_byte = b"\n"
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(_BLOCK_SIZE)
+            if not block:
+                break
+            # Offsets of the lines starting right after each newline in this block
+            starts = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == 0x0A).astype(np.int64) + position + 1
+            line_numbers = np.arange(newlines_seen + 1, newlines_seen + 1 + len(starts))
+            offsets.append(starts[line_numbers % every == 0])
+            newlines_seen += len(starts)
+            position += len(block)
+            last_byte = block[-1:]
+
+    lines = newlines_seen + (0 if last_byte == b"\n" else 1)
+    offsets = np.concatenate(offsets)
+    # Drop an anchor pointing at end of file after a trailing newline
+    offsets = offsets[offsets < position] if position else offsets
+    return LineIndex(offsets, lines, every)
+
+
+def get_line_index(path: str, every: Optional[int] = None) -> LineIndex:
+    """
+    Load the sidecar line index of a file, building it on first use.
+
+    Indexes are stored in READER_CACHE_DIR keyed by the file fingerprint, so
+    a modified file gets a fresh index and stale ones are removed.
+    """
+    every = every or settings.LINE_INDEX_EVERY
+    if detect_compression(path):
+        raise ValueError("Paging is not supported for compressed files")
+
+    cache_dir = os.path.join(settings.READER_CACHE_DIR, "line_index")
+    fingerprint = file_fingerprint(path)
+    index_path = os.path.join(cache_dir, f"{fingerprint}.{every}.npz")
+
+    with _build_lock(path):
+        if os.path.exists(index_path):
+            with np.load(index_path) as data:
+                return LineIndex(data["offsets"], int(data["lines"]), every)
+
+        logger.info(f"Building line index for {path} every {every} lines")
+        index = build_line_index(path, every)
+        os.makedirs(cache_dir, exist_ok=True)
+        for stale in glob.glob(os.path.join(cache_dir, f"{_path_key(path)}-*.npz")):
+            os.remove(stale)
+        temp_path = index_path + ".tmp.npz"
+        np.savez(temp_path, offsets=index.offsets, lines=index.lines)
+        os.replace(temp_path, index_path)
+        return index
+
+
+def read_page(path: str, page: int, page_size: int, sep: Optional[str] = ",",
+              columns: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Read rows [page * page_size, (page + 1) * page_size) of a delimited file.
+
+    The first line is the header. Only the requested slice, and only
+    `columns` of it when given, is parsed after seeking to the nearest
+    indexed line. Blank lines are rows of missing values, as in the line
+    index. Quoted fields spanning several lines are not supported, since
+    rows are located by newline.
+    """
+    if page < 0 or page_size < 1:
+        raise ValueError("page must be >= 0 and page_size >= 1")
+
+    index = get_line_index(path)
+    header = pd.read_csv(path, sep=sep, nrows=0).columns.tolist()
+    total_rows = max(index.lines - 1, 0)
+    first_row = page * page_size
+
+    missing = [column for column in columns or [] if column not in header]
+    if missing:
+        raise ValueError(f"Unknown columns: {missing}")
+
+    if first_row >= total_rows:
+        data = pd.DataFrame(columns=columns or header)
+    else:
+        with open(path, "rb") as f:
+            index.seek_line(f, first_row + 1)
+            data = pd.read_csv(f, sep=sep, header=None, names=header, usecols=columns,
+                               nrows=min(page_size, total_rows - first_row), skip_blank_lines=False)
+        if columns:
+            data = data[columns]
+
+    return {
+        "data": data,
+        "page": page,
+        "page_size": page_size,
+        "total_rows": total_rows,
+        "total_pages": (total_rows + page_size - 1) // page_size,
+    }
@@ -0,0 +1,218 @@
+# app/utils/partitioned_reads.py
+import datetime
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional
+
+import pandas as pd
+import sqlalchemy
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.utils.engines import engine_registry
+from app.utils.logging import logger
+from app.utils.sql_pushdown import quote_identifier, quote_table, resolve_dialect, wrap_query
+
+
+def _as_bound(value: Any) -> Any:
+    """Normalise a MIN/MAX result so range arithmetic works on it."""
+    if isinstance(value, str):
+        # SQLite returns timestamps as text
+        return pd.Timestamp(value).to_pydatetime()
+    if isinstance(value, datetime.date) and not isinstance(value, datetime.datetime):
+        return datetime.datetime.combine(value, datetime.time())
+    return value
+
+
+def _linear_boundaries(low: Any, high: Any, partitions: int) -> List[Any]:
+    low, high = _as_bound(low), _as_bound(high)
+    if isinstance(low, datetime.datetime):
+        step = (high - low) / partitions
+        return [low + step * i for i in range(partitions)] + [high]
+    if isinstance(low, int) and isinstance(high, int):
+        step = max((high - low) // partitions, 1)
+        inner = [low + step * i for i in range(1, partitions) if low + step * i < high]
+        return [low] + inner + [high]
+    if isinstance(low, Decimal) or isinstance(high, Decimal):
+        # NUMERIC keys stay exact instead of mixing Decimal and float arithmetic
+        low, high = Decimal(low), Decimal(high)
+        step = (high - low) / partitions
+        return [low + step * i for i in range(partitions)] + [high]
+    step = (float(high) - float(low)) / partitions
+    return [float(low) + step * i for i in range(partitions)] + [high]
+
+
+def _postgres_histogram_boundaries(engine: Engine, table: str, key: str, partitions: int) -> Optional[List[str]]:
+    """Pick equi-depth boundaries from the planner statistics of a Postgres table."""
+    schema, _, table_name = table.rpartition(".")
+    sql = (
+        "SELECT histogram_bounds::text FROM pg_stats "
+        "WHERE tablename = :table AND attname = :column"
+    )
+    params: Dict[str, Any] = {"table": table_name, "column": key}
+    if schema:
+        sql += " AND schemaname = :schema"
+        params["schema"] = schema
+    with engine.connect() as conn:
+        bounds = conn.execute(sqlalchemy.text(sql), params).scalar()
+    if not bounds:
+        return None
+
+    values = [value.strip('"') for value in bounds.strip("{}").split(",")]
+    if len(values) <= partitions:
+        return None
+    step = (len(values) - 1) / partitions
+    return [values[round(step * i)] for i in range(partitions + 1)]
+
+
+def compute_boundaries(engine: Engine, query: str, key: str, partitions: int,
+                       table: Optional[str] = None) -> List[Any]:
+    """
+    Split the key range of a query into `partitions` ranges.
+
+    Postgres tables use the histogram from pg_stats when it is available,
+    which gives ranges of roughly equal row counts. Otherwise the MIN/MAX of
+    the key is split into equally wide ranges.
+    """
+    dialect = resolve_dialect(engine.dialect.name)
+    if table and dialect == "postgresql":
+        boundaries = _postgres_histogram_boundaries(engine, table, key, partitions)
+        if boundaries:
+            # Histogram bounds are samples, so widen the outer ranges to the real extremes
+            low, high = _min_max(engine, query, key, dialect)
+            return [low] + boundaries[1:-1] + [high]
+
+    low, high = _min_max(engine, query, key, dialect)
+    if low is None or high is None:
+        return []
+    if low == high:
+        return [low, high]
+    return _linear_boundaries(low, high, partitions)
+
+
+def _min_max(engine: Engine, query: str, key: str, dialect: str):
+    column = quote_identifier(key, dialect)
+    sql = f"SELECT MIN({column}), MAX({column}) FROM ({query.strip().rstrip(';')}) AS bounds_src"
+    with engine.connect() as conn:
+        low, high = conn.execute(sqlalchemy.text(sql)).one()
+    return _as_bound(low), _as_bound(high)
+
+
+def _range_queries(query: str, dialect: str, key: str, boundaries: List[Any],
+                   columns: Optional[List[str]] = None) -> List[tuple]:
+    ranges = []
+    last = len(boundaries) - 2
+    for index, (low, high) in enumerate(zip(boundaries, boundaries[1:])):
+        filters = [
+            {"column": key, "op": ">=", "value": low},
+            {"column": key, "op": "<=" if index == last else "<", "value": high},
+        ]
+        ranges.append(wrap_query(query, dialect, columns=columns, filters=filters))
+    # Rows without a key value fall outside every range
+    ranges.append(wrap_query(query, dialect, columns=columns,
+                             filters=[{"column": key, "op": "is_null"}]))
+    return ranges
+
+
+# Marks the end of a range in its chunk queue
+_END = object()
+
+# Chunks of one range buffered ahead of the reader
+_RANGE_BUFFER_CHUNKS = 2
+
+
+def _put(chunks: queue.Queue, item: Any, stopped: threading.Event) -> bool:
+    """Queue an item unless the reader has stopped. Returns False once it has."""
+    while not stopped.is_set():
+        try:
+            chunks.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _stream_range(engine: Engine, sql: str, params: Dict[str, Any], chunksize: int,
+                  chunks: queue.Queue, stopped: threading.Event) -> None:
+    try:
+        with engine.connect().execution_options(stream_results=True, max_row_buffer=chunksize) as conn:
+            for chunk in pd.read_sql(sqlalchemy.text(sql), conn, params=params, chunksize=chunksize):
+                if not _put(chunks, chunk, stopped):
+                    return
+    finally:
+        _put(chunks, _END, stopped)
+
+
+def iter_partitioned(connector, key: str, partitions: Optional[int] = None, query: Optional[str] = None,
+                     table: Optional[str] = None, columns: Optional[List[str]] = None,
+                     workers: Optional[int] = None, chunksize: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """
+    Read a query range by range on concurrent pooled connections.
+
+    Each range is streamed in chunks of `chunksize` rows and the chunks are
+    yielded in key order. At most `workers` ranges are in flight and each
+    buffers at most a couple of chunks ahead of the reader, so memory is
+    bounded by chunks rather than by the size of a range.
+    """
+    partitions = partitions or settings.READER_PARTITIONS
+    chunksize = chunksize or settings.READER_CHUNK_SIZE
+    workers = min(workers or settings.READER_PARALLEL_WORKERS, partitions + 1)
+    engine = engine_registry.get_engine(connector)
+    dialect = resolve_dialect(engine.dialect.name)
+    if table:
+        query = f"SELECT * FROM {quote_table(table, dialect)}"
+    query = query or connector.config["query"]
+
+    boundaries = compute_boundaries(engine, query, key, partitions, table=table)
+    if not boundaries:
+        logger.info(f"No key values in {key} for connector {connector.id}, reading without partitions")
+        sql = wrap_query(query, dialect, columns=columns)[0]
+        with engine.connect().execution_options(stream_results=True, max_row_buffer=chunksize) as conn:
+            yield from pd.read_sql(sqlalchemy.text(sql), conn, chunksize=chunksize)
+        return
+
+    ranges = _range_queries(query, dialect, key, boundaries, columns)
+    logger.info(f"Reading connector {connector.id} in {len(ranges)} ranges of {key} with {workers} workers")
+
+    stopped = threading.Event()
+
+    def submit(executor, sql_params):
+        chunks = queue.Queue(maxsize=_RANGE_BUFFER_CHUNKS)
+        future = executor.submit(_stream_range, engine, *sql_params, chunksize, chunks, stopped)
+        return future, chunks
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        try:
+            pending = deque()
+            remaining = iter(ranges)
+            for sql_params in remaining:
+                pending.append(submit(executor, sql_params))
+                if len(pending) >= workers:
+                    break
+            while pending:
+                future, chunks = pending.popleft()
+                while True:
+                    chunk = chunks.get()
+                    if chunk is _END:
+                        break
+                    yield chunk
+                # Raises the error of a range that failed part way
+                future.result()
+                next_range = next(remaining, None)
+                if next_range is not None:
+                    pending.append(submit(executor, next_range))
+        finally:
+            # Lets workers blocked on a full queue exit when the reader stops early
+            stopped.set()
+
+
+def read_partitioned(connector, key: str, partitions: Optional[int] = None, query: Optional[str] = None,
+                     table: Optional[str] = None, columns: Optional[List[str]] = None,
+                     workers: Optional[int] = None) -> pd.DataFrame:
+    """Read a query range by range in parallel and merge the ranges in key order."""
+    frames = list(iter_partitioned(connector, key, partitions, query=query, table=table,
+                                   columns=columns, workers=workers))
+    return pd.concat(frames, ignore_index=True)
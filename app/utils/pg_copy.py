@@ -0,0 +1,179 @@
+# app/utils/pg_copy.py
+import importlib.util
+import os
+import threading
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+import psycopg2.extensions
+import sqlalchemy
+from sqlalchemy.engine import Engine
+
+from app.utils.logging import logger
+
+# Postgres type OIDs mapped to the pandas dtype the CSV column is parsed as
+_INTEGER_OIDS = {20, 21, 23, 26}
+_FLOAT_OIDS = {700, 701}
+# NUMERIC keeps its exact value as Decimal objects
+_NUMERIC_OIDS = {1700}
+_BOOL_OIDS = {16}
+_DATETIME_OIDS = {1082, 1114, 1184}
+
+
+def supports_copy(engine: Engine) -> bool:
+    """Whether reads through this engine can use the COPY fast path."""
+    return engine.dialect.name == "postgresql" and engine.dialect.driver == "psycopg2"
+
+
+def _literal_sql(engine: Engine, cursor, sql: str, params: Optional[Dict[str, Any]]) -> str:
+    """
+    Inline bind parameters, since COPY does not accept them.
+
+    Queries without parameters are sent as written. Otherwise the named
+    parameters are compiled to the driver's format and quoted by psycopg2
+    itself, which also undoes the escaping of literal ``%``.
+    """
+    if not params:
+        return sql
+    compiled = sqlalchemy.text(sql).bindparams(**params).compile(dialect=engine.dialect)
+    encoding = psycopg2.extensions.encodings[cursor.connection.encoding]
+    return cursor.mogrify(compiled.string, compiled.params).decode(encoding)
+
+
+def _column_types(cursor, sql: str) -> Tuple[Dict[str, Any], List[str]]:
+    """Describe the result columns without reading any rows; also returns the NUMERIC columns."""
+    cursor.execute(f"SELECT * FROM ({sql}) AS copy_src LIMIT 0")
+    dtypes: Dict[str, Any] = {}
+    parse_dates = []
+    decimals = []
+    for column in cursor.description:
+        if column.type_code in _INTEGER_OIDS:
+            dtypes[column.name] = "Int64"
+        elif column.type_code in _FLOAT_OIDS:
+            dtypes[column.name] = "float64"
+        elif column.type_code in _NUMERIC_OIDS:
+            dtypes[column.name] = "object"
+            decimals.append(column.name)
+        elif column.type_code in _BOOL_OIDS:
+            dtypes[column.name] = "boolean"
+        elif column.type_code in _DATETIME_OIDS:
+            parse_dates.append(column.name)
+        else:
+            dtypes[column.name] = "object"
+    return {"dtype": dtypes, "parse_dates": parse_dates}, decimals
+
+
+def _to_decimal(value: Any) -> Any:
+    return Decimal(value) if isinstance(value, str) else None
+
+
+def _with_decimals(frame: pd.DataFrame, decimals: List[str]) -> pd.DataFrame:
+    for column in decimals:
+        frame[column] = frame[column].map(_to_decimal).astype(object)
+    return frame
+
+
+def _pyarrow_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def _read_arrow_csv(stream, options: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Parse the whole COPY stream with the multi-threaded Arrow CSV reader.
+
+    Every column gets an explicit Arrow type: pandas' pyarrow engine would
+    infer types first, turning text such as ``00123`` and NUMERIC values
+    into floats before the requested dtype is applied.
+    """
+    import pyarrow as pa
+    from pyarrow import csv
+
+    arrow_types = {"Int64": pa.int64(), "float64": pa.float64(), "boolean": pa.bool_(), "object": pa.string()}
+    column_types = {name: arrow_types[dtype] for name, dtype in options["dtype"].items()}
+    column_types.update({name: pa.string() for name in options["parse_dates"]})
+    convert_options = csv.ConvertOptions(column_types=column_types, true_values=options["true_values"],
+                                         false_values=options["false_values"], strings_can_be_null=True,
+                                         quoted_strings_can_be_null=False)
+    frame = csv.read_csv(stream, convert_options=convert_options).to_pandas(
+        types_mapper={pa.int64(): pd.Int64Dtype(), pa.bool_(): pd.BooleanDtype()}.get
+    )
+    for name in options["parse_dates"]:
+        frame[name] = pd.to_datetime(frame[name])
+    return frame
+
+
+def iter_postgres_copy(engine: Engine, sql: str, params: Optional[Dict[str, Any]] = None,
+                       chunksize: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """
+    Read a query with ``COPY (query) TO STDOUT`` and parse the CSV stream.
+
+    The COPY output is written into a pipe by a background thread while the
+    vectorized CSV parser consumes the other end, so the result is never
+    buffered as Python row objects or as a whole CSV. Yields a single frame
+    when `chunksize` is not given.
+    """
+    raw_connection = engine.raw_connection()
+    read_fd, write_fd = os.pipe()
+    reader = os.fdopen(read_fd, "rb")
+    writer = os.fdopen(write_fd, "wb")
+    errors = []
+    completed = False
+
+    try:
+        cursor = raw_connection.cursor()
+        sql = _literal_sql(engine, cursor, sql.strip().rstrip(";"), params)
+        copy_sql = f"COPY ({sql}) TO STDOUT WITH (FORMAT csv, HEADER true)"
+        options, decimals = _column_types(cursor, sql)
+        # Booleans arrive as t/f
+        options.update(true_values=["t"], false_values=["f"])
+
+        def copy_out():
+            try:
+                cursor.copy_expert(copy_sql, writer)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                _close_quietly(writer)
+
+        thread = threading.Thread(target=copy_out, name="pg-copy-out", daemon=True)
+        thread.start()
+        try:
+            if chunksize:
+                for chunk in pd.read_csv(reader, chunksize=chunksize, **options):
+                    yield _with_decimals(chunk, decimals)
+            elif _pyarrow_available():
+                yield _with_decimals(_read_arrow_csv(reader, options), decimals)
+            else:
+                yield _with_decimals(pd.read_csv(reader, **options), decimals)
+        finally:
+            # Closing the read end unblocks the COPY thread if parsing stopped early
+            reader.close()
+            thread.join()
+        if errors:
+            raise errors[0]
+        completed = True
+    finally:
+        _close_quietly(writer)
+        _close_quietly(reader)
+        if completed:
+            raw_connection.close()
+        else:
+            # A COPY cut short leaves the connection mid-protocol, so it must not go back to the pool
+            raw_connection.invalidate()
+
+
+def _close_quietly(stream) -> None:
+    try:
+        stream.close()
+    except OSError:
+        # The other end of the pipe is already gone
+        pass
+
+
+def read_postgres_copy(engine: Engine, sql: str, params: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+    """Read a whole query result through the COPY fast path."""
+    logger.info("Reading from Postgres with COPY TO STDOUT")
+    # Exhaust the generator so a failed COPY raises instead of returning a truncated frame
+    frames = list(iter_postgres_copy(engine, sql, params))
+    return frames[0]
@@ -0,0 +1,121 @@
+# app/utils/pipeline.py
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import pandas as pd
+
+from app.core.config import settings
+from app.utils.logging import logger
+
+# Marks the end of the source in the chunk queue
+_DONE = object()
+
+
+class _SourceError:
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+def stream_copy(chunks: Iterator[pd.DataFrame], write: Callable[[pd.DataFrame], Any],
+                queue_size: Optional[int] = None, skip_chunks: int = 0,
+                on_commit: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+    """
+    Copy DataFrame chunks from a reader into a writer, reading and writing at once.
+
+    A background thread pulls chunks from `chunks` into a queue of at most
+    `queue_size` chunks while the calling thread writes them, so memory is
+    bounded by that many chunks whatever the size of the source. The first
+    `skip_chunks` chunks are read and dropped, which resumes a copy after
+    its last committed chunk as long as the source yields its rows in the
+    same order.
+
+    `on_commit(chunk_number, rows)` is called after each chunk is written;
+    an exception raised there stops the copy. Returns the counts and the
+    time spent reading, writing and waiting on each side.
+    """
+    queue_size = queue_size or settings.COPY_QUEUE_CHUNKS
+    chunk_queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    timings = {"read_seconds": 0.0, "skipped_rows": 0}
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                chunk_queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def read() -> None:
+        number = 0
+        source = iter(chunks)
+        try:
+            while not stop.is_set():
+                started = time.perf_counter()
+                frame = next(source, _DONE)
+                timings["read_seconds"] += time.perf_counter() - started
+                if frame is _DONE:
+                    break
+                if number < skip_chunks:
+                    timings["skipped_rows"] += len(frame)
+                elif not put((number, frame)):
+                    return
+                number += 1
+            put(_DONE)
+        except Exception as e:
+            put(_SourceError(e))
+        finally:
+            close = getattr(source, "close", None)
+            if close:
+                close()
+
+    reader = threading.Thread(target=read, name="copy-reader", daemon=True)
+    started = time.perf_counter()
+    reader.start()
+
+    rows = 0
+    chunks_written = 0
+    write_seconds = 0.0
+    wait_seconds = 0.0
+    try:
+        while True:
+            wait_started = time.perf_counter()
+            item = chunk_queue.get()
+            wait_seconds += time.perf_counter() - wait_started
+            if item is _DONE:
+                break
+            if isinstance(item, _SourceError):
+                raise item.error
+            number, frame = item
+            write_started = time.perf_counter()
+            if len(frame):
+                write(frame)
+            write_seconds += time.perf_counter() - write_started
+            rows += len(frame)
+            chunks_written += 1
+            if on_commit:
+                on_commit(number, len(frame))
+    finally:
+        stop.set()
+        reader.join()
+
+    elapsed = time.perf_counter() - started
+    stats = {
+        "rows": rows,
+        "chunks": chunks_written,
+        "skipped_chunks": skip_chunks,
+        "skipped_rows": timings["skipped_rows"],
+        "elapsed": elapsed,
+        "read_seconds": timings["read_seconds"],
+        "write_seconds": write_seconds,
+        "writer_wait_seconds": wait_seconds,
+        "rows_per_sec": rows / elapsed if elapsed else 0.0,
+    }
+    logger.info(
+        f"Copied {rows} rows in {chunks_written} chunks, {elapsed:.2f}s, {stats['rows_per_sec']:,.0f} rows/s "
+        f"(read {stats['read_seconds']:.2f}s, write {write_seconds:.2f}s, writer waited {wait_seconds:.2f}s)"
+    )
+    return stats
@@ -1,39 +1,163 @@
 # app/utils/readers.py
+import os
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
 import pandas as pd
-import boto3
 import sqlalchemy
+from app.core.config import settings
+from app.utils import cloud
+from app.utils.compression import open_source
+from app.utils.engines import engine_registry
+from app.utils.file_index import FILE_EXTENSIONS
+from app.utils.images import mark_duplicates, read_image_directory, read_images
 from app.utils.logging import logger
+from app.utils.partitioned_reads import iter_partitioned, read_partitioned
+from app.utils.pg_copy import iter_postgres_copy, read_postgres_copy, supports_copy
+from app.utils.sql_pushdown import quote_table, wrap_query
 
-def read_from_file(connector):
+@contextmanager
+def _open_file(connector):
+    """Open a connector file, decompressing gzip, bz2, xz, zstd and zip on the fly."""
+    source = open_source(connector.file_path, FILE_EXTENSIONS.get(connector.type, ()))
+    try:
+        yield source
+    finally:
+        if not isinstance(source, str):
+            source.close()
+
+def read_from_file(connector, nrows: Optional[int] = None, columns: Optional[List[str]] = None):
+    """
+    Read a connector file.
+
+    `columns` restricts the result to those columns; delimited and Excel
+    files only parse the selected columns.
+    """
     path = connector.file_path
     logger.info(f"Reading file from {path}")
     if connector.type == "csv":
-        return pd.read_csv(path)
+        with _open_file(connector) as source:
+            return _in_order(pd.read_csv(source, nrows=nrows, usecols=columns), columns)
     elif connector.type == "xlsx":
-        return pd.read_excel(path)
+        with _open_file(connector) as source:
+            return _in_order(pd.read_excel(source, nrows=nrows, usecols=columns), columns)
     elif connector.type == "txt":
-        return pd.read_table(path)
+        with _open_file(connector) as source:
+            return _in_order(pd.read_table(source, nrows=nrows, usecols=columns), columns)
     elif connector.type == "pdf":
         # Use pdfplumber or PyMuPDF
         return extract_text_from_pdf(path)
     elif connector.type == "image":
-        return {"image_path": path}  # For now just return path
+        # Metadata, thumbnail and perceptual hash of one image or a whole directory
+        if os.path.isdir(path):
+            return _in_order(mark_duplicates(read_image_directory(path, limit=nrows)), columns)
+        return _in_order(read_images([path]), columns)
     else:
         raise ValueError("Unsupported file type")
 
-def read_from_db(connector):
+def read_from_db(connector, query: Optional[str] = None, table: Optional[str] = None, limit: Optional[int] = None,
+                 columns: Optional[List[str]] = None, filters: Optional[List[Dict[str, Any]]] = None,
+                 sample: bool = False):
+    """
+    Read a query result from a database connector.
+
+    When a limit, projection, filters or sampling are requested, the source
+    query is wrapped so they are evaluated by the database instead of pandas.
+    A table name may be given instead of a query to read that table.
+
+    Connectors configured with a ``partition_column`` are read as parallel
+    key ranges when the whole result is requested. Postgres sources are read
+    with COPY TO STDOUT unless READER_PG_COPY is disabled.
+    """
     logger.info(f"Reading from DB with config: {connector.config}")
-    engine = sqlalchemy.create_engine(connector.config["connection_string"])
-    query = connector.config["query"]
-    return pd.read_sql(query, engine)
-
-def read_from_cloud(connector):
-    logger.info(f"Reading from cloud connector: {connector.connector_type}")
-    # Example for S3
-    if connector.connector_type == "s3":
-        s3 = boto3.client('s3')
-        obj = s3.get_object(Bucket=connector.config["bucket"], Key=connector.config["key"])
-        return pd.read_csv(obj['Body'])
+    engine = engine_registry.get_engine(connector)
+    if table:
+        query = f"SELECT * FROM {quote_table(table, engine.dialect.name)}"
+    query = query or connector.config["query"]
+    if limit is None and not filters and not sample:
+        if connector.config.get("partition_column"):
+            return read_partitioned(connector, connector.config["partition_column"],
+                                    connector.config.get("partitions"), query=query, table=table,
+                                    columns=columns)
+        if not columns:
+            if _use_copy(engine):
+                return read_postgres_copy(engine, query)
+            return pd.read_sql(query, engine)
+
+    sql, params = wrap_query(query, engine.dialect.name, columns=columns, filters=filters,
+                             limit=limit, sample=sample)
+    logger.info(f"Pushed down query for connector {connector.id}: {sql}")
+    if _use_copy(engine):
+        return read_postgres_copy(engine, sql, params)
+    return pd.read_sql(sqlalchemy.text(sql), engine, params=params)
+
+def _use_copy(engine) -> bool:
+    return settings.READER_PG_COPY and supports_copy(engine)
+
+def _in_order(df: pd.DataFrame, columns: Optional[List[str]]) -> pd.DataFrame:
+    # usecols keeps the file order of the columns; return them in the requested order
+    return df[columns] if columns else df
+
+def read_chunks_from_file(connector, chunksize: Optional[int] = None,
+                          columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """Yield DataFrame chunks of a file; formats without chunked parsing yield one chunk."""
+    chunksize = chunksize or settings.READER_CHUNK_SIZE
+    path = connector.file_path
+    logger.info(f"Reading file from {path} in chunks of {chunksize} rows")
+    if connector.type == "csv":
+        with _open_file(connector) as source:
+            for chunk in pd.read_csv(source, chunksize=chunksize, usecols=columns):
+                yield _in_order(chunk, columns)
+    elif connector.type == "txt":
+        with _open_file(connector) as source:
+            for chunk in pd.read_table(source, chunksize=chunksize, usecols=columns):
+                yield _in_order(chunk, columns)
+    elif connector.type in ["xlsx", "pdf", "image"]:
+        yield read_from_file(connector, columns=columns)
+    else:
+        raise ValueError(f"Chunked reads are not supported for {connector.type} files")
+
+def read_chunks_from_db(connector, chunksize: Optional[int] = None,
+                        columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Stream a query result as DataFrame chunks through a server-side cursor.
+
+    Only one chunk of rows is held in the driver and in pandas at a time. The
+    pooled connection is returned when the generator is exhausted or closed.
+    `columns` is pushed down as the SELECT list.
+    """
+    chunksize = chunksize or settings.READER_CHUNK_SIZE
+    if connector.config.get("partition_column"):
+        yield from iter_partitioned(connector, connector.config["partition_column"],
+                                    connector.config.get("partitions"), columns=columns, chunksize=chunksize)
+        return
+
+    logger.info(f"Streaming from DB connector {connector.id} in chunks of {chunksize} rows")
+    engine = engine_registry.get_engine(connector)
+    sql, params = connector.config["query"], {}
+    if columns:
+        sql, params = wrap_query(sql, engine.dialect.name, columns=columns)
+    if _use_copy(engine):
+        yield from iter_postgres_copy(engine, sql, params, chunksize=chunksize)
+        return
+
+    with engine.connect().execution_options(stream_results=True, max_row_buffer=chunksize) as conn:
+        yield from pd.read_sql(sqlalchemy.text(sql), conn, params=params, chunksize=chunksize)
+
+def read_chunks_from_cloud(connector, chunksize: Optional[int] = None,
+                           columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """Yield DataFrame chunks of the selected cloud objects while they download."""
+    logger.info(f"Streaming from cloud connector: {connector.type}")
+    if connector.type == "s3":
+        for chunk in cloud.iter_chunks(connector, chunksize, columns=columns):
+            yield _in_order(chunk, columns)
+        return
+    raise ValueError("Cloud connector not implemented")
+
+def read_from_cloud(connector, columns: Optional[List[str]] = None):
+    logger.info(f"Reading from cloud connector: {connector.type}")
+    # A single key, a list of keys or every object under a prefix
+    if connector.type == "s3":
+        return _in_order(cloud.read_objects(connector, columns=columns), columns)
     raise ValueError("Cloud connector not implemented")
 
 def extract_text_from_pdf(path):
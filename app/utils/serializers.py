@@ -0,0 +1,172 @@
+# app/utils/serializers.py
+import itertools
+import json
+from typing import Iterable, Iterator, Optional, Tuple
+
+import pandas as pd
+
+from app.utils.logging import logger
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+NDJSON = "application/x-ndjson"
+JSON = "application/json"
+
+SUPPORTED_FORMATS = (ARROW_STREAM, NDJSON, JSON)
+
+
+def negotiate_format(accept: Optional[str]) -> str:
+    """
+    Pick the response format from an Accept header.
+
+    Media ranges are ranked by their q parameter; JSON is the default when
+    nothing supported is requested.
+    """
+    if not accept:
+        return JSON
+    ranked = []
+    for position, media_range in enumerate(accept.split(",")):
+        media_type, _, params = media_range.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        ranked.append((-quality, position, media_type.strip().lower()))
+    for quality, _, media_type in sorted(ranked):
+        if quality == 0:
+            break
+        if media_type in SUPPORTED_FORMATS:
+            return media_type
+    return JSON
+
+
+def limit_frames(frames: Iterable[pd.DataFrame], limit: Optional[int]) -> Iterator[pd.DataFrame]:
+    """Stop a stream of frames after `limit` rows."""
+    remaining = limit
+    for frame in frames:
+        if remaining is not None:
+            if remaining <= 0:
+                break
+            frame = frame.iloc[:remaining]
+            remaining -= len(frame)
+        yield frame
+
+
+def prefetch(frames: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """
+    Read the first frame of a lazy stream now.
+
+    A source that fails to open then raises before a streaming response
+    has sent its status line, instead of cutting off a 200 body.
+    """
+    frames = iter(frames)
+    first = next(frames, None)
+    if first is None:
+        return iter(())
+    return itertools.chain([first], frames)
+
+
+def _records_json(frame: pd.DataFrame) -> str:
+    # pandas' C encoder serialises whole columns without building per-row dicts
+    return frame.to_json(orient="records", date_format="iso", default_handler=str)
+
+
+def iter_ndjson(frames: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    """Encode frames as newline-delimited JSON, one chunk per frame."""
+    for frame in frames:
+        if len(frame):
+            yield frame.to_json(orient="records", lines=True, date_format="iso",
+                                default_handler=str).rstrip("\n").encode("utf-8") + b"\n"
+
+
+class _ByteSink:
+    """Write-only file object whose contents are drained after every batch."""
+
+    def __init__(self):
+        self._parts = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def iter_arrow_stream(frames: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    """
+    Encode frames as an Arrow IPC stream, one record batch per frame.
+
+    Arrow-backed columns are handed to pyarrow without conversion. Every
+    batch is built with the schema of the first one, so the stream stays
+    valid when a later chunk infers a different dtype.
+    """
+    import pyarrow as pa
+
+    sink = _ByteSink()
+    writer = None
+    schema = None
+    for frame in frames:
+        table = pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+        if writer is None:
+            schema = table.schema
+            writer = pa.ipc.new_stream(sink, schema)
+        writer.write_table(table)
+        yield sink.drain()
+    if writer is None:
+        logger.info("Arrow stream has no data")
+        return
+    writer.close()
+    yield sink.drain()
+
+
+def iter_json_array(frames: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    """Encode frames as one JSON array of row objects, written frame by frame."""
+    yield b"["
+    first = True
+    for frame in frames:
+        if not len(frame):
+            continue
+        body = _records_json(frame)[1:-1]
+        yield (("" if first else ",") + body).encode("utf-8")
+        first = False
+    yield b"]"
+
+
+def iter_json_object(fields: dict, key: str, frames: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    """Encode ``{<fields>, key: [rows]}`` with the rows written frame by frame."""
+    head = json.dumps(fields, default=str)[:-1]
+    yield (head + (", " if fields else "") + json.dumps(key) + ": ").encode("utf-8")
+    yield from iter_json_array(frames)
+    yield b"}"
+
+
+def iter_json_results(results: Iterable[Tuple[dict, Iterable[pd.DataFrame]]], status: str = "success") -> Iterator[bytes]:
+    """Encode ``{"status": ..., "results": [{<fields>, "data_preview": [rows]}, ...]}`` incrementally."""
+    yield ('{"status": ' + json.dumps(status) + ', "results": [').encode("utf-8")
+    for position, (fields, frames) in enumerate(results):
+        if position:
+            yield b", "
+        yield from iter_json_object(fields, "data_preview", frames)
+    yield b"]}"
+
+
+def iter_encoded(frames: Iterable[pd.DataFrame], media_type: str) -> Iterator[bytes]:
+    """Encode bare frames in a streaming format; JSON becomes an array of rows."""
+    if media_type == ARROW_STREAM:
+        return iter_arrow_stream(frames)
+    if media_type == NDJSON:
+        return iter_ndjson(frames)
+    return iter_json_array(frames)
@@ -0,0 +1,460 @@
+# app/utils/spool.py
+import fcntl
+import hashlib
+import importlib.util
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from app.core.config import settings
+from app.utils.logging import logger
+from app.utils.write_modes import APPEND, validate_write_mode
+
+ARROW_SUFFIX = ".arrow"
+JSON_SUFFIX = ".json.gz"
+
+_OPTIONS_FILE = "stream.json"
+_ACKED_FILE = "acked"
+_LOCK_FILE = "lock"
+_FAILED_DIR = "failed"
+
+
+class SpoolFull(Exception):
+    """The spool stayed over its size limit for the whole backpressure timeout."""
+
+
+def _pyarrow_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def _fsync_dir(path: str) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        # Directories cannot be opened on every platform
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _write_atomic(path: str, write: Callable) -> int:
+    """Write a file under a temporary name, sync it and rename it into place. Returns its size."""
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+        size = f.tell()
+    os.replace(temporary, path)
+    _fsync_dir(os.path.dirname(path))
+    return size
+
+
+def _write_frame(f, data: pd.DataFrame, suffix: str) -> None:
+    if suffix == ARROW_SUFFIX:
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(data, preserve_index=False)
+        with pa.ipc.new_file(f, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        # Table Schema JSON carries the dtypes, so datetimes and nullable columns read back as written
+        data.to_json(f, orient="table", index=False, date_unit="us", default_handler=str,
+                     compression={"method": "gzip", "compresslevel": 1})
+
+
+def read_segment(path: str) -> pd.DataFrame:
+    """Read back the batch of a spool segment."""
+    if path.endswith(ARROW_SUFFIX):
+        import pyarrow as pa
+
+        with pa.memory_map(path) as source:
+            return pa.ipc.open_file(source).read_all().to_pandas()
+    return pd.read_json(path, orient="table", compression="gzip")
+
+
+class _Segment:
+    __slots__ = ("offset", "rows", "size", "path", "created")
+
+    def __init__(self, offset: int, rows: int, size: int, path: str, created: float):
+        self.offset = offset
+        self.rows = rows
+        self.size = size
+        self.path = path
+        self.created = created
+
+    @classmethod
+    def from_path(cls, path: str) -> Optional["_Segment"]:
+        # Segments are named <offset>-<rows><suffix>
+        name = os.path.basename(path)
+        stem = name[:-len(ARROW_SUFFIX)] if name.endswith(ARROW_SUFFIX) else name[:-len(JSON_SUFFIX)]
+        offset, _, rows = stem.partition("-")
+        if not name.endswith((ARROW_SUFFIX, JSON_SUFFIX)) or not offset.isdigit() or not rows.isdigit():
+            return None
+        stat = os.stat(path)
+        return cls(int(offset), int(rows), stat.st_size, path, stat.st_mtime)
+
+
+class _SpoolStream:
+    """
+    Pending segments of one destination table and write mode, drained in offset order.
+
+    Only the process holding the lock file of the stream directory appends
+    to it, recovers it and drains it.
+    """
+
+    def __init__(self, key: str, directory: str, options: Dict[str, Any]):
+        self.key = key
+        self.directory = directory
+        self.options = options
+        self.lock_fd: Optional[int] = None
+        self.segments: "deque[_Segment]" = deque()
+        self.acked = 0
+        self.next_offset = 1
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.table_ready = False
+        self.attempts = 0
+        self.last_error: Optional[str] = None
+        self.failed_segments = 0
+        self.rows_drained = 0
+        self.last_drained_at: Optional[float] = None
+
+    def claim(self) -> bool:
+        """Take the lock file of the stream directory. Returns False when another process holds it."""
+        os.makedirs(self.directory, exist_ok=True)
+        fd = os.open(os.path.join(self.directory, _LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self.lock_fd = fd
+        return True
+
+    def release(self) -> None:
+        if self.lock_fd is not None:
+            os.close(self.lock_fd)
+            self.lock_fd = None
+
+    def save_options(self) -> None:
+        _write_atomic(os.path.join(self.directory, _OPTIONS_FILE),
+                      lambda f: f.write(json.dumps(self.options).encode("utf-8")))
+
+    def save_acked(self) -> None:
+        _write_atomic(os.path.join(self.directory, _ACKED_FILE),
+                      lambda f: f.write(str(self.acked).encode("utf-8")))
+
+    def recover(self) -> None:
+        """Load the acknowledged offset and the segments appended after it."""
+        acked_path = os.path.join(self.directory, _ACKED_FILE)
+        if os.path.exists(acked_path):
+            with open(acked_path) as f:
+                self.acked = int(f.read().strip() or 0)
+        segments = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(".tmp"):
+                # Never renamed into place, so never acknowledged to the caller
+                os.remove(path)
+                continue
+            segment = _Segment.from_path(path)
+            if segment is None:
+                continue
+            if segment.offset <= self.acked:
+                os.remove(path)
+            else:
+                segments.append(segment)
+        self.segments = deque(sorted(segments, key=lambda segment: segment.offset))
+        self.next_offset = max([self.acked] + [segment.offset for segment in segments]) + 1
+
+    def stats(self, now: float) -> Dict[str, Any]:
+        with self.lock:
+            segments = list(self.segments)
+        return {
+            "connector_id": self.options["connector_id"],
+            "table_name": self.options["table_name"],
+            "mode": self.options["mode"],
+            "appended_offset": self.next_offset - 1,
+            "acked_offset": self.acked,
+            "pending_segments": len(segments),
+            "pending_rows": sum(segment.rows for segment in segments),
+            "pending_bytes": sum(segment.size for segment in segments),
+            "lag_seconds": now - segments[0].created if segments else 0.0,
+            "attempts": self.attempts,
+            "last_error": self.last_error,
+            "failed_segments": self.failed_segments,
+            "rows_drained": self.rows_drained,
+            "last_drained_at": self.last_drained_at,
+        }
+
+
+class WriteSpool:
+    """
+    Write-ahead spool between accepted batches and their destinations.
+
+    append() stores a batch as a segment file and returns once it is on
+    disk: Arrow IPC when pyarrow is installed, gzipped Table Schema JSON
+    otherwise. One background thread per destination table and write mode
+    writes the segments in order, retrying with exponential backoff, and
+    records the offset of each written segment before deleting it.
+    Segments are therefore written at least once: a crash between a write
+    and its acknowledgement writes that segment again after restart.
+
+    Once the pending segments exceed `max_bytes`, append() waits for the
+    drainers to catch up and raises SpoolFull after `backpressure_timeout`.
+    A segment still failing after `max_attempts` writes is moved to the
+    stream's failed/ directory so the segments behind it can proceed.
+
+    Several worker processes can share the spool directory. Each stream
+    directory is held by one process through its lock file, so no segment
+    is drained or acknowledged twice; a process finding a stream's
+    directory held appends to the next one (<key>-0, <key>-1, ...).
+    Directories left by a process that exited are taken over by the next
+    process that starts or appends to that stream. Spool size and stats
+    cover the streams of the current process.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None,
+                 backpressure_timeout: Optional[float] = None, max_attempts: Optional[int] = None,
+                 backoff: Optional[float] = None, max_backoff: Optional[float] = None):
+        self.directory = directory or settings.SPOOL_DIR
+        self.max_bytes = max_bytes or settings.SPOOL_MAX_BYTES
+        self.backpressure_timeout = settings.SPOOL_BACKPRESSURE_TIMEOUT if backpressure_timeout is None else backpressure_timeout
+        self.max_attempts = max_attempts or settings.SPOOL_MAX_ATTEMPTS
+        self.backoff = settings.SPOOL_RETRY_BACKOFF if backoff is None else backoff
+        self.max_backoff = settings.SPOOL_RETRY_MAX_BACKOFF if max_backoff is None else max_backoff
+        # Held stream directories by name, and the one appended to for each stream key
+        self._streams: Dict[str, _SpoolStream] = {}
+        self._appending: Dict[str, _SpoolStream] = {}
+        self._lock = threading.Lock()
+        self._space = threading.Condition(self._lock)
+        self._bytes = 0
+        self._write: Optional[Callable[..., Any]] = None
+        self._stop = threading.Event()
+
+    @staticmethod
+    def stream_key(options: Dict[str, Any]) -> str:
+        identity = {name: options[name] for name in ("connector_id", "table_name", "mode", "merge_keys", "partition_by")}
+        return hashlib.sha1(json.dumps(identity, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+    def start(self, write: Callable[..., Any]) -> None:
+        """
+        Recover the segments left by a previous process and start draining.
+
+        `write(connector_id, data, table_name, create_table=, mode=,
+        merge_keys=, partition_by=, table_schema=)` writes one batch to its
+        destination. Stream directories held by other processes are skipped.
+        """
+        self._write = write
+        self._stop.clear()
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            for name in os.listdir(self.directory):
+                if name not in self._streams:
+                    self._open_stream(name)
+            streams = list(self._streams.values())
+            recovered = sum(len(stream.segments) for stream in streams)
+        for stream in streams:
+            self._ensure_drainer(stream)
+        logger.info(f"Write spool at {self.directory} started with {recovered} pending segments")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the drainers after their current write; pending segments stay on disk."""
+        self._stop.set()
+        with self._lock:
+            streams = list(self._streams.values())
+        for stream in streams:
+            stream.wakeup.set()
+        for stream in streams:
+            if stream.thread:
+                stream.thread.join(timeout)
+        # Hand the stream directories over to other processes; a drainer still
+        # writing keeps its directory until this process exits
+        with self._lock:
+            for stream in streams:
+                if stream.thread and stream.thread.is_alive():
+                    continue
+                stream.release()
+                del self._streams[stream.key]
+                self._bytes -= sum(segment.size for segment in stream.segments)
+            self._appending = {key: stream for key, stream in self._appending.items() if stream.lock_fd is not None}
+
+    def append(self, connector_id: str, data: pd.DataFrame, table_name: str, create_table: bool = False,
+               mode: str = APPEND, merge_keys: Optional[List[str]] = None,
+               partition_by: Optional[str] = None, table_schema: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        Durably accept a batch for a destination table.
+
+        `table_schema` is kept with the stream and gives the column types
+        when the drainer creates the table.
+
+        Returns:
+            Dict[str, Any]: Offset of the batch in its stream, rows and bytes spooled
+        """
+        validate_write_mode(mode, merge_keys, columns=[str(column) for column in data.columns])
+        self._wait_for_space()
+        options = {"connector_id": str(connector_id), "table_name": table_name, "mode": mode,
+                   "merge_keys": merge_keys, "partition_by": partition_by, "create_table": create_table,
+                   "table_schema": table_schema}
+        stream = self._stream(options)
+
+        suffix = ARROW_SUFFIX if _pyarrow_available() else JSON_SUFFIX
+        # Appends to one stream are serialized so offsets reach the drainer in order
+        with stream.lock:
+            changed = {}
+            if create_table and not stream.options["create_table"]:
+                changed["create_table"] = True
+            if table_schema and not stream.options.get("table_schema"):
+                changed["table_schema"] = table_schema
+            if changed:
+                stream.options.update(changed)
+                stream.save_options()
+            offset = stream.next_offset
+            path = os.path.join(stream.directory, f"{offset:012d}-{len(data)}{suffix}")
+            size = _write_atomic(path, lambda f: _write_frame(f, data, suffix))
+            stream.next_offset += 1
+            stream.segments.append(_Segment(offset, len(data), size, path, time.time()))
+        with self._lock:
+            self._bytes += size
+        stream.wakeup.set()
+        self._ensure_drainer(stream)
+        return {"spooled": True, "offset": offset, "rows": len(data), "bytes": size}
+
+    def stats(self, connector_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Spool size and the lag of every stream, or of the streams of the given connectors."""
+        now = time.time()
+        with self._lock:
+            streams = list(self._streams.values())
+            spool_bytes = self._bytes
+        return {
+            "spool_bytes": spool_bytes,
+            "max_bytes": self.max_bytes,
+            "draining": self._write is not None and not self._stop.is_set(),
+            "streams": [stream.stats(now) for stream in streams
+                        if connector_ids is None or stream.options["connector_id"] in connector_ids],
+        }
+
+    def _wait_for_space(self) -> None:
+        deadline = time.monotonic() + self.backpressure_timeout
+        with self._space:
+            while self._bytes >= self.max_bytes:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise SpoolFull(f"Write spool is over {self.max_bytes} bytes; destinations are not keeping up")
+                self._space.wait(remaining)
+
+    def _stream(self, options: Dict[str, Any]) -> _SpoolStream:
+        """The stream directory this process appends to for the destination table and mode of `options`."""
+        key = self.stream_key(options)
+        with self._lock:
+            stream = self._appending.get(key)
+            for lane in itertools.count():
+                if stream is not None:
+                    break
+                name = f"{key}-{lane}"
+                stream = self._streams.get(name) or self._open_stream(name, options)
+            self._appending[key] = stream
+        return stream
+
+    def _open_stream(self, name: str, options: Optional[Dict[str, Any]] = None) -> Optional[_SpoolStream]:
+        """
+        Claim a stream directory and recover the segments left in it.
+
+        A new directory is created when `options` are given. Returns None
+        when another process holds the directory, or it holds no stream.
+        Called with the spool lock held.
+        """
+        directory = os.path.join(self.directory, name)
+        options_path = os.path.join(directory, _OPTIONS_FILE)
+        if options is None and not os.path.exists(options_path):
+            return None
+        stream = _SpoolStream(name, directory, dict(options or {}))
+        if not stream.claim():
+            return None
+        if os.path.exists(options_path):
+            # Written by a previous holder, with the table options its appends added
+            with open(options_path) as f:
+                stream.options = json.load(f)
+            stream.recover()
+        else:
+            stream.save_options()
+        self._streams[name] = stream
+        self._appending.setdefault(self.stream_key(stream.options), stream)
+        self._bytes += sum(segment.size for segment in stream.segments)
+        return stream
+
+    def _ensure_drainer(self, stream: _SpoolStream) -> None:
+        with self._lock:
+            if self._write is None or self._stop.is_set() or (stream.thread and stream.thread.is_alive()):
+                return
+            stream.thread = threading.Thread(target=self._drain, args=(stream,), name=f"spool-{stream.key[:8]}", daemon=True)
+            stream.thread.start()
+
+    def _drain(self, stream: _SpoolStream) -> None:
+        options = stream.options
+        while not self._stop.is_set():
+            with stream.lock:
+                segment = stream.segments[0] if stream.segments else None
+            if segment is None:
+                stream.wakeup.wait(1.0)
+                stream.wakeup.clear()
+                continue
+
+            try:
+                data = read_segment(segment.path)
+                self._write(options["connector_id"], data, options["table_name"],
+                            create_table=options["create_table"] and not stream.table_ready,
+                            mode=options["mode"], merge_keys=options["merge_keys"],
+                            partition_by=options["partition_by"], table_schema=options.get("table_schema"))
+            except Exception as e:
+                stream.attempts += 1
+                stream.last_error = str(e)
+                if stream.attempts < self.max_attempts:
+                    delay = min(self.backoff * 2 ** (stream.attempts - 1), self.max_backoff)
+                    logger.warning(f"Spooled write {segment.offset} to {options['table_name']} failed "
+                                   f"(attempt {stream.attempts}), retrying in {delay:.1f}s: {e}")
+                    self._stop.wait(delay)
+                    continue
+                logger.error(f"Giving up on spooled write {segment.offset} to {options['table_name']} "
+                             f"after {stream.attempts} attempts: {e}")
+                self._ack(stream, segment, failed=True)
+                continue
+
+            stream.table_ready = True
+            stream.rows_drained += segment.rows
+            stream.last_drained_at = time.time()
+            self._ack(stream, segment)
+
+    def _ack(self, stream: _SpoolStream, segment: _Segment, failed: bool = False) -> None:
+        stream.acked = segment.offset
+        stream.save_acked()
+        if failed:
+            failed_dir = os.path.join(stream.directory, _FAILED_DIR)
+            os.makedirs(failed_dir, exist_ok=True)
+            os.replace(segment.path, os.path.join(failed_dir, os.path.basename(segment.path)))
+            stream.failed_segments += 1
+        else:
+            os.remove(segment.path)
+        stream.attempts = 0
+        if not failed:
+            stream.last_error = None
+        with stream.lock:
+            stream.segments.popleft()
+        with self._space:
+            self._bytes -= segment.size
+            self._space.notify_all()
+
+
+write_spool = WriteSpool()
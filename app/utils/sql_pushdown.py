@@ -0,0 +1,119 @@
+# app/utils/sql_pushdown.py
+from typing import Any, Dict, List, Optional, Tuple
+
+# Connector types and SQLAlchemy dialect names mapped to the dialects we generate SQL for
+DIALECTS = {
+    "postgres": "postgresql",
+    "postgresql": "postgresql",
+    "mysql": "mysql",
+    "mariadb": "mysql",
+    "clickhouse": "clickhouse",
+    "sqlite": "sqlite",
+}
+
+RANDOM_FUNCTIONS = {
+    "postgresql": "random()",
+    "mysql": "RAND()",
+    "clickhouse": "rand()",
+    "sqlite": "random()",
+}
+
+COMPARISON_OPERATORS = {
+    "=": "=",
+    "eq": "=",
+    "!=": "<>",
+    "ne": "<>",
+    "<": "<",
+    "lt": "<",
+    "<=": "<=",
+    "lte": "<=",
+    ">": ">",
+    "gt": ">",
+    ">=": ">=",
+    "gte": ">=",
+    "like": "LIKE",
+}
+
+
+def resolve_dialect(name: str) -> str:
+    """Normalise a connector type or SQLAlchemy dialect name."""
+    dialect = DIALECTS.get((name or "").lower())
+    if not dialect:
+        raise ValueError(f"Query pushdown is not supported for dialect: {name}")
+    return dialect
+
+
+def quote_identifier(name: str, dialect: str) -> str:
+    """Quote a column or table identifier for the given dialect."""
+    dialect = resolve_dialect(dialect)
+    if dialect in ("mysql", "clickhouse"):
+        return "`" + name.replace("`", "``") + "`"
+    return '"' + name.replace('"', '""') + '"'
+
+
+def quote_table(name: str, dialect: str) -> str:
+    """Quote a possibly schema-qualified table name."""
+    return ".".join(quote_identifier(part, dialect) for part in name.split("."))
+
+
+def _build_filters(filters: List[Dict[str, Any]], dialect: str) -> Tuple[List[str], Dict[str, Any]]:
+    clauses = []
+    params: Dict[str, Any] = {}
+    for index, condition in enumerate(filters):
+        column = quote_identifier(condition["column"], dialect)
+        op = str(condition.get("op", "=")).lower()
+        value = condition.get("value")
+
+        if op == "is_null":
+            clauses.append(f"{column} IS NULL")
+        elif op == "not_null":
+            clauses.append(f"{column} IS NOT NULL")
+        elif op in ("in", "not_in"):
+            values = list(value or [])
+            if not values:
+                raise ValueError(f"Filter '{op}' on {condition['column']} needs at least one value")
+            names = [f"pushdown_{index}_{position}" for position in range(len(values))]
+            params.update(zip(names, values))
+            keyword = "IN" if op == "in" else "NOT IN"
+            clauses.append(f"{column} {keyword} ({', '.join(':' + name for name in names)})")
+        elif op in COMPARISON_OPERATORS:
+            name = f"pushdown_{index}"
+            params[name] = value
+            clauses.append(f"{column} {COMPARISON_OPERATORS[op]} :{name}")
+        else:
+            raise ValueError(f"Unsupported filter operator: {op}")
+    return clauses, params
+
+
+def wrap_query(
+    query: str,
+    dialect: str,
+    columns: Optional[List[str]] = None,
+    filters: Optional[List[Dict[str, Any]]] = None,
+    limit: Optional[int] = None,
+    sample: bool = False,
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Wrap a source query so projection, filters and LIMIT run in the database.
+
+    Filters are dicts of ``column``, ``op`` and ``value``; values are returned
+    as bind parameters for ``sqlalchemy.text``. With ``sample`` the rows are
+    ordered randomly before the limit, which costs a full scan of the source.
+
+    Returns:
+        Tuple[str, Dict[str, Any]]: The wrapped SQL and its bind parameters
+    """
+    dialect = resolve_dialect(dialect)
+    inner = query.strip().rstrip(";")
+    projection = ", ".join(quote_identifier(column, dialect) for column in columns) if columns else "*"
+    sql = f"SELECT {projection} FROM ({inner}) AS pushdown_src"
+
+    params: Dict[str, Any] = {}
+    if filters:
+        clauses, params = _build_filters(filters, dialect)
+        sql += " WHERE " + " AND ".join(clauses)
+    if sample:
+        sql += f" ORDER BY {RANDOM_FUNCTIONS[dialect]}"
+    if limit is not None:
+        sql += f" LIMIT {int(limit)}"
+    return sql, params
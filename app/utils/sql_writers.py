@@ -0,0 +1,369 @@
+# app/utils/sql_writers.py
+import io
+import time
+import uuid
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+import sqlalchemy
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.utils.logging import logger
+from app.utils.sql_pushdown import quote_identifier, quote_table
+from app.utils.write_modes import APPEND, REPLACE, REPLACE_PARTITION, UPSERT, dedupe, validate_write_mode
+
+# Written unquoted for missing values. Every value is quoted, so COPY reads only
+# the marker back as NULL, and empty or "\N" strings stay strings
+_COPY_NULL = "\\N"
+
+_COPY_DATE_FORMAT = "%Y-%m-%d %H:%M:%S.%f%z"
+
+
+class _CsvStream(io.RawIOBase):
+    """File-like view of CSV text rendered batch by batch, as COPY reads it."""
+
+    def __init__(self, parts: Iterator[bytes]):
+        self._parts = parts
+        self._buffer = b""
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            part = next(self._parts, None)
+            if part is None:
+                break
+            self._buffer += part
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        self.bytes_read += len(data)
+        return data
+
+
+def _csv_fields(column: pd.Series) -> pd.Series:
+    if pd.api.types.is_datetime64_any_dtype(column.dtype):
+        text = column.dt.strftime(_COPY_DATE_FORMAT)
+    else:
+        text = column.astype(str)
+    return ('"' + text.str.replace('"', '""', regex=False) + '"').mask(column.isna(), _COPY_NULL)
+
+
+def _csv_parts(data: pd.DataFrame, rows: int) -> Iterator[bytes]:
+    for start in range(0, len(data), rows):
+        fields = [_csv_fields(column) for _, column in data.iloc[start:start + rows].items()]
+        lines = fields[0].str.cat(fields[1:], sep=",")
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _split_table(table: str):
+    schema, _, name = table.rpartition(".")
+    return schema or None, name
+
+
+def table_exists(engine: Engine, table: str) -> bool:
+    schema, name = _split_table(table)
+    return sqlalchemy.inspect(engine).has_table(name, schema=schema)
+
+
+def has_unique_key(engine: Engine, table: str, keys: List[str]) -> bool:
+    """Whether the primary key or a unique constraint or index covers exactly `keys`."""
+    schema, name = _split_table(table)
+    inspector = sqlalchemy.inspect(engine)
+    candidates = [inspector.get_pk_constraint(name, schema=schema).get("constrained_columns") or []]
+    candidates += [constraint["column_names"] for constraint in inspector.get_unique_constraints(name, schema=schema)]
+    candidates += [index["column_names"] for index in inspector.get_indexes(name, schema=schema) if index.get("unique")]
+    return any(set(columns) == set(keys) for columns in candidates)
+
+
+def create_table_from_frame(engine: Engine, table: str, data: pd.DataFrame,
+                            merge_keys: Optional[List[str]] = None) -> None:
+    """
+    Create `table` with the column types pandas infers for `data`.
+
+    On Postgres a unique index on the merge keys is added, so upserts can
+    use ON CONFLICT. MySQL cannot index the TEXT columns pandas creates for
+    strings, so its upserts fall back to delete-and-insert.
+    """
+    schema, name = _split_table(table)
+    data.head(0).to_sql(name, engine, schema=schema, index=False, if_exists="fail")
+    if merge_keys and engine.dialect.name == "postgresql":
+        keys = ", ".join(quote_identifier(key, "postgresql") for key in merge_keys)
+        index = quote_identifier(f"{name}_merge_keys", "postgresql")
+        with engine.begin() as conn:
+            conn.execute(sqlalchemy.text(f"CREATE UNIQUE INDEX {index} ON {quote_table(table, 'postgresql')} ({keys})"))
+    logger.info(f"Created table {table} from DataFrame columns")
+
+
+def create_table_from_schema(engine: Engine, table: str, table_schema: Dict[str, str],
+                             merge_keys: Optional[List[str]] = None) -> None:
+    """Create `table` with the declared column types if it does not exist, unique on the merge keys."""
+    dialect = engine.dialect.name
+    column_definitions = [f"{quote_identifier(column, dialect)} {dtype}" for column, dtype in table_schema.items()]
+    if merge_keys:
+        column_definitions.append(f"UNIQUE ({', '.join(quote_identifier(key, dialect) for key in merge_keys)})")
+    with engine.begin() as conn:
+        conn.execute(sqlalchemy.text(
+            f"CREATE TABLE IF NOT EXISTS {quote_table(table, dialect)} ({', '.join(column_definitions)})"
+        ))
+
+
+def _prepare_table(engine: Engine, table: str, data: pd.DataFrame, mode: str, merge_keys: Optional[List[str]],
+                   partition_by: Optional[str], create_table: bool) -> bool:
+    """Validate a write and create the table if needed. Returns whether the table existed."""
+    validate_write_mode(mode, merge_keys, columns=[str(column) for column in data.columns])
+    if mode == REPLACE_PARTITION and (not partition_by or partition_by not in data.columns):
+        raise ValueError("replace-partition writes need a partition_by column of the data")
+    exists = table_exists(engine, table)
+    if not exists:
+        if not create_table:
+            raise ValueError(f"Table {table} does not exist")
+        create_table_from_frame(engine, table, data, merge_keys)
+    return exists
+
+
+def _copy_from_frame(cursor, table: str, data: pd.DataFrame, rows_per_part: int, quoted: bool = False) -> int:
+    columns = ", ".join(quote_identifier(column, "postgresql") for column in data.columns)
+    stream = _CsvStream(_csv_parts(data, rows_per_part))
+    cursor.copy_expert(
+        f"COPY {table if quoted else quote_table(table, 'postgresql')} ({columns}) FROM STDIN "
+        f"WITH (FORMAT csv, NULL '{_COPY_NULL}')",
+        stream, size=1024 * 1024
+    )
+    return stream.bytes_read
+
+
+def _merge_from_staging(cursor, engine: Engine, table: str, staging: str, data: pd.DataFrame, mode: str,
+                        merge_keys: Optional[List[str]], partition_by: Optional[str]) -> str:
+    """Move the rows of a staging table into `table` as an upsert or a partition replace."""
+    quoted_table = quote_table(table, "postgresql")
+    data_columns = [quote_identifier(column, "postgresql") for column in data.columns]
+    columns = ", ".join(data_columns)
+    insert = f"INSERT INTO {quoted_table} ({columns}) SELECT {columns} FROM {staging}"
+
+    if mode == UPSERT and has_unique_key(engine, table, merge_keys):
+        keys = [quote_identifier(key, "postgresql") for key in merge_keys]
+        updates = [f"{column} = EXCLUDED.{column}" for column in data_columns if column not in keys]
+        action = f"DO UPDATE SET {', '.join(updates)}" if updates else "DO NOTHING"
+        cursor.execute(f"{insert} ON CONFLICT ({', '.join(keys)}) {action}")
+        return "on_conflict"
+
+    if mode == UPSERT:
+        # No unique key to conflict on: delete the rows being replaced, then insert
+        matches = " AND ".join(
+            f"t.{key} IS NOT DISTINCT FROM s.{key}"
+            for key in (quote_identifier(key, "postgresql") for key in merge_keys)
+        )
+        cursor.execute(f"DELETE FROM {quoted_table} AS t USING {staging} AS s WHERE {matches}")
+        cursor.execute(insert)
+        return "delete_insert"
+
+    partition = quote_identifier(partition_by, "postgresql")
+    cursor.execute(
+        f"DELETE FROM {quoted_table} AS t WHERE EXISTS "
+        f"(SELECT 1 FROM {staging} AS s WHERE s.{partition} IS NOT DISTINCT FROM t.{partition})"
+    )
+    cursor.execute(insert)
+    return "partition_delete_insert"
+
+
+def _move_owned_sequences(cursor, table: str, target: str) -> None:
+    """
+    Make the sequences of `table`'s serial columns belong to the same columns of `target`.
+
+    A table created with LIKE ... INCLUDING DEFAULTS keeps calling the old
+    table's sequences, which are dropped with the table they belong to.
+    """
+    cursor.execute(
+        "SELECT d.objid::regclass::text, a.attname FROM pg_depend d "
+        "JOIN pg_class s ON s.oid = d.objid AND s.relkind = 'S' "
+        "JOIN pg_attribute a ON a.attrelid = d.refobjid AND a.attnum = d.refobjsubid "
+        "WHERE d.classid = 'pg_class'::regclass AND d.refobjid = %s::regclass AND d.deptype = 'a'",
+        (table,)
+    )
+    for sequence, column in cursor.fetchall():
+        cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {target}.{quote_identifier(column, 'postgresql')}")
+
+
+def copy_to_postgres(engine: Engine, table: str, data: pd.DataFrame, mode: str = APPEND,
+                     merge_keys: Optional[List[str]] = None, partition_by: Optional[str] = None,
+                     create_table: bool = True, rows_per_part: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Load a DataFrame into a Postgres table with ``COPY ... FROM STDIN``.
+
+    Rows are rendered to CSV `rows_per_part` rows at a time while COPY
+    consumes them, so the whole CSV is never held in memory. Every mode
+    runs in one transaction, so a load lands completely or not at all.
+
+    - append copies straight into the table.
+    - upsert copies into a temporary table and merges it with INSERT ...
+      ON CONFLICT when a unique key covers the merge keys, or otherwise by
+      deleting the matching rows before inserting. Only the last row of
+      each key in the data is kept.
+    - replace-partition copies into a temporary table, deletes the rows of
+      every `partition_by` value it contains and inserts the new rows.
+    - replace copies into a staging table that then takes the place of
+      `table` by rename, so readers see either the old or the new contents.
+      The staging table copies the columns, defaults, constraints and
+      indexes of the existing table, and takes over the sequences of its
+      serial columns. Tables that views depend on cannot be dropped, so
+      their replace fails and leaves the table untouched.
+    """
+    exists = _prepare_table(engine, table, data, mode, merge_keys, partition_by, create_table)
+    rows_per_part = rows_per_part or settings.PG_COPY_ROWS_PER_PART
+    if mode == UPSERT:
+        data = dedupe(data, merge_keys)
+
+    schema, name = _split_table(table)
+    quoted_table = quote_table(table, "postgresql")
+    strategy = "copy"
+    started = time.perf_counter()
+    raw_connection = engine.raw_connection()
+    try:
+        cursor = raw_connection.cursor()
+        if mode in (UPSERT, REPLACE_PARTITION):
+            temp = quote_identifier(f"{name}__merge_{uuid.uuid4().hex[:8]}", "postgresql")
+            cursor.execute(f"CREATE TEMPORARY TABLE {temp} (LIKE {quoted_table} INCLUDING DEFAULTS) ON COMMIT DROP")
+            size = _copy_from_frame(cursor, temp, data, rows_per_part, quoted=True)
+            strategy = _merge_from_staging(cursor, engine, table, temp, data, mode, merge_keys, partition_by)
+        elif mode == REPLACE and exists:
+            staging = f"{name}__staging_{uuid.uuid4().hex[:8]}"
+            retired = f"{name}__old_{uuid.uuid4().hex[:8]}"
+            qualified_staging = f"{schema}.{staging}" if schema else staging
+            quoted_staging = quote_table(qualified_staging, "postgresql")
+            cursor.execute(f"CREATE TABLE {quoted_staging} (LIKE {quoted_table} INCLUDING ALL)")
+            size = _copy_from_frame(cursor, qualified_staging, data, rows_per_part)
+            _move_owned_sequences(cursor, quoted_table, quoted_staging)
+            cursor.execute(f"ALTER TABLE {quoted_table} RENAME TO {quote_identifier(retired, 'postgresql')}")
+            cursor.execute(f"ALTER TABLE {quoted_staging} RENAME TO {quote_identifier(name, 'postgresql')}")
+            retired_table = f"{schema}.{retired}" if schema else retired
+            cursor.execute(f"DROP TABLE {quote_table(retired_table, 'postgresql')}")
+            strategy = "staging_swap"
+        else:
+            size = _copy_from_frame(cursor, table, data, rows_per_part)
+        raw_connection.commit()
+    except Exception:
+        raw_connection.rollback()
+        raise
+    finally:
+        raw_connection.close()
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"Copied {len(data)} rows ({size} bytes of CSV) into Postgres table {table} as {mode} in {elapsed:.2f}s")
+    return {"rows": len(data), "bytes": size, "mode": mode, "strategy": strategy, "elapsed": elapsed,
+            "rows_per_sec": len(data) / elapsed if elapsed else 0.0}
+
+
+def _python_value(value: Any) -> Any:
+    # DB-API drivers do not know NumPy scalars or pandas timestamps
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _row_values(data: pd.DataFrame) -> List[tuple]:
+    columns = []
+    for column in data.columns:
+        series = data[column]
+        if isinstance(series.dtype, pd.DatetimeTZDtype):
+            series = series.dt.tz_convert("UTC").dt.tz_localize(None)
+        values = series.astype(object).where(series.notna(), None).to_numpy()
+        columns.append([_python_value(value) for value in values])
+    return list(zip(*columns))
+
+
+def _delete_matching(cursor, quoted_table: str, columns: List[str], rows: List[tuple]) -> None:
+    """Delete the rows whose `columns` equal one of `rows`, NULLs included."""
+    quoted = [quote_identifier(column, "mysql") for column in columns]
+    match = "(" + " AND ".join(f"{column} <=> %s" for column in quoted) + ")"
+    cursor.execute(f"DELETE FROM {quoted_table} WHERE " + " OR ".join([match] * len(rows)),
+                   [value for row in rows for value in row])
+
+
+def insert_mysql(engine: Engine, table: str, data: pd.DataFrame, mode: str = APPEND,
+                 merge_keys: Optional[List[str]] = None, partition_by: Optional[str] = None,
+                 create_table: bool = True, batch_rows: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Insert a DataFrame into a MySQL table with multi-row INSERT statements.
+
+    Each statement carries `batch_rows` rows (MYSQL_INSERT_BATCH_ROWS by
+    default); raise it for narrow rows and lower it when statements hit
+    max_allowed_packet. All batches are committed in one transaction.
+
+    - upsert uses ON DUPLICATE KEY UPDATE when a unique key covers the
+      merge keys, and otherwise deletes the rows of each batch's keys first.
+    - replace-partition deletes the rows of every `partition_by` value in
+      the data before inserting.
+    - replace empties the table with DELETE, since TRUNCATE would commit
+      on its own.
+    """
+    _prepare_table(engine, table, data, mode, merge_keys, partition_by, create_table)
+    batch_rows = batch_rows or settings.MYSQL_INSERT_BATCH_ROWS
+    if mode == UPSERT:
+        data = dedupe(data, merge_keys)
+
+    quoted_table = quote_table(table, "mysql")
+    quoted_columns = [quote_identifier(column, "mysql") for column in data.columns]
+    row_placeholder = "(" + ", ".join(["%s"] * len(data.columns)) + ")"
+    suffix = ""
+    strategy = "insert"
+    if mode == UPSERT and has_unique_key(engine, table, merge_keys):
+        keys = {quote_identifier(key, "mysql") for key in merge_keys}
+        updates = [f"{column} = VALUES({column})" for column in quoted_columns if column not in keys]
+        # Without other columns, a no-op update of the first key skips duplicates
+        suffix = " ON DUPLICATE KEY UPDATE " + ", ".join(updates or [f"{next(iter(keys))} = {next(iter(keys))}"])
+        strategy = "on_duplicate_key"
+    elif mode == UPSERT:
+        strategy = "delete_insert"
+
+    started = time.perf_counter()
+    statements = 0
+    raw_connection = engine.raw_connection()
+    try:
+        cursor = raw_connection.cursor()
+        if mode == REPLACE:
+            cursor.execute(f"DELETE FROM {quoted_table}")
+        elif mode == REPLACE_PARTITION:
+            partitions = data[partition_by].drop_duplicates()
+            for start in range(0, len(partitions), batch_rows):
+                _delete_matching(cursor, quoted_table, [partition_by],
+                                 _row_values(partitions.iloc[start:start + batch_rows].to_frame()))
+        for start in range(0, len(data), batch_rows):
+            batch = data.iloc[start:start + batch_rows]
+            if strategy == "delete_insert":
+                _delete_matching(cursor, quoted_table, merge_keys, _row_values(batch[merge_keys]))
+            rows = _row_values(batch)
+            sql = (f"INSERT INTO {quoted_table} ({', '.join(quoted_columns)}) VALUES "
+                   + ", ".join([row_placeholder] * len(rows)) + suffix)
+            cursor.execute(sql, [value for row in rows for value in row])
+            statements += 1
+        raw_connection.commit()
+    except Exception:
+        raw_connection.rollback()
+        raise
+    finally:
+        raw_connection.close()
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"Inserted {len(data)} rows into MySQL table {table} as {mode} with {statements} statements in {elapsed:.2f}s")
+    return {"rows": len(data), "statements": statements, "mode": mode, "strategy": strategy, "elapsed": elapsed,
+            "rows_per_sec": len(data) / elapsed if elapsed else 0.0}
+
+
+def write_sql(engine: Engine, table: str, data: pd.DataFrame, mode: str = APPEND,
+              merge_keys: Optional[List[str]] = None, partition_by: Optional[str] = None,
+              create_table: bool = True) -> Dict[str, Any]:
+    """Write a DataFrame in a write mode with the fastest load path of the engine's database."""
+    dialect = engine.dialect.name
+    if dialect == "postgresql" and engine.dialect.driver == "psycopg2":
+        return copy_to_postgres(engine, table, data, mode, merge_keys, partition_by, create_table=create_table)
+    if dialect in ("mysql", "mariadb"):
+        return insert_mysql(engine, table, data, mode, merge_keys, partition_by, create_table=create_table)
+    raise ValueError(f"Writing to {dialect} databases is not supported")
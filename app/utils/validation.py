@@ -0,0 +1,375 @@
+# app/utils/validation.py
+import decimal
+import re
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.utils.logging import logger
+
+REJECT = "reject"
+SKIP = "skip"
+ON_INVALID = (REJECT, SKIP)
+
+# Error details kept in a report; bad_rows always lists every invalid row
+MAX_REPORTED_ERRORS = 100
+
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+_FLOAT32_MAX = float(np.finfo(np.float32).max)
+
+# Value ranges of time types that are narrower than pandas timestamps
+_TIME_RANGES = {
+    "clickhouse": {
+        "Date": ("1970-01-01", "2149-06-06"),
+        "Date32": ("1900-01-01", "2299-12-31"),
+        "DateTime": ("1970-01-01", "2106-02-07 06:28:15"),
+        "DateTime64": ("1900-01-01", "2299-12-31 23:59:59"),
+    },
+    "mysql": {
+        "TIMESTAMP": ("1970-01-01 00:00:01", "2038-01-19 03:14:07"),
+    },
+}
+
+_TRUE_VALUES = ("true", "t", "yes", "y", "1", "1.0")
+_FALSE_VALUES = ("false", "f", "no", "n", "0", "0.0")
+_BOOL_VALUES = {**{value: True for value in _TRUE_VALUES}, **{value: False for value in _FALSE_VALUES}}
+
+# SQL type names of several words, tried before the first word alone is taken as the name
+_MULTI_WORD_SQL_TYPES = ("CHARACTER VARYING", "DOUBLE PRECISION")
+_SQL_TYPE = re.compile(
+    r"(" + "|".join(sorted(_MULTI_WORD_SQL_TYPES, key=len, reverse=True)) + r"|[A-Z0-9_]+)"
+    r"\s*(?:\(([^)]*)\))?(\s+UNSIGNED)?(\s+WITH(?:OUT)? TIME ZONE)?(?:\s|$)"
+)
+
+# SQL integer types by name, as (bits, unsigned)
+_SQL_INTEGERS = {
+    "TINYINT": 8, "SMALLINT": 16, "INT2": 16, "SMALLSERIAL": 16, "MEDIUMINT": 24,
+    "INT": 32, "INTEGER": 32, "INT4": 32, "SERIAL": 32,
+    "BIGINT": 64, "INT8": 64, "BIGSERIAL": 64,
+}
+
+
+class DataValidationError(ValueError):
+    """A batch with values that do not fit the target schema; `report` lists the bad rows."""
+
+    def __init__(self, message: str, report: Dict[str, Any]):
+        super().__init__(message)
+        self.report = report
+
+
+def _integer_spec(bits: int, unsigned: bool) -> Dict[str, Any]:
+    if unsigned:
+        low, high = 0, 2 ** bits - 1
+    else:
+        low, high = -2 ** (bits - 1), 2 ** (bits - 1) - 1
+    return {"kind": "int", "bits": bits, "unsigned": unsigned, "min": low, "max": high}
+
+
+def _clickhouse_spec(type_name: str) -> Optional[Dict[str, Any]]:
+    nullable = False
+    while True:
+        match = re.fullmatch(r"(LowCardinality|Nullable)\((.*)\)", type_name)
+        if not match:
+            break
+        nullable = nullable or match.group(1) == "Nullable"
+        type_name = match.group(2).strip()
+
+    spec = None
+    if match := re.fullmatch(r"(U?)Int(8|16|32|64|128|256)", type_name):
+        spec = _integer_spec(int(match.group(2)), bool(match.group(1)))
+    elif type_name in ("Float32", "Float64"):
+        spec = {"kind": "float", "bits": int(type_name[-2:])}
+    elif match := re.fullmatch(r"Decimal\((\d+),\s*(\d+)\)", type_name):
+        spec = {"kind": "decimal", "precision": int(match.group(1)), "scale": int(match.group(2))}
+    elif type_name == "Bool":
+        spec = {"kind": "bool"}
+    elif type_name in ("String", "UUID"):
+        spec = {"kind": "string"}
+    elif match := re.fullmatch(r"FixedString\((\d+)\)", type_name):
+        spec = {"kind": "string", "max_length": int(match.group(1)), "length_unit": "bytes"}
+    elif type_name in ("Date", "Date32"):
+        spec = {"kind": "date", "range": _TIME_RANGES["clickhouse"][type_name]}
+    elif match := re.fullmatch(r"(DateTime64|DateTime)(?:\((.*)\))?", type_name):
+        arguments = match.group(2) or ""
+        spec = {"kind": "datetime", "tz": "'" in arguments, "range": _TIME_RANGES["clickhouse"][match.group(1)]}
+    if spec:
+        spec["nullable"] = nullable
+    return spec
+
+
+def _sql_spec(type_name: str, dialect: str) -> Optional[Dict[str, Any]]:
+    upper = " ".join(type_name.upper().split())
+    nullable = "NOT NULL" not in upper and "PRIMARY KEY" not in upper
+    match = _SQL_TYPE.match(upper)
+    if not match:
+        return None
+    name, arguments = match.group(1), match.group(2)
+    unsigned, time_zone = bool(match.group(3)), match.group(4)
+
+    spec = None
+    if name in _SQL_INTEGERS:
+        spec = _integer_spec(_SQL_INTEGERS[name], unsigned)
+    elif name in ("REAL", "FLOAT4"):
+        spec = {"kind": "float", "bits": 32}
+    elif name in ("FLOAT", "FLOAT8", "DOUBLE", "DOUBLE PRECISION"):
+        spec = {"kind": "float", "bits": 64}
+    elif name in ("DECIMAL", "NUMERIC"):
+        precision, _, scale = (arguments or "").partition(",")
+        if precision.strip().isdigit():
+            spec = {"kind": "decimal", "precision": int(precision), "scale": int(scale or 0)}
+        else:
+            spec = {"kind": "float", "bits": 64}
+    elif name in ("BOOL", "BOOLEAN"):
+        spec = {"kind": "bool"}
+    elif name in ("VARCHAR", "CHARACTER VARYING", "CHAR", "CHARACTER", "NVARCHAR", "NCHAR"):
+        spec = {"kind": "string", "length_unit": "chars"}
+        if arguments and arguments.strip().isdigit():
+            spec["max_length"] = int(arguments)
+    elif name in ("TEXT", "TINYTEXT", "MEDIUMTEXT", "LONGTEXT", "UUID", "CITEXT"):
+        spec = {"kind": "string"}
+    elif name == "DATE":
+        spec = {"kind": "date"}
+    elif name in ("TIMESTAMP", "TIMESTAMPTZ", "DATETIME"):
+        spec = {"kind": "datetime", "tz": name == "TIMESTAMPTZ" or (time_zone or "").strip() == "WITH TIME ZONE"}
+        if name in _TIME_RANGES.get(dialect, {}):
+            spec["range"] = _TIME_RANGES[dialect][name]
+    if spec:
+        spec["nullable"] = nullable
+    return spec
+
+
+def column_spec(type_name: str, dialect: str = "clickhouse") -> Optional[Dict[str, Any]]:
+    """
+    Checks implied by a column type of a table schema, or None for types not checked.
+
+    ClickHouse types are only nullable when wrapped in Nullable; SQL
+    columns are nullable unless declared NOT NULL or PRIMARY KEY.
+    """
+    if dialect == "clickhouse":
+        return _clickhouse_spec(type_name.strip())
+    return _sql_spec(type_name, dialect)
+
+
+def _numbers(series: pd.Series) -> pd.Series:
+    if pd.api.types.is_bool_dtype(series):
+        return series.astype("Int64")
+    numeric = pd.to_numeric(series, errors="coerce")
+    if numeric.dtype == object:
+        # Integers too large for any NumPy dtype; as floats they still fail the range checks
+        numeric = numeric.astype("float64")
+    return numeric
+
+
+def _check_int(series: pd.Series, present: pd.Series, spec: Dict[str, Any]) -> Tuple[pd.Series, list]:
+    numeric = _numbers(series)
+    invalid = present & numeric.isna()
+    parsed = present & ~invalid
+    fractional = parsed & (numeric % 1 != 0).fillna(False)
+    low, high = max(spec["min"], _INT64_MIN), min(spec["max"], np.iinfo(np.uint64).max)
+    out_of_range = parsed & ~fractional & ((numeric < low) | (numeric > high)).fillna(False)
+    checks = [(invalid, "not a number"), (fractional, "not an integer"),
+              (out_of_range, f"out of range [{spec['min']}, {spec['max']}]")]
+
+    kept = numeric.where(parsed & ~fractional & ~out_of_range)
+    if spec["bits"] in (8, 16, 32, 64):
+        dtype = f"{'U' if spec['unsigned'] else ''}Int{spec['bits']}"
+        kept = kept.astype(dtype) if kept.isna().any() else kept.astype(dtype.lower())
+    return kept, checks
+
+
+def _check_float(series: pd.Series, present: pd.Series, spec: Dict[str, Any]) -> Tuple[pd.Series, list]:
+    numeric = _numbers(series).astype("float64")
+    invalid = present & numeric.isna()
+    checks = [(invalid, "not a number")]
+    if spec["bits"] == 32:
+        out_of_range = present & np.isfinite(numeric) & (numeric.abs() > _FLOAT32_MAX)
+        checks.append((out_of_range, "out of Float32 range"))
+        return numeric.where(~out_of_range).astype("float32"), checks
+    return numeric, checks
+
+
+def _to_decimal(value: Any) -> Optional[decimal.Decimal]:
+    if isinstance(value, decimal.Decimal):
+        number = value
+    elif isinstance(value, (bool, np.bool_, int, np.integer)):
+        number = decimal.Decimal(int(value))
+    elif isinstance(value, (float, np.floating)):
+        # The shortest repr, so 0.1 stays 0.1 rather than its binary expansion
+        number = decimal.Decimal(repr(float(value)))
+    else:
+        try:
+            number = decimal.Decimal(str(value).strip())
+        except decimal.InvalidOperation:
+            return None
+    return number if number.is_finite() else None
+
+
+def _check_decimal(series: pd.Series, present: pd.Series, spec: Dict[str, Any]) -> Tuple[pd.Series, list]:
+    # Parsed value by value, since floats cannot hold every digit of wide decimals
+    numbers = pd.Series([_to_decimal(value) if is_present else None
+                         for value, is_present in zip(series.tolist(), present.tolist())],
+                        index=series.index, dtype=object)
+    invalid = present & numbers.isna()
+    limit = decimal.Decimal(10) ** (spec["precision"] - spec["scale"])
+    out_of_range = present & ~invalid & numbers.map(lambda number: number is not None and abs(number) >= limit)
+    return numbers.where(~out_of_range, None), [
+        (invalid, "not a number"),
+        (out_of_range, f"more than {spec['precision'] - spec['scale']} digits before the decimal point"),
+    ]
+
+
+def _check_bool(series: pd.Series, present: pd.Series, spec: Dict[str, Any]) -> Tuple[pd.Series, list]:
+    if pd.api.types.is_bool_dtype(series):
+        return series, []
+    mapped = series.astype(str).str.strip().str.lower().map(_BOOL_VALUES)
+    invalid = present & mapped.isna()
+    return mapped.where(present).astype("boolean"), [(invalid, "not a boolean")]
+
+
+def _check_string(series: pd.Series, present: pd.Series, spec: Dict[str, Any]) -> Tuple[pd.Series, list]:
+    inferred = pd.api.types.infer_dtype(series, skipna=True)
+    text = series if inferred in ("string", "empty", "categorical") else series.astype(str).where(present, None)
+    if not spec.get("max_length"):
+        return text, []
+    values = text.astype(object).where(present, "").astype(str)
+    if spec.get("length_unit") == "bytes":
+        lengths = values.str.encode("utf-8").str.len()
+    else:
+        lengths = values.str.len()
+    unit = "bytes" if spec.get("length_unit") == "bytes" else "characters"
+    return text, [(present & (lengths > spec["max_length"]), f"longer than {spec['max_length']} {unit}")]
+
+
+def _parse_times(series: pd.Series, present: pd.Series) -> pd.Series:
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        # Numbers are read as Unix seconds
+        return pd.to_datetime(series, unit="s", errors="coerce", utc=True)
+    parsed = pd.to_datetime(series, errors="coerce", utc=True)
+    # Rows not in the format inferred from the first value are parsed one by one
+    retry = present & parsed.isna()
+    if retry.any():
+        parsed.loc[retry] = pd.to_datetime(series[retry], errors="coerce", utc=True, format="mixed")
+    return parsed
+
+
+def _check_time(series: pd.Series, present: pd.Series, spec: Dict[str, Any]) -> Tuple[pd.Series, list]:
+    parsed = _parse_times(series, present)
+    invalid = present & parsed.isna()
+    checks = [(invalid, "not a date" if spec["kind"] == "date" else "not a datetime")]
+
+    aware = isinstance(parsed.dtype, pd.DatetimeTZDtype)
+    utc = parsed.dt.tz_convert("UTC").dt.tz_localize(None) if aware else parsed
+    if spec.get("range"):
+        low, high = (pd.Timestamp(bound) for bound in spec["range"])
+        out_of_range = present & ~invalid & ((utc < low) | (utc > high))
+        checks.append((out_of_range, f"out of range [{spec['range'][0]}, {spec['range'][1]}]"))
+
+    if spec["kind"] == "date":
+        return utc.dt.normalize(), checks
+    if spec.get("tz"):
+        return parsed if aware else parsed.dt.tz_localize("UTC"), checks
+    return utc, checks
+
+
+_CHECKS = {
+    "int": _check_int,
+    "float": _check_float,
+    "decimal": _check_decimal,
+    "bool": _check_bool,
+    "string": _check_string,
+    "date": _check_time,
+    "datetime": _check_time,
+}
+
+
+def _sample_value(value: Any) -> Any:
+    if value is None or (not isinstance(value, (list, dict)) and pd.isna(value)):
+        return None
+    return str(value)[:100]
+
+
+def validate_frame(data: pd.DataFrame, schema: Dict[str, str], dialect: str = "clickhouse",
+                   on_invalid: str = REJECT, max_errors: int = MAX_REPORTED_ERRORS) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Check and coerce a batch against the column types of its target table.
+
+    Every check but the decimal one is a whole-column pandas operation:
+    numbers are parsed with to_numeric and checked against the type's
+    range, decimals are parsed exactly into decimal.Decimal, datetimes are parsed
+    with to_datetime and moved to UTC or the declared timezone, strings are
+    checked against their maximum length, and missing values against the
+    column's nullability. Columns of types the validator does not know are
+    passed through unchecked.
+
+    With on_invalid="reject" a batch with any bad row raises
+    DataValidationError before anything is sent; with "skip" the bad rows
+    and the columns missing from the schema are dropped.
+
+    Returns:
+        The coerced batch, and a report with the positions of all bad rows
+        and the first `max_errors` errors by row, column and value
+    """
+    if on_invalid not in ON_INVALID:
+        raise ValueError(f"on_invalid must be one of {ON_INVALID}")
+
+    coerced = {}
+    bad = np.zeros(len(data), dtype=bool)
+    error_count = 0
+    errors = []
+    unchecked = []
+    for column in data.columns:
+        type_name = schema.get(str(column))
+        spec = column_spec(type_name, dialect) if type_name else None
+        if spec is None:
+            if type_name:
+                unchecked.append(str(column))
+            coerced[column] = data[column]
+            continue
+
+        series = data[column]
+        present = series.notna()
+        coerced[column], checks = _CHECKS[spec["kind"]](series, present, spec)
+        if not spec["nullable"]:
+            checks.append((~present, "missing value in a non-nullable column"))
+
+        for mask, message in checks:
+            mask = np.asarray(mask, dtype=bool)
+            positions = np.flatnonzero(mask)
+            if not len(positions):
+                continue
+            bad |= mask
+            error_count += len(positions)
+            errors.extend(
+                {"row": int(position), "column": str(column), "value": _sample_value(series.iloc[position]), "error": message}
+                for position in positions[:max_errors]
+            )
+
+    unknown_columns = [str(column) for column in data.columns if str(column) not in schema]
+    bad_rows = np.flatnonzero(bad).tolist()
+    report = {
+        "rows": len(data),
+        "valid_rows": len(data) - len(bad_rows),
+        "invalid_rows": len(bad_rows),
+        "bad_rows": bad_rows,
+        "error_count": error_count,
+        "errors": sorted(errors, key=lambda error: error["row"])[:max_errors],
+        "unknown_columns": unknown_columns,
+        "unchecked_columns": unchecked,
+    }
+
+    if (bad_rows or unknown_columns) and on_invalid == REJECT:
+        message = f"{len(bad_rows)} of {len(data)} rows do not match the table schema"
+        if unknown_columns:
+            message += f"; columns not in the schema: {unknown_columns}"
+        raise DataValidationError(message, report)
+
+    result = pd.DataFrame(coerced, index=data.index)
+    if unknown_columns:
+        result = result.drop(columns=[column for column in data.columns if str(column) in unknown_columns])
+    if bad_rows:
+        logger.warning(f"Skipping {len(bad_rows)} of {len(data)} rows that do not match the table schema")
+        result = result[~bad]
+    return result, report
@@ -0,0 +1,36 @@
+# app/utils/write_modes.py
+from typing import List, Optional
+
+import pandas as pd
+
+APPEND = "append"
+UPSERT = "upsert"
+REPLACE_PARTITION = "replace-partition"
+REPLACE = "replace"
+
+# append adds rows; upsert replaces rows with the same merge keys; replace-partition
+# replaces every partition the data touches; replace swaps in the data as the whole table
+WRITE_MODES = (APPEND, UPSERT, REPLACE_PARTITION, REPLACE)
+
+# Modes whose result does not depend on how the rows are split into writes,
+# so they can be used chunk by chunk
+CHUNKABLE_MODES = (APPEND, UPSERT)
+
+
+def validate_write_mode(mode: str, merge_keys: Optional[List[str]] = None,
+                        partition_by: Optional[str] = None, columns: Optional[List[str]] = None) -> None:
+    """Check that a write mode has the keys it needs; raises ValueError otherwise."""
+    if mode not in WRITE_MODES:
+        raise ValueError(f"Write mode must be one of {WRITE_MODES}")
+    if mode == UPSERT and not merge_keys:
+        raise ValueError("Upserts need merge_keys")
+    if columns is not None:
+        missing = [key for key in (merge_keys or []) if key not in columns]
+        if missing:
+            raise ValueError(f"Merge keys not in the data: {missing}")
+
+
+def dedupe(data: pd.DataFrame, merge_keys: List[str]) -> pd.DataFrame:
+    """Keep the last row of each merge key, as a sequence of single-row upserts would."""
+    duplicated = data.duplicated(subset=merge_keys, keep="last")
+    return data[~duplicated] if duplicated.any() else data
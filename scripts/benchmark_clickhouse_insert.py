@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+"""
+Benchmark row-dict ClickHouse inserts against the columnar insert path.
+
+Without --host, inserts go to a fake client that encodes every block with
+clickhouse-driver's native protocol writer and discards the bytes, so the
+client-side cost is measured without a server. With --host, a local table
+is created and written for real.
+
+Usage:
+    python scripts/benchmark_clickhouse_insert.py --rows 10000000
+    python scripts/benchmark_clickhouse_insert.py --rows 10000000 --host localhost
+"""
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+import pandas as pd
+from clickhouse_driver import defines
+from clickhouse_driver.bufferedwriter import BufferedSocketWriter
+from clickhouse_driver.block import ColumnOrientedBlock, RowOrientedBlock
+from clickhouse_driver.context import Context
+from clickhouse_driver.streams.native import BlockOutputStream
+from app.utils.clickhouse import clickhouse_schema, create_client, insert_dataframe
+
+TABLE_NAME = "benchmark_clickhouse_insert"
+
+
+class _NullSocket:
+    def __init__(self):
+        self.bytes_sent = 0
+
+    def sendall(self, data):
+        self.bytes_sent += len(data)
+
+
+class FakeClickHouseClient:
+    """Encodes INSERT blocks exactly like clickhouse-driver and drops them."""
+
+    def __init__(self, schema):
+        context = Context()
+        context.settings = {}
+        context.client_settings = {
+            "use_numpy": False,
+            "insert_block_size": defines.DEFAULT_INSERT_BLOCK_SIZE,
+            "strings_as_bytes": False,
+            "strings_encoding": defines.STRINGS_ENCODING,
+        }
+        context.server_info = SimpleNamespace(used_revision=defines.CLIENT_REVISION, get_timezone=lambda: "UTC")
+        self.connection = SimpleNamespace(context=context)
+        self.columns_with_types = list(schema.items())
+        self.socket = _NullSocket()
+        self.sink = BufferedSocketWriter(self.socket, defines.BUFFER_SIZE)
+
+    def execute(self, query, data, columnar=False, types_check=False, settings=None):
+        # Client settings given with a query apply to that query, as in Client.make_query_settings
+        settings = {**self.connection.context.client_settings, "use_numpy": False, **(settings or {})}
+        if settings["use_numpy"]:
+            from clickhouse_driver.numpy.helpers import column_chunks
+        else:
+            from clickhouse_driver.util.helpers import chunks, column_chunks
+        block_cls = ColumnOrientedBlock if columnar else RowOrientedBlock
+        slicer = column_chunks if columnar else chunks
+        self.connection.context.client_settings = settings
+        output = BlockOutputStream(self.sink, self.connection.context)
+        rows = 0
+        for chunk in slicer(data, settings["insert_block_size"]):
+            block = block_cls(self.columns_with_types, chunk, types_check=types_check)
+            output.write(block)
+            rows += block.num_rows
+        self.sink.flush()
+        return rows
+
+
+def make_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "id": np.arange(rows, dtype=np.int64),
+        "amount": rng.random(rows),
+        "quantity": rng.integers(0, 1000, rows, dtype=np.int32),
+        "created_at": pd.Timestamp("2024-01-01") + pd.to_timedelta(np.arange(rows) % 86400, unit="s"),
+        "category": pd.Categorical(rng.choice(["a", "b", "c", "d"], rows)),
+    })
+
+
+def insert_records(client, data: pd.DataFrame) -> None:
+    # The previous write path
+    client.execute(f"INSERT INTO {TABLE_NAME} ({', '.join(data.columns)}) VALUES", data.to_dict("records"))
+
+
+def measure(name: str, insert, rows: int) -> None:
+    gc.collect()
+    start = time.perf_counter()
+    insert()
+    elapsed = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    insert()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<22} {elapsed:8.2f}s {rows / elapsed:>14,.0f} rows/s {peak / 2 ** 20:>10,.0f} MB peak")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--host", help="ClickHouse host; a fake encoding client is used when omitted")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--user", default="default")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--database", default="default")
+    parser.add_argument("--skip-records", action="store_true", help="Skip the to_dict('records') path")
+    args = parser.parse_args()
+
+    data = make_frame(args.rows)
+    schema = clickhouse_schema(data)
+    print(f"{args.rows:,} rows, schema {schema}")
+
+    if args.host:
+        details = vars(args)
+        client = create_client(details)
+        columns = ", ".join(f"{name} {ch_type}" for name, ch_type in schema.items())
+        client.execute(f"DROP TABLE IF EXISTS {TABLE_NAME}")
+        client.execute(f"CREATE TABLE {TABLE_NAME} ({columns}) ENGINE = Null")
+    else:
+        client = FakeClickHouseClient(schema)
+
+    if not args.skip_records:
+        measure("to_dict('records')", lambda: insert_records(client, data), args.rows)
+    measure("columnar", lambda: insert_dataframe(client, TABLE_NAME, data, use_numpy=False), args.rows)
+    measure("columnar + numpy", lambda: insert_dataframe(client, TABLE_NAME, data), args.rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import asyncio
+import os
+import tempfile
+import uuid
+from typing import Optional
+
+# The app binds its database engine on import, so point it at a throwaway
+# SQLite file before anything under app is imported
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.core.security import create_access_token
+from app.db.database import Base, SessionLocal, engine
+
+
+class ApiClient:
+    """Send requests to an ASGI app as one user, without a server."""
+
+    def __init__(self, app: FastAPI, token: str):
+        self.app = app
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+    def request(self, method: str, url: str, headers: Optional[dict] = None, **kwargs) -> httpx.Response:
+        async def send():
+            transport = httpx.ASGITransport(app=self.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.request(method, url, headers={**self.headers, **(headers or {})}, **kwargs)
+        return asyncio.run(send())
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("POST", url, **kwargs)
+
+
+@pytest.fixture(scope="session")
+def db_tables():
+    import app.models  # noqa: F401
+    import app.models.llm  # noqa: F401
+    import app.models.log  # noqa: F401
+    Base.metadata.create_all(bind=engine)
+
+
+@pytest.fixture
+def db(db_tables):
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def make_user(db):
+    from app.models.company import Company
+    from app.models.user import User
+
+    def make():
+        name = uuid.uuid4().hex
+        company = Company(name=name, domain=f"{name}.example.com")
+        db.add(company)
+        db.commit()
+        user = User(email=f"{name}@example.com", name=name, company_id=company.id)
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        return user
+    return make
+
+
+@pytest.fixture
+def user(make_user):
+    return make_user()
+
+
+@pytest.fixture
+def make_connector(db):
+    from app.models.connector import Connector, ConnectorType
+
+    def make(user, connector_type: str = "source", type: ConnectorType = ConnectorType.CSV, **fields):
+        connector = Connector(id=str(uuid.uuid4()), name=uuid.uuid4().hex, type=type,
+                              connector_type=connector_type, user_id=user.id, **fields)
+        db.add(connector)
+        db.commit()
+        db.refresh(connector)
+        return connector
+    return make
+
+
+@pytest.fixture
+def api(user):
+    """Client for an app serving the API routers, authenticated as `user`."""
+    from app.api.routes import connector, copy_jobs, reader
+
+    app = FastAPI()
+    app.include_router(connector.router, prefix="/api/v1/connectors")
+    app.include_router(reader.router, prefix="/api/v1/readers")
+    app.include_router(copy_jobs.router, prefix="/api/v1/copy-jobs")
+    return ApiClient(app, create_access_token({"sub": str(user.id)}))
@@ -0,0 +1,93 @@
+import os
+
+import pytest
+import sqlalchemy
+
+from app.models.connector import ConnectorType
+from app.utils.engines import engine_registry
+from app.utils.spool import write_spool
+
+# COPY needs a live server; point this at a scratch database to run the integration tests
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+requires_postgres = pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL is not set")
+
+CSV_BODY = b"id,name\n" + b"".join(f"{i},row-{i}\n".encode() for i in range(250))
+
+
+def _ingest(api, connector, **params):
+    return api.post(f"/api/v1/connectors/{connector.id}/ingest", content=CSV_BODY,
+                    params={"table_name": "ingest_test", **params}, headers={"Content-Type": "text/csv"})
+
+
+@pytest.fixture
+def postgres_destination(user, make_connector):
+    connector = make_connector(user, "destination", ConnectorType.POSTGRES,
+                               config={"connection_string": POSTGRES_URL or "postgresql+psycopg2://user@localhost/db"})
+    yield connector
+    engine_registry.invalidate(connector.id)
+
+
+@pytest.fixture
+def local_spool(tmp_path, monkeypatch):
+    # No drainer runs in the tests, so spooled segments stay on disk
+    monkeypatch.setattr(write_spool, "directory", str(tmp_path / "spool"))
+    monkeypatch.setattr(write_spool, "_streams", {})
+    monkeypatch.setattr(write_spool, "_appending", {})
+    yield write_spool
+    write_spool.stop()
+
+
+def test_engine_stats_only_list_the_users_connectors(api, user, make_user, make_connector, tmp_path):
+    config = {"connection_string": f"sqlite:///{tmp_path / 'source.db'}"}
+    own = make_connector(user, type=ConnectorType.SQLITE, config=config)
+    other = make_connector(make_user(), type=ConnectorType.SQLITE, config=config)
+    try:
+        for connector in (own, other):
+            engine_registry.get_engine(connector)
+        stats = api.get("/api/v1/readers/engine-stats").json()
+        assert list(stats["connectors"]) == [own.id]
+        assert stats["engines"] == 1
+    finally:
+        for connector in (own, other):
+            engine_registry.invalidate(connector.id)
+
+
+def test_ingest_into_another_users_connector_is_forbidden(api, make_user, make_connector):
+    connector = make_connector(make_user(), "destination", ConnectorType.POSTGRES)
+    assert _ingest(api, connector).status_code == 403
+
+
+def test_ingest_into_a_source_connector_is_rejected(api, user, make_connector):
+    response = _ingest(api, make_connector(user, "source", ConnectorType.POSTGRES))
+    assert response.status_code == 400
+    assert "destination" in response.json()["detail"]
+
+
+def test_spooled_ingest_is_accepted_chunk_by_chunk(api, postgres_destination, local_spool):
+    response = _ingest(api, postgres_destination, spool="true", chunksize=100)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["rows_written"] == 250
+    assert body["chunks_written"] == 3
+    assert body["spooled"] is True
+    [stream] = local_spool.stats([postgres_destination.id])["streams"]
+    assert stream["pending_rows"] == 250
+
+
+@requires_postgres
+def test_ingest_writes_every_chunk_to_postgres(api, postgres_destination):
+    engine = sqlalchemy.create_engine(POSTGRES_URL)
+    with engine.begin() as conn:
+        conn.execute(sqlalchemy.text("DROP TABLE IF EXISTS ingest_test"))
+    try:
+        response = _ingest(api, postgres_destination, create_table="true", chunksize=100)
+        assert response.status_code == 200
+        assert response.json()["rows_written"] == 250
+        with engine.begin() as conn:
+            rows = conn.execute(sqlalchemy.text("SELECT count(*), max(id) FROM ingest_test")).one()
+        assert tuple(rows) == (250, 249)
+    finally:
+        with engine.begin() as conn:
+            conn.execute(sqlalchemy.text("DROP TABLE IF EXISTS ingest_test"))
+        engine.dispose()
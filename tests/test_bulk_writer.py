@@ -0,0 +1,47 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from app.utils.bulk_writer import BulkWriteError, BulkWriter
+
+
+def test_retries_resend_a_batch_with_the_same_batch_id():
+    attempts = []
+    lock = threading.Lock()
+
+    def insert(connection, frame, batch_id):
+        with lock:
+            attempts.append((batch_id, int(frame["id"].iloc[0])))
+            first_attempt = sum(1 for seen, _ in attempts if seen == batch_id) == 1
+        if first_attempt and int(frame["id"].iloc[0]) == 0:
+            raise ConnectionError("connection reset after the insert")
+
+    writer = BulkWriter(connect=lambda: None, insert=insert, workers=2, batch_rows=10, backoff=0)
+    report = writer.write(pd.DataFrame({"id": range(30)}))
+
+    assert report["rows"] == 30
+    assert report["retries"] == 1
+    ids_by_start = {}
+    for batch_id, start in attempts:
+        ids_by_start.setdefault(start, set()).add(batch_id)
+    assert all(len(ids) == 1 for ids in ids_by_start.values())
+    assert len({next(iter(ids)) for ids in ids_by_start.values()}) == 3
+
+
+def test_a_batch_failing_for_good_reports_what_was_written():
+    written = []
+
+    def insert(connection, frame, batch_id):
+        if int(frame["id"].iloc[0]) == 20:
+            raise ValueError("bad batch")
+        written.append(len(frame))
+
+    writer = BulkWriter(connect=lambda: None, insert=insert, workers=1, batch_rows=10, backoff=0,
+                        retryable=lambda error: not isinstance(error, ValueError))
+    with pytest.raises(BulkWriteError) as error:
+        writer.write(pd.DataFrame({"id": range(40)}))
+    # The batch after the bad one may already be queued and written
+    assert error.value.report["rows"] == sum(written)
+    assert error.value.report["rows"] in (20, 30)
+    assert error.value.report["retries"] == 0
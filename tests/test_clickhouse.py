@@ -0,0 +1,45 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+from app.utils import clickhouse
+from app.utils.write_modes import UPSERT
+
+
+class FakePool:
+    max_size = 8
+
+    def __init__(self):
+        self.inserted = []
+        self.active = 0
+        self.most_active = 0
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def connection(self):
+        yield None
+
+    def insert(self, client, table_name, frame, **kwargs):
+        with self.lock:
+            self.active += 1
+            self.most_active = max(self.most_active, self.active)
+        # Later batches finish sooner, so concurrent batches would land out of order
+        time.sleep(0.02 / (len(self.inserted) + 1))
+        with self.lock:
+            self.active -= 1
+            self.inserted.append(int(frame["id"].iloc[0]))
+
+
+def test_upsert_batches_are_inserted_one_at_a_time_in_order(monkeypatch):
+    pool = FakePool()
+    monkeypatch.setattr(clickhouse.clickhouse_pools, "get_pool", lambda connector: pool)
+    monkeypatch.setattr(clickhouse, "insert_dataframe", pool.insert)
+    monkeypatch.setattr(clickhouse, "table_layout", lambda client, table_name: {
+        "engine": "ReplacingMergeTree", "sorting_key": "id", "partition_key": ""})
+    data = pd.DataFrame({"id": range(100), "value": range(100)})
+    report = clickhouse.write_clickhouse(object(), "events", data, UPSERT, ["id"], workers=4, batch_rows=10)
+    assert report["rows"] == 100
+    assert pool.inserted == list(range(0, 100, 10))
+    assert pool.most_active == 1
@@ -0,0 +1,31 @@
+import pandas as pd
+
+from app.utils.clickhouse_layout import create_table_sql, plan_layout
+
+
+def test_skip_indexes_only_cover_filter_columns_outside_the_sorting_key():
+    data = pd.DataFrame({
+        "tenant": ["a", "b"] * 50,
+        "region": ["x", "y", "z", "w"] * 25,
+        "user_id": range(100),
+        "at": pd.date_range("2024-01-01", periods=100, freq="h"),
+    })
+    layout = plan_layout(data, order_by=["tenant", "region", "at"],
+                         filter_columns=["tenant", "region", "user_id"], skip_indexes=True)
+    assert len(layout["indexes"]) == 1
+    assert "`user_id`" in layout["indexes"][0]
+
+
+def test_sorting_keys_with_nulls_stay_nullable():
+    data = pd.DataFrame({"tenant": ["a", None, "b"], "id": [1, 2, 3]})
+    layout = plan_layout(data, merge_keys=["tenant", "id"])
+    assert layout["columns"]["tenant"] == "Nullable(String)"
+    assert layout["columns"]["id"] == "Int64"
+    assert create_table_sql("t", layout).endswith("ORDER BY (`tenant`, `id`) SETTINGS allow_nullable_key = 1")
+
+
+def test_declared_nullable_keys_lose_nullable_only_when_the_data_has_no_nulls():
+    schema = {"tenant": "Nullable(String)", "id": "Nullable(Int64)"}
+    layout = plan_layout(pd.DataFrame({"tenant": ["a", "b"], "id": [1, None]}), schema, order_by=["tenant", "id"])
+    assert (layout["columns"]["tenant"], layout["columns"]["id"]) == ("String", "Nullable(Int64)")
+    assert plan_layout(schema=schema, order_by=["tenant"])["settings"] == {"allow_nullable_key": 1}
@@ -0,0 +1,89 @@
+import uuid
+
+import pandas as pd
+import pytest
+
+from app.db.database import SessionLocal
+from app.models.copy_job import CopyJob
+from app.services import copy_job_service
+
+
+def _copy_request(source, destination):
+    return {"source_connector_id": source.id, "destination_connector_id": destination.id, "table_name": "events"}
+
+
+def test_copy_from_another_users_connector_is_not_found(api, user, make_user, make_connector):
+    source = make_connector(make_user())
+    destination = make_connector(user, "destination")
+    response = api.post("/api/v1/copy-jobs/", json=_copy_request(source, destination))
+    assert response.status_code == 404
+
+
+def test_copy_into_a_source_connector_is_rejected(api, user, make_connector):
+    source = make_connector(user)
+    response = api.post("/api/v1/copy-jobs/", json=_copy_request(source, make_connector(user)))
+    assert response.status_code == 400
+    assert "destination" in response.json()["detail"]
+
+
+@pytest.mark.parametrize("options, message", [
+    ({"write_mode": "replace"}, "can only write in modes"),
+    ({"write_mode": "upsert"}, "merge_keys"),
+])
+def test_write_modes_a_copy_cannot_run_are_rejected(api, user, make_connector, options, message):
+    request = {**_copy_request(make_connector(user), make_connector(user, "destination")), **options}
+    response = api.post("/api/v1/copy-jobs/", json=request)
+    assert response.status_code == 400
+    assert message in response.json()["detail"]
+
+
+@pytest.fixture
+def pending_job(db, user, make_connector, monkeypatch):
+    class Reader:
+        def __init__(self, db):
+            pass
+
+        def read_chunks(self, *args, **kwargs):
+            return iter([pd.DataFrame({"id": [1, 2]})])
+
+    monkeypatch.setattr(copy_job_service, "ReaderAgent", Reader)
+    monkeypatch.setattr(copy_job_service, "WriterAgent", lambda db: None)
+    job = CopyJob(id=str(uuid.uuid4()), source_connector_id=make_connector(user).id,
+                  destination_connector_id=make_connector(user, "destination").id, user_id=user.id,
+                  status="pending", table_name="events", chunksize=10, create_table=False,
+                  write_mode="append", chunks_committed=0, rows_written=0)
+    db.add(job)
+    db.commit()
+    return job.id
+
+
+def _job(job_id):
+    db = SessionLocal()
+    try:
+        return db.query(CopyJob).filter(CopyJob.id == job_id).first()
+    finally:
+        db.close()
+
+
+def test_a_finished_copy_is_completed(pending_job, monkeypatch):
+    monkeypatch.setattr(copy_job_service, "stream_copy", lambda *args, **kwargs: {"rows": 2})
+    copy_job_service.run_copy_job(pending_job)
+    job = _job(pending_job)
+    assert job.status == "completed"
+    assert job.metrics == {"rows": 2}
+
+
+def test_a_cancel_during_the_last_chunk_is_kept(pending_job, monkeypatch):
+    def cancelled_copy(*args, **kwargs):
+        db = SessionLocal()
+        try:
+            copy_job_service.CopyJobService(db).cancel_job(db.query(CopyJob).filter(CopyJob.id == pending_job).first())
+        finally:
+            db.close()
+        return {"rows": 2}
+
+    monkeypatch.setattr(copy_job_service, "stream_copy", cancelled_copy)
+    copy_job_service.run_copy_job(pending_job)
+    job = _job(pending_job)
+    assert job.status == "cancelled"
+    assert job.metrics is None
@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+
+import pandas as pd
+import sqlalchemy
+
+from app.utils import fingerprints
+from app.utils.fingerprints import FingerprintRegistry
+
+
+def _frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({"id": range(rows)})
+
+
+def test_unchanged_source_is_served_from_cache():
+    registry = FingerprintRegistry()
+    calls = []
+    compute = lambda: calls.append(1) or _frame(10)
+    registry.get_or_compute("c1", "orders", "preview", "v1", compute)
+    registry.get_or_compute("c1", "orders", "preview", "v1", compute)
+    registry.get_or_compute("c1", "orders", "preview", "v2", compute)
+    assert len(calls) == 2
+
+
+def test_entries_are_evicted_to_stay_within_the_byte_budget():
+    entry_bytes = int(_frame(1000).memory_usage(index=True, deep=True).sum())
+    registry = FingerprintRegistry(max_bytes=entry_bytes * 3)
+    for table in range(5):
+        registry.get_or_compute("c1", f"t{table}", "preview", "v1", lambda: _frame(1000))
+    stats = registry.stats()
+    assert stats["entries"] == 3
+    assert stats["bytes"] <= entry_bytes * 3
+
+
+def test_results_over_the_budget_are_not_cached():
+    registry = FingerprintRegistry(max_bytes=100)
+    registry.get_or_compute("c1", "big", "preview", "v1", lambda: _frame(1000))
+    assert registry.stats()["entries"] == 0
+
+
+def test_plain_queries_are_not_fingerprinted_without_connecting(monkeypatch):
+    def no_engine(connector):
+        raise AssertionError("source_signature opened a connection")
+
+    monkeypatch.setattr(fingerprints.engine_registry, "get_engine", no_engine)
+    connector = SimpleNamespace(id="q1", file_path=None, config={"query": "SELECT 1"})
+    assert fingerprints.source_signature(connector) is None
+
+
+def test_queries_ending_in_a_semicolon_are_fingerprinted(tmp_path):
+    engine = sqlalchemy.create_engine(f"sqlite:///{tmp_path / 'source.db'}")
+    pd.DataFrame({"id": [1, 2], "updated_at": ["2024-01-01", "2024-02-01"]}).to_sql("items", engine, index=False)
+    signature = fingerprints.table_signature(engine, query="SELECT * FROM items;\n", updated_at_column="updated_at")
+    engine.dispose()
+    assert signature == "max:2024-02-01"
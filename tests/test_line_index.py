@@ -0,0 +1,32 @@
+import pandas as pd
+import pytest
+
+from app.core.config import settings
+from app.utils.line_index import get_line_index, read_page
+
+
+@pytest.fixture
+def csv_with_blank_lines(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "READER_CACHE_DIR", str(tmp_path / "cache"))
+    # Small index stride, so pages start between indexed lines
+    monkeypatch.setattr(settings, "LINE_INDEX_EVERY", 10)
+    path = tmp_path / "rows.csv"
+    # Every seventh row is a blank line
+    path.write_text("id,name\n" + "".join(f"{i},row-{i}\n" if i % 7 else "\n" for i in range(1, 101)))
+    return str(path)
+
+
+def test_pages_line_up_with_the_index_across_blank_lines(csv_with_blank_lines):
+    assert get_line_index(csv_with_blank_lines).lines == 101
+    page = read_page(csv_with_blank_lines, page=2, page_size=10)
+    assert page["total_rows"] == 100
+    assert page["total_pages"] == 10
+    ids = page["data"]["id"]
+    assert ids.isna().tolist() == [i % 7 == 0 for i in range(21, 31)]
+    assert ids.dropna().astype(int).tolist() == [i for i in range(21, 31) if i % 7]
+
+
+def test_every_page_together_is_the_whole_file(csv_with_blank_lines):
+    pages = [read_page(csv_with_blank_lines, page, 33)["data"] for page in range(4)]
+    whole = pd.read_csv(csv_with_blank_lines, skip_blank_lines=False)
+    pd.testing.assert_frame_equal(pd.concat(pages, ignore_index=True), whole)
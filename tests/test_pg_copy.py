@@ -0,0 +1,86 @@
+import io
+import os
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+import sqlalchemy
+
+from app.utils.pg_copy import _literal_sql, _read_arrow_csv, _with_decimals, iter_postgres_copy, read_postgres_copy
+
+# COPY needs a live server; point this at a scratch database to run the integration tests
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+QUERY = "SELECT id % 2 AS m, '50%' AS pct, amount::text AS amount_text, amount FROM copy_test"
+
+requires_postgres = pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL is not set")
+
+
+def test_query_without_params_is_sent_as_written():
+    engine = sqlalchemy.create_engine("postgresql+psycopg2://user@localhost/db")
+    assert _literal_sql(engine, None, QUERY, None) == QUERY
+
+
+def test_numeric_columns_become_decimals():
+    frame = pd.DataFrame({"amount": ["12345678901234567.89", None]}, dtype=object)
+    result = _with_decimals(frame, ["amount"])
+    assert result["amount"][0] == Decimal("12345678901234567.89")
+    assert result["amount"][1] is None
+
+
+def test_arrow_parse_keeps_text_and_numeric_values_as_written():
+    options = {"dtype": {"code": "object", "id": "Int64", "amount": "object"}, "parse_dates": [],
+               "true_values": ["t"], "false_values": ["f"]}
+    stream = io.BytesIO(b"code,id,amount\n00123,9007199254740993,12345678901234567.89\n,,\n")
+    frame = _with_decimals(_read_arrow_csv(stream, options), ["amount"])
+    assert frame["code"].tolist() == ["00123", None]
+    assert frame["id"][0] == 9007199254740993
+    assert frame["amount"][0] == Decimal("12345678901234567.89")
+
+
+@pytest.fixture
+def postgres_engine():
+    engine = sqlalchemy.create_engine(POSTGRES_URL)
+    with engine.begin() as conn:
+        conn.execute(sqlalchemy.text("DROP TABLE IF EXISTS copy_test"))
+        conn.execute(sqlalchemy.text("CREATE TABLE copy_test (id integer, amount numeric(20, 2))"))
+        conn.execute(sqlalchemy.text(
+            "INSERT INTO copy_test VALUES (1, 12345678901234567.89), (2, 0.10), (3, NULL)"
+        ))
+    yield engine
+    with engine.begin() as conn:
+        conn.execute(sqlalchemy.text("DROP TABLE copy_test"))
+    engine.dispose()
+
+
+@requires_postgres
+def test_copy_keeps_percent_signs_and_casts(postgres_engine):
+    frame = read_postgres_copy(postgres_engine, QUERY + " ORDER BY id")
+    assert frame["m"].tolist() == [1, 0, 1]
+    assert frame["pct"].tolist() == ["50%", "50%", "50%"]
+    assert frame["amount_text"][0] == "12345678901234567.89"
+    assert frame["amount"][0] == Decimal("12345678901234567.89")
+    assert frame["amount"][2] is None
+
+
+@requires_postgres
+def test_copy_inlines_params_next_to_percent_signs(postgres_engine):
+    sql = QUERY + " WHERE id % 2 = :odd AND '50%' LIKE :pattern ORDER BY id"
+    chunks = list(iter_postgres_copy(postgres_engine, sql, {"odd": 1, "pattern": "5%"}, chunksize=1))
+    assert [len(chunk) for chunk in chunks] == [1, 1]
+    assert pd.concat(chunks)["pct"].tolist() == ["50%", "50%"]
+
+
+@requires_postgres
+def test_failed_copy_does_not_return_connection_to_pool(postgres_engine):
+    def backend_pid():
+        with postgres_engine.connect() as conn:
+            return conn.execute(sqlalchemy.text("SELECT pg_backend_pid()")).scalar()
+
+    pid = backend_pid()
+    read_postgres_copy(postgres_engine, "SELECT id FROM copy_test")
+    assert backend_pid() == pid
+    with pytest.raises(Exception):
+        read_postgres_copy(postgres_engine, "SELECT 1 / (id - 2) AS x FROM copy_test")
+    # The pool reconnects instead of reusing the connection left mid-COPY
+    assert backend_pid() != pid
@@ -0,0 +1,86 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from app.utils.pipeline import stream_copy
+
+
+def _chunks(count, rows=10, produced=None, closed=None, fail_at=None):
+    try:
+        for number in range(count):
+            if number == fail_at:
+                raise RuntimeError("source failed")
+            if produced is not None:
+                produced.append(number)
+            yield pd.DataFrame({"id": range(number * rows, (number + 1) * rows)})
+    finally:
+        if closed is not None:
+            closed.set()
+
+
+def test_every_chunk_is_written_in_order():
+    written = []
+    stats = stream_copy(_chunks(20), written.append, queue_size=2)
+    assert pd.concat(written)["id"].tolist() == list(range(200))
+    assert (stats["rows"], stats["chunks"]) == (200, 20)
+
+
+def test_the_reader_stays_at_most_a_queue_ahead():
+    produced, ahead = [], []
+
+    def write(frame):
+        ahead.append(len(produced) - (int(frame["id"].iloc[0]) // 10 + 1))
+
+    stream_copy(_chunks(50, produced=produced), write, queue_size=3)
+    # The queue, plus the chunk the reader holds while the queue is full
+    assert max(ahead) <= 4
+
+
+def test_a_resumed_copy_skips_committed_chunks():
+    written, commits = [], []
+    stats = stream_copy(_chunks(5), written.append, skip_chunks=3,
+                        on_commit=lambda number, rows: commits.append((number, rows)))
+    assert pd.concat(written)["id"].tolist() == list(range(30, 50))
+    assert commits == [(3, 10), (4, 10)]
+    assert (stats["skipped_chunks"], stats["skipped_rows"]) == (3, 30)
+
+
+def test_a_source_error_is_raised_after_the_chunks_before_it():
+    written = []
+    with pytest.raises(RuntimeError, match="source failed"):
+        stream_copy(_chunks(10, fail_at=4), written.append)
+    assert len(written) == 4
+
+
+def test_a_failed_write_stops_and_closes_the_source():
+    closed = threading.Event()
+
+    def write(frame):
+        if frame["id"].iloc[0] == 20:
+            raise ValueError("destination failed")
+
+    with pytest.raises(ValueError, match="destination failed"):
+        stream_copy(_chunks(1000, closed=closed), write, queue_size=2)
+    assert closed.is_set()
+
+
+def test_a_failing_commit_stops_the_copy():
+    written = []
+
+    def commit(number, rows):
+        if number == 1:
+            raise InterruptedError("cancelled")
+
+    with pytest.raises(InterruptedError):
+        stream_copy(_chunks(10), written.append, on_commit=commit)
+    assert len(written) == 2
+
+
+def test_empty_chunks_are_committed_but_not_written():
+    frames = [pd.DataFrame({"id": [1]}), pd.DataFrame({"id": []}), pd.DataFrame({"id": [2]})]
+    written, commits = [], []
+    stats = stream_copy(iter(frames), written.append, on_commit=lambda number, rows: commits.append(number))
+    assert len(written) == 2
+    assert commits == [0, 1, 2]
+    assert stats["chunks"] == 3
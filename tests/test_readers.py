@@ -0,0 +1,79 @@
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+import sqlalchemy
+
+from app.utils.engines import engine_registry
+from app.utils.partitioned_reads import _linear_boundaries
+from app.utils.readers import read_chunks_from_db, read_from_db
+
+ROWS = 1000
+
+
+@pytest.fixture
+def sqlite_connector(tmp_path):
+    url = f"sqlite:///{tmp_path / 'source.db'}"
+    engine = sqlalchemy.create_engine(url)
+    pd.DataFrame({
+        "id": range(1, ROWS + 1),
+        "amount": [i * 1.5 for i in range(ROWS)],
+        "name": [f"item-{i}" for i in range(ROWS)],
+    }).to_sql("items", engine, index=False)
+    engine.dispose()
+    connector = SimpleNamespace(id=f"sqlite-{tmp_path.name}", type="sqlite", connection_details=None,
+                                config={"connection_string": url, "query": "SELECT * FROM items ORDER BY id"})
+    yield connector
+    engine_registry.invalidate(connector.id)
+
+
+def test_chunks_are_bounded_by_chunksize(sqlite_connector):
+    chunks = list(read_chunks_from_db(sqlite_connector, chunksize=300))
+    assert [len(chunk) for chunk in chunks] == [300, 300, 300, 100]
+    assert pd.concat(chunks)["id"].tolist() == list(range(1, ROWS + 1))
+
+
+def test_chunks_only_select_requested_columns(sqlite_connector):
+    chunks = list(read_chunks_from_db(sqlite_connector, chunksize=400, columns=["name", "id"]))
+    assert all(list(chunk.columns) == ["name", "id"] for chunk in chunks)
+    assert sum(len(chunk) for chunk in chunks) == ROWS
+
+
+def test_closing_the_stream_returns_the_connection(sqlite_connector):
+    chunks = read_chunks_from_db(sqlite_connector, chunksize=100)
+    assert len(next(chunks)) == 100
+    chunks.close()
+    assert engine_registry.get_engine(sqlite_connector).pool.checkedout() == 0
+
+
+def test_whole_read_matches_chunked_read(sqlite_connector):
+    whole = read_from_db(sqlite_connector)
+    chunked = pd.concat(read_chunks_from_db(sqlite_connector, chunksize=128), ignore_index=True)
+    pd.testing.assert_frame_equal(whole, chunked)
+
+
+def test_partitioned_chunks_are_bounded_and_in_key_order(sqlite_connector):
+    sqlite_connector.config.update(partition_column="id", partitions=4)
+    chunks = list(read_chunks_from_db(sqlite_connector, chunksize=100))
+    assert max(len(chunk) for chunk in chunks) <= 100
+    assert pd.concat(chunks)["id"].tolist() == list(range(1, ROWS + 1))
+
+
+def test_partitioned_whole_read_has_every_row(sqlite_connector):
+    sqlite_connector.config.update(partition_column="amount", partitions=3)
+    frame = read_from_db(sqlite_connector)
+    assert sorted(frame["id"].tolist()) == list(range(1, ROWS + 1))
+
+
+def test_closing_a_partitioned_stream_stops_the_workers(sqlite_connector):
+    sqlite_connector.config.update(partition_column="id", partitions=4)
+    chunks = read_chunks_from_db(sqlite_connector, chunksize=10)
+    next(chunks)
+    chunks.close()
+    assert engine_registry.get_engine(sqlite_connector).pool.checkedout() == 0
+
+
+def test_decimal_bounds_split_exactly():
+    boundaries = _linear_boundaries(Decimal("0.00"), Decimal("10.00"), 4)
+    assert boundaries == [Decimal("0"), Decimal("2.5"), Decimal("5"), Decimal("7.5"), Decimal("10.00")]
@@ -0,0 +1,31 @@
+import json
+
+import pandas as pd
+import pytest
+
+from app.utils.serializers import iter_json_results, prefetch
+
+
+def _failing_source():
+    raise FileNotFoundError("missing.csv")
+    yield
+
+
+def test_prefetch_raises_before_the_response_starts():
+    with pytest.raises(FileNotFoundError):
+        prefetch(_failing_source())
+
+
+def test_prefetch_keeps_every_frame():
+    frames = (pd.DataFrame({"a": [i]}) for i in range(3))
+    assert [frame["a"][0] for frame in prefetch(frames)] == [0, 1, 2]
+    assert list(prefetch(iter(()))) == []
+
+
+def test_json_results_are_one_document():
+    results = [({"file": "a.csv"}, [pd.DataFrame({"a": [1, 2]})]), ({"file": "b.csv"}, [])]
+    body = json.loads(b"".join(iter_json_results(results)))
+    assert body == {"status": "success", "results": [
+        {"file": "a.csv", "data_preview": [{"a": 1}, {"a": 2}]},
+        {"file": "b.csv", "data_preview": []},
+    ]}
@@ -0,0 +1,121 @@
+import os
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from app.utils.spool import WriteSpool
+
+SCHEMA = {"id": "BIGINT", "name": "TEXT"}
+
+
+class Destination:
+    """Records the batches a spool drains, as the writer agent would write them."""
+
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def write(self, connector_id, data, table_name, **options):
+        with self.lock:
+            self.calls.append((data["id"].tolist(), options))
+
+    def ids(self):
+        with self.lock:
+            return sorted(i for ids, _ in self.calls for i in ids)
+
+
+def _frame(start, rows=10):
+    return pd.DataFrame({"id": range(start, start + rows), "name": [f"row-{i}" for i in range(start, start + rows)]})
+
+
+def _wait_until(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "spool did not drain in time"
+        time.sleep(0.02)
+
+
+@pytest.fixture
+def spools(tmp_path):
+    created = []
+
+    def make():
+        spool = WriteSpool(directory=str(tmp_path / "spool"), backoff=0.01)
+        created.append(spool)
+        return spool
+    yield make
+    for spool in created:
+        spool.stop()
+
+
+def test_the_table_schema_is_kept_for_creating_the_table(spools):
+    spool = spools()
+    spool.append("c1", _frame(0), "events", create_table=True, table_schema=SCHEMA)
+    spool.append("c1", _frame(10), "events")
+    destination = Destination()
+    spool.start(destination.write)
+    _wait_until(lambda: len(destination.calls) == 2)
+    [first, second] = [options for _, options in destination.calls]
+    assert first["create_table"] is True and first["table_schema"] == SCHEMA
+    assert second["create_table"] is False
+
+
+def test_two_processes_never_drain_the_same_segments(spools):
+    first, second = spools(), spools()
+    for start in range(0, 100, 10):
+        first.append("c1", _frame(start), "events")
+        second.append("c1", _frame(start + 100), "events")
+    destination = Destination()
+    first.start(destination.write)
+    second.start(destination.write)
+    _wait_until(lambda: len(destination.ids()) >= 200)
+    time.sleep(0.1)
+    assert destination.ids() == list(range(200))
+    assert len(os.listdir(first.directory)) == 2
+
+
+def test_a_stopped_spool_hands_its_segments_over(spools):
+    first = spools()
+    first.append("c1", _frame(0), "events", create_table=True, table_schema=SCHEMA)
+    first.stop()
+    second = spools()
+    destination = Destination()
+    second.start(destination.write)
+    _wait_until(lambda: destination.calls)
+    assert destination.ids() == list(range(10))
+    assert destination.calls[0][1]["table_schema"] == SCHEMA
+
+
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+
+@pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL is not set")
+def test_drained_batches_create_the_declared_table(spools, user, make_connector):
+    import sqlalchemy
+
+    from app.core.agents.writer_agent import WriterAgent
+    from app.models.connector import ConnectorType
+
+    destination = make_connector(user, "destination", ConnectorType.POSTGRES,
+                                 config={"connection_string": POSTGRES_URL})
+    engine = sqlalchemy.create_engine(POSTGRES_URL)
+    with engine.begin() as conn:
+        conn.execute(sqlalchemy.text("DROP TABLE IF EXISTS spool_test"))
+    spool = spools()
+    try:
+        spool.append(destination.id, _frame(0), "spool_test", create_table=True,
+                     table_schema={"id": "BIGINT", "name": "VARCHAR(20)"})
+        spool.start(WriterAgent().write_data)
+        _wait_until(lambda: spool.stats()["streams"][0]["rows_drained"] == 10)
+        with engine.begin() as conn:
+            types = dict(conn.execute(sqlalchemy.text(
+                "SELECT column_name, data_type FROM information_schema.columns WHERE table_name = 'spool_test'"
+            )).fetchall())
+        assert types == {"id": "bigint", "name": "character varying"}
+    finally:
+        spool.stop()
+        with engine.begin() as conn:
+            conn.execute(sqlalchemy.text("DROP TABLE IF EXISTS spool_test"))
+        engine.dispose()
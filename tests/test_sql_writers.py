@@ -0,0 +1,64 @@
+import os
+
+import pandas as pd
+import pytest
+import sqlalchemy
+
+from app.utils.sql_writers import copy_to_postgres, create_table_from_schema
+
+# COPY needs a live server; point this at a scratch database to run the integration tests
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+requires_postgres = pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL is not set")
+
+
+def test_created_tables_quote_column_names(tmp_path):
+    engine = sqlalchemy.create_engine(f"sqlite:///{tmp_path / 'writes.db'}")
+    schema = {"order": "INTEGER", "Event Name": "TEXT"}
+    create_table_from_schema(engine, "events", schema, merge_keys=["order"])
+    columns = [column["name"] for column in sqlalchemy.inspect(engine).get_columns("events")]
+    assert columns == ["order", "Event Name"]
+    engine.dispose()
+
+
+@pytest.fixture
+def serial_table():
+    engine = sqlalchemy.create_engine(POSTGRES_URL)
+    with engine.begin() as conn:
+        conn.execute(sqlalchemy.text('DROP TABLE IF EXISTS "Serial Events"'))
+        conn.execute(sqlalchemy.text('CREATE TABLE "Serial Events" (id serial PRIMARY KEY, name text)'))
+        conn.execute(sqlalchemy.text("""INSERT INTO "Serial Events" (name) VALUES ('old')"""))
+    yield engine
+    with engine.begin() as conn:
+        conn.execute(sqlalchemy.text('DROP TABLE "Serial Events"'))
+    engine.dispose()
+
+
+@requires_postgres
+def test_replace_keeps_the_serial_sequence(serial_table):
+    for names in (["a", "b"], ["c"]):
+        report = copy_to_postgres(serial_table, "Serial Events", pd.DataFrame({"name": names}), mode="replace")
+        assert report["strategy"] == "staging_swap"
+    with serial_table.begin() as conn:
+        conn.execute(sqlalchemy.text("""INSERT INTO "Serial Events" (name) VALUES ('d')"""))
+        rows = conn.execute(sqlalchemy.text('SELECT id, name FROM "Serial Events" ORDER BY id')).fetchall()
+        sequence = conn.execute(sqlalchemy.text("""SELECT pg_get_serial_sequence('"Serial Events"', 'id')""")).scalar()
+    assert [name for _, name in rows] == ["c", "d"]
+    assert rows[0][0] < rows[1][0]
+    assert sequence is not None
+
+
+@requires_postgres
+def test_copy_round_trips_null_markers_and_special_strings():
+    engine = sqlalchemy.create_engine(POSTGRES_URL)
+    names = ["\\N", None, "", 'say "hi", then\nleave', "plain"]
+    data = pd.DataFrame({"id": [1, 2, 3, 4, 5], "name": names})
+    try:
+        copy_to_postgres(engine, "copy_round_trip", data, mode="replace")
+        with engine.begin() as conn:
+            rows = conn.execute(sqlalchemy.text("SELECT name FROM copy_round_trip ORDER BY id")).scalars().all()
+        assert rows == names
+    finally:
+        with engine.begin() as conn:
+            conn.execute(sqlalchemy.text("DROP TABLE IF EXISTS copy_round_trip"))
+        engine.dispose()
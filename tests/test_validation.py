@@ -0,0 +1,62 @@
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+
+from app.utils.validation import SKIP, DataValidationError, column_spec, validate_frame
+
+
+@pytest.mark.parametrize("type_name, expected", [
+    ("character varying(5)", {"kind": "string", "max_length": 5}),
+    ("CHARACTER(3) NOT NULL", {"kind": "string", "max_length": 3, "nullable": False}),
+    ("varchar (10)", {"kind": "string", "max_length": 10}),
+    ("double precision", {"kind": "float", "bits": 64}),
+    ("int unsigned", {"kind": "int", "unsigned": True, "max": 2 ** 32 - 1}),
+    ("timestamp(3) with time zone", {"kind": "datetime", "tz": True}),
+    ("numeric(20, 2)", {"kind": "decimal", "precision": 20, "scale": 2}),
+])
+def test_sql_types(type_name, expected):
+    spec = column_spec(type_name, "postgresql")
+    assert {key: spec[key] for key in expected} == expected
+
+
+def test_clickhouse_types():
+    assert column_spec("LowCardinality(Nullable(String))")["nullable"] is True
+    assert column_spec("UInt8")["max"] == 255
+    assert column_spec("Decimal(38, 10)")["precision"] == 38
+
+
+def test_bad_rows_are_rejected_with_a_report():
+    data = pd.DataFrame({"id": ["1", "x", "3", "300"], "code": ["ab", "abcdef", None, "abc"]})
+    with pytest.raises(DataValidationError) as error:
+        validate_frame(data, {"id": "smallint unsigned", "code": "character varying(5)"}, "mysql")
+    report = error.value.report
+    assert report["bad_rows"] == [1]
+    assert {(e["row"], e["column"]) for e in report["errors"]} == {(1, "id"), (1, "code")}
+
+
+def test_skip_drops_bad_rows_and_unknown_columns():
+    data = pd.DataFrame({"id": [1, -1, 2], "extra": ["a", "b", "c"]})
+    result, report = validate_frame(data, {"id": "UInt32"}, on_invalid=SKIP)
+    assert result["id"].tolist() == [1, 2]
+    assert list(result.columns) == ["id"]
+    assert report["unknown_columns"] == ["extra"]
+
+
+def test_decimals_keep_every_digit():
+    data = pd.DataFrame({"amount": ["12345678901234567.89", 0.1, None, "1e3"]})
+    result, report = validate_frame(data, {"amount": "numeric(20, 2)"}, "postgresql")
+    assert result["amount"].tolist() == [Decimal("12345678901234567.89"), Decimal("0.1"), None, Decimal("1E+3")]
+    assert report["invalid_rows"] == 0
+
+
+def test_decimals_out_of_range_or_not_numbers_are_reported():
+    data = pd.DataFrame({"amount": ["999.99", "1000", "abc", "NaN"]})
+    _, report = validate_frame(data, {"amount": "Decimal(5, 2)"}, on_invalid=SKIP)
+    assert report["bad_rows"] == [1, 2, 3]
+
+
+def test_non_nullable_columns_reject_missing_values():
+    data = pd.DataFrame({"id": [1, None]})
+    with pytest.raises(DataValidationError):
+        validate_frame(data, {"id": "bigint primary key"}, "postgresql")